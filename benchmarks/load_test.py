@@ -0,0 +1,278 @@
+"""
+Load test of the API served like in production: ``Bootstrap.build_api`` under ``main_api.StandaloneApplication``,
+with gunicorn and uvicorn workers, an OIDC stand-in serving the signing keys, and an in-memory broker.
+
+    python -m benchmarks.load_test --workers 1,2,4 --concurrency 50 --duration 10 --output load_test.json
+    python -m benchmarks.load_test --workers 1,2,4 --baseline load_test.json
+
+Each route is driven for --duration seconds by --concurrency HTTP clients, spread over --client-processes processes
+so that the clients don't saturate before the server. The requests per second and the p50/p95/p99 latencies are
+reported per route and per gunicorn worker count, and saved as JSON with --output. With --baseline, the results are
+compared with a previous output: the command fails when a route loses more than --tolerance of its throughput, or its
+p99 latency grows by more than --tolerance.
+
+Without --redis-url, the broker and the result backend are in-memory, one per gunicorn worker: the submitted tasks are
+never run, and their status stays PENDING.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+
+import httpx
+
+from pymicroservice.testing.oidc_stub import OidcStub
+
+API_ROUTE_PREFIX = "/api/v1"
+ROUTES = ("health", "public", "protected", "task", "status")
+
+
+@dataclass
+class RouteResult:
+    workers: int
+    route: str
+    requests: int
+    errors: int
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def serve(port: int, workers: int) -> None:
+    """
+    Run the API like ``python -m sample.main_api``, the environment is set by the caller.
+    """
+    from pymicroservice.metrics.multiprocess import child_exit, prepare_multiprocess_dir
+
+    prepare_multiprocess_dir(workers)
+
+    from pymicroservice.logger.logger_config import StubbedGunicornLogger
+    from sample.application.bootstrap import Bootstrap
+    from sample.main_api import StandaloneApplication
+
+    options = {
+        "bind": f"127.0.0.1:{port}",
+        "workers": workers,
+        "accesslog": "-",
+        "errorlog": "-",
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "logger_class": StubbedGunicornLogger,
+        "child_exit": child_exit,
+    }
+    StandaloneApplication(Bootstrap.build_api(production=True), options).run()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"API exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health/readiness", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"API not ready within {timeout}s")
+
+
+def _request(route: str, token: str, task_ids: list[str], i: int) -> tuple[str, str, dict]:
+    if route == "health":
+        return "GET", "/health/liveness", {}
+    if route == "public":
+        return "GET", f"{API_ROUTE_PREFIX}/user/public", {}
+    if route == "protected":
+        return "GET", f"{API_ROUTE_PREFIX}/user/protected", {"headers": {"Authorization": f"Bearer {token}"}}
+    if route == "task":
+        return "POST", f"{API_ROUTE_PREFIX}/user/task", {"json": {"name": f"user {i}"}}
+    return "GET", f"{API_ROUTE_PREFIX}/worker/task/{task_ids[i % len(task_ids)]}", {}
+
+
+async def _drive(base_url: str, route: str, token: str, task_ids: list[str], concurrency: int, duration: float):
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def client_loop(offset: int):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                method, url, kwargs = _request(route, token, task_ids, i)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+                i += concurrency
+
+        await asyncio.gather(*(client_loop(offset) for offset in range(concurrency)))
+    return latencies, errors
+
+
+def _client_process(args: tuple) -> tuple[list[float], int]:
+    return asyncio.run(_drive(*args))
+
+
+def _percentile(latencies: list[float], percentile: float) -> float:
+    return latencies[min(len(latencies) - 1, int(len(latencies) * percentile))] * 1000
+
+
+def run_route(
+    pool, base_url: str, workers: int, route: str, token: str, task_ids: list[str], args: argparse.Namespace
+) -> RouteResult:
+    processes = args.client_processes
+    concurrency = max(1, args.concurrency // processes)
+    jobs = [(base_url, route, token, task_ids, concurrency, args.duration) for _ in range(processes)]
+    latencies: list[float] = []
+    errors = 0
+    for process_latencies, process_errors in pool.map(_client_process, jobs):
+        latencies.extend(process_latencies)
+        errors += process_errors
+
+    latencies.sort()
+    return RouteResult(
+        workers,
+        route,
+        len(latencies),
+        errors,
+        round(len(latencies) / args.duration, 1),
+        round(_percentile(latencies, 0.50), 2),
+        round(_percentile(latencies, 0.95), 2),
+        round(_percentile(latencies, 0.99), 2),
+    )
+
+
+def run_workers(pool, workers: int, token: str, env: dict[str, str], args: argparse.Namespace) -> list[RouteResult]:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.NamedTemporaryFile("w+", prefix="load_test_api_", suffix=".log", delete=False) as log:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.load_test", "--serve", str(port), "--workers", str(workers)],
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    try:
+        try:
+            _wait_until_ready(base_url, server)
+        except RuntimeError as e:
+            raise RuntimeError(f"{e}, see {log.name}") from e
+
+        task_ids = [httpx.post(f"{base_url}{API_ROUTE_PREFIX}/user/task", json={"name": "status"}).json()["task_id"]]
+        results = []
+        for route in args.routes:
+            result = run_route(pool, base_url, workers, route, token, task_ids, args)
+            print(
+                f"workers={result.workers} {result.route:>9}: {result.rps:>8.0f} req/s  p50 {result.p50_ms:>7.2f} ms  "
+                f"p95 {result.p95_ms:>7.2f} ms  p99 {result.p99_ms:>7.2f} ms  errors {result.errors}"
+            )
+            results.append(result)
+        return results
+    finally:
+        server.terminate()
+        server.wait(30)
+        os.unlink(log.name)
+
+
+def compare(results: list[RouteResult], baseline: dict, tolerance: float) -> bool:
+    """
+    Print the changes from the baseline, return whether a route regressed beyond the tolerance.
+    """
+    previous = {(result["workers"], result["route"]): result for result in baseline["results"]}
+    regressed = False
+    for result in results:
+        before = previous.get((result.workers, result.route))
+        if before is None or not before["rps"] or not before["p99_ms"]:
+            continue
+        rps_change = result.rps / before["rps"] - 1
+        p99_change = result.p99_ms / before["p99_ms"] - 1
+        route_regressed = rps_change < -tolerance or p99_change > tolerance
+        regressed |= route_regressed
+        print(
+            f"workers={result.workers} {result.route:>9}: req/s {rps_change:>+7.1%}  p99 {p99_change:>+7.1%}"
+            f"{'  REGRESSION' if route_regressed else ''}"
+        )
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1", help="comma separated gunicorn worker counts, e.g. 1,2,4")
+    parser.add_argument("--routes", default=",".join(ROUTES), help=f"comma separated routes among {ROUTES}")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--client-processes", type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--serve", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        serve(args.serve, int(args.workers))
+        return
+
+    args.routes = args.routes.split(",")
+    unknown = set(args.routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"unknown routes {sorted(unknown)}")
+
+    results: list[RouteResult] = []
+    with OidcStub() as stub, multiprocessing.Pool(args.client_processes) as pool:
+        env = {
+            **os.environ,
+            "OIDC_CONFIGURATION_URL": stub.configuration_url,
+            "OIDC_AUDIENCE": stub.audience,
+            "CELERY_BROKER_URL": args.redis_url or "memory://",
+            "CELERY_RESULT_BACKEND": args.redis_url or "cache+memory://",
+        }
+        token = stub.token(expires_in=3600)
+        for workers in (int(workers) for workers in args.workers.split(",")):
+            results.extend(run_workers(pool, workers, token, env, args))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "concurrency": args.concurrency,
+            "client_processes": args.client_processes,
+            "duration": args.duration,
+            "broker": args.redis_url or "memory://",
+        },
+        "results": [asdict(result) for result in results],
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            if compare(results, json.load(baseline), args.tolerance):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare the loguru serializer (``serialize=True``) with the compact JSON sink.
+
+    python -m benchmarks.log_json_benchmark --lines 100000
+"""
+
+import argparse
+import io
+import time
+from typing import Any, cast
+
+from loguru import logger
+
+from pymicroservice.logger.json_format import CompactJsonSink
+
+
+class CountingStream(io.StringIO):
+    # counts the written lines and bytes without keeping them
+    def __init__(self):
+        super().__init__()
+        self.lines = 0
+        self.bytes = 0
+
+    def write(self, message: str) -> int:
+        self.lines += 1
+        self.bytes += len(message.encode())
+        return len(message)
+
+
+def run(name: str, handler: dict[str, Any], counter: CountingStream, lines: int) -> dict[str, Any]:
+    logger.configure(handlers=[cast(Any, handler)])
+
+    start = time.perf_counter()
+    for i in range(lines):
+        logger.info("GET /api/v1/user/protected {} {}", 200, i)
+    elapsed = time.perf_counter() - start
+
+    logger.remove()
+    return {
+        "serializer": name,
+        "lines_per_second": round(counter.lines / elapsed),
+        "bytes_per_line": round(counter.bytes / counter.lines, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=100_000)
+    args = parser.parse_args()
+
+    loguru_counter, compact_counter = CountingStream(), CountingStream()
+    results = [
+        run("loguru", {"sink": loguru_counter, "serialize": True}, loguru_counter, args.lines),
+        run(
+            "compact",
+            {"sink": CompactJsonSink(compact_counter, "benchmark"), "format": "{message}"},
+            compact_counter,
+            args.lines,
+        ),
+    ]
+    for result in results:
+        name, lines_per_second, bytes_per_line = result.values()
+        print(f"{name:>10}: {lines_per_second:>10} lines/s {bytes_per_line:>8} B/line")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Print a token for the header of the profiling middleware, signed with PROFILING_SECRET.
+
+    curl -H "X-Profile: $(PROFILING_SECRET=... python -m benchmarks.profiling_token)" http://localhost:8000/api/v1/user/public
+"""
+
+import argparse
+
+from pymicroservice.profiling.profiling_middleware import PROFILING_CONFIG, sign_profiling_token
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ttl", type=int, default=300, help="number of seconds the token is valid")
+    args = parser.parse_args()
+
+    if not PROFILING_CONFIG.secret:
+        parser.error("PROFILING_SECRET is not set.")
+    print(sign_profiling_token(PROFILING_CONFIG.secret, args.ttl))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare the size and the encode/decode throughput of task messages with the kombu JSON serializer and pydantic models
+registered with register_pydantic_types, and with the msgpack serializer, validating or trusting the payloads.
+
+    python -m benchmarks.task_payload_benchmark --messages 20000
+"""
+
+import argparse
+import datetime
+import time
+import uuid
+from collections.abc import Callable
+from decimal import Decimal
+from typing import Any
+
+from kombu.serialization import dumps, loads
+from pydantic import BaseModel
+
+from pymicroservice.worker.pydantic_msgpack import PydanticMsgpackSerializer
+from pymicroservice.worker.register_pydantic import register_pydantic_types
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+    zip_code: str
+
+
+class Order(BaseModel):
+    order_id: uuid.UUID
+    created_at: datetime.datetime
+    amount: Decimal
+    quantity: int
+    tags: list[str]
+    shipping: Address
+
+
+def build_message() -> tuple:
+    order = Order(
+        order_id=uuid.uuid4(),
+        created_at=datetime.datetime.now(datetime.UTC),
+        amount=Decimal("129.90"),
+        quantity=3,
+        tags=["priority", "gift"],
+        shipping=Address(street="1 rue de la Paix", city="Paris", zip_code="75002"),
+    )
+    # the body of a Celery protocol 2 message: args, kwargs and embedded options
+    return (order,), {}, {"callbacks": None, "errbacks": None, "chain": None, "chord": None}
+
+
+def measure(name: str, encode: Callable[[Any], bytes], decode: Callable[[bytes], Any], messages: int) -> None:
+    body = build_message()
+    data = encode(body)
+    assert decode(data)[0][0] == body[0][0]
+
+    start = time.perf_counter()
+    for _ in range(messages):
+        encode(body)
+    encoded = messages / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(messages):
+        decode(data)
+    decoded = messages / (time.perf_counter() - start)
+
+    print(f"{name:>17}: {len(data):>5} bytes {encoded:>9.0f} encodes/s {decoded:>9.0f} decodes/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    register_pydantic_types([Order, Address])
+    measure(
+        "json",
+        lambda body: dumps(body, serializer="json")[2].encode(),
+        lambda data: loads(data, "application/json", "utf-8"),
+        args.messages,
+    )
+
+    for trusted in (False, True):
+        serializer = PydanticMsgpackSerializer(trusted)
+        serializer.register_types({1: Order, 2: Address})
+        name = "msgpack trusted" if trusted else "msgpack validated"
+        measure(name, serializer.dumps, serializer.loads, args.messages)
+
+
+if __name__ == "__main__":
+    main()
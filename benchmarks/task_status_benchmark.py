@@ -0,0 +1,124 @@
+"""
+Compare task status polls per second before (AsyncResult on the event loop) and after (TaskStatusReader).
+
+    python -m benchmarks.task_status_benchmark --redis-url redis://localhost:6379/0 --concurrency 50
+
+Without --redis-url, an in-process fake Redis is used: it has no network latency, so it only measures the CPU
+cost of both paths, not the event loop blocking. --latency-ms adds a network delay in front of a real Redis.
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from functools import partial
+from urllib.parse import urlparse
+
+import httpx
+from celery import Celery
+from fastapi import FastAPI
+
+from pymicroservice.worker.task_status import TaskStatusReader
+
+
+def build_app(worker: Celery, reader: TaskStatusReader) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before/{task_id}")
+    async def before(task_id: str):
+        task_result = worker.AsyncResult(task_id)
+        if task_result.state == "SUCCESS":
+            return {"task_id": task_id, "status": task_result.state, "result": task_result.result}
+        return {"task_id": task_id, "status": task_result.state}
+
+    @app.get("/after/{task_id}")
+    async def after(task_id: str):
+        task_status = await reader.get(task_id)
+        if task_status.status == "SUCCESS":
+            return {"task_id": task_id, "status": task_status.status, "result": task_status.result}
+        return {"task_id": task_id, "status": task_status.status}
+
+    return app
+
+
+async def poll(app: FastAPI, route: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    remaining = iter(range(requests))
+
+    async def client_loop(client: httpx.AsyncClient):
+        for i in remaining:
+            response = await client.get(f"/{route}/task-{i % 100}")
+            response.raise_for_status()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+def start_latency_proxy(redis_url: str, latency: float) -> str:
+    """
+    Start a TCP proxy delaying each chunk sent to and received from Redis, in a background thread.
+
+    :return: The Redis URL going through the proxy.
+    """
+    target = urlparse(redis_url)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    port: list[int] = []
+
+    async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while data := await reader.read(65536):
+            await asyncio.sleep(latency / 2)
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    async def handle(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        redis_reader, redis_writer = await asyncio.open_connection(target.hostname, target.port or 6379)
+        await asyncio.gather(pipe(client_reader, redis_writer), pipe(redis_reader, client_writer))
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port.append(server.sockets[0].getsockname()[1])
+        started.set()
+        await server.serve_forever()
+
+    threading.Thread(target=loop.run_until_complete, args=(serve(),), daemon=True).start()
+    started.wait()
+    return target._replace(netloc=f"127.0.0.1:{port[0]}").geturl()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    redis_url = args.redis_url
+    if redis_url and args.latency_ms:
+        redis_url = start_latency_proxy(redis_url, args.latency_ms / 1000)
+
+    worker = Celery("benchmark", backend=redis_url or "redis://localhost:6379/0")
+    client_factory = None
+    if redis_url is None:
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+        worker.backend.client = fakeredis.FakeRedis(server=server)
+        client_factory = partial(fakeredis.aioredis.FakeRedis, server=server)
+    reader = TaskStatusReader(worker, pool_size=args.concurrency, client_factory=client_factory)
+
+    for i in range(100):
+        worker.backend.store_result(f"task-{i}", f"result {i}", "SUCCESS")
+
+    app = build_app(worker, reader)
+    for route in ("before", "after"):
+        rps = asyncio.run(poll(app, route, args.requests, args.concurrency))
+        print(f"{route:>7}: {rps:>8.0f} status polls/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compare the time and the memory per request of mapping a verified JWT payload to an access token, with the dataclass
+mapper copying the claims and with the slotted JWTAccessToken reading them from the payload, for a handler reading
+``sub`` and checking a role.
+
+    python -m benchmarks.token_mapping_benchmark --tokens 200000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from pymicroservice.security.token import JWTAccessToken
+
+
+@dataclass
+class DataclassAccessToken:
+    iss: str
+    exp: int
+    aud: str
+    sub: str
+    iat: int
+    jti: str
+    auth_time: str | None = None
+    acr: str | None = None
+    amr: list[str] | None = field(default_factory=list)
+    extra_claims: dict[str, Any] = field(default_factory=dict)
+
+
+def map_to_dataclass(payload: dict) -> DataclassAccessToken:
+    # the mapper replaced by JWTAccessToken.from_payload
+    standard_fields = {"iss", "exp", "aud", "sub", "iat", "jti", "auth_time", "acr", "amr"}
+    standard_data = {field: payload.get(field) for field in standard_fields}
+    extra_claims = {key: value for key, value in payload.items() if key not in standard_fields}
+    return DataclassAccessToken(
+        **{key: value for key, value in standard_data.items() if value is not None},
+        extra_claims=extra_claims,
+    )
+
+
+def build_payload() -> dict[str, Any]:
+    # the claims of a Keycloak access token
+    now = int(time.time())
+    return {
+        "exp": now + 300,
+        "iat": now,
+        "auth_time": now,
+        "jti": "0b6f1c2e-3f6a-4b8e-9d3a-1c2b3d4e5f60",
+        "iss": "https://keycloak.example.com/realms/pymicroservice",
+        "aud": "account",
+        "sub": "5f0c8a52-6a4e-4d8f-a3b1-2c7e9d1f0a11",
+        "typ": "Bearer",
+        "azp": "pymicroservice",
+        "sid": "7e1d2c3b-4a5f-6e7d-8c9b-0a1b2c3d4e5f",
+        "acr": "1",
+        "allowed-origins": ["https://app.example.com"],
+        "realm_access": {"roles": ["offline_access", "uma_authorization", "admin"]},
+        "resource_access": {"account": {"roles": ["manage-account", "view-profile"]}},
+        "scope": "openid profile email",
+        "email_verified": True,
+        "name": "Jane Doe",
+        "preferred_username": "jane",
+        "email": "jane@example.com",
+    }
+
+
+def handle_dataclass(payload: dict) -> tuple[Any, bool]:
+    token = map_to_dataclass(payload)
+    return token, token.sub is not None and "admin" in token.extra_claims["realm_access"]["roles"]
+
+
+def handle_slotted(payload: dict) -> tuple[Any, bool]:
+    token = JWTAccessToken.from_payload(payload)
+    return token, token.sub is not None and "admin" in token.roles
+
+
+def measure(name: str, handle: Callable[[dict], tuple[Any, bool]], tokens: int) -> None:
+    # a payload per request, like jwt.decode
+    payloads = [build_payload() for _ in range(tokens)]
+    assert handle(payloads[0])[1]
+
+    gc.collect()
+    start = time.perf_counter()
+    for payload in payloads:
+        handle(payload)
+    elapsed = time.perf_counter() - start
+
+    # the memory held by the tokens of the requests in flight, beyond the payloads
+    gc.collect()
+    tracemalloc.start()
+    kept = [handle(payload)[0] for payload in payloads]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    print(f"{name:>9}: {elapsed / tokens * 1e9:>6.0f} ns/request {allocated / tokens:>6.0f} bytes/token")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=200000)
+    args = parser.parse_args()
+
+    measure("dataclass", handle_dataclass, args.tokens)
+    measure("slotted", handle_slotted, args.tokens)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import functools
+import hashlib
+import inspect
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, cast
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from starlette.concurrency import run_in_threadpool
+
+from pymicroservice.metrics.prometheus_metrics import RESPONSE_CACHE_REQUESTS
+
+
+class ResponseCacheSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="RESPONSE_CACHE_", validate_default=False)
+    enabled: bool = True
+    max_size: int = 10000
+
+
+RESPONSE_CACHE_CONFIG = ResponseCacheSettings()
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    expires_at: float | None = None
+
+    def response(self, request: Request, cache_control: str | None = None) -> Response:
+        """
+        Answer a request with the cached body, or with a 304 without body if the client holds the same version.
+
+        :param request: The request, whose ``If-None-Match`` header is compared with the ETag.
+        :param cache_control: The ``Cache-Control`` header of the response, if any.
+        """
+        headers = {"ETag": self.etag}
+        if cache_control is not None:
+            headers["Cache-Control"] = cache_control
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and self._matches(if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+    def _matches(self, if_none_match: str) -> bool:
+        if if_none_match.strip() == "*":
+            return True
+        # weak comparison, as required for If-None-Match
+        return any(tag.strip().removeprefix("W/") == self.etag for tag in if_none_match.split(","))
+
+
+@dataclass(frozen=True)
+class ResponseCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """
+    An in-process LRU cache of JSON responses with their ETag.
+
+    Entries without a TTL are kept until they are evicted, e.g. the states of finished tasks, which never change.
+    The hits and misses are counted in the ``response_cache_requests`` metric, labelled with the name of the cache.
+    """
+
+    def __init__(self, name: str, max_size: int = 10000):
+        """
+        :param name: The name of the cache in the metrics.
+        :param max_size: Maximum number of responses kept, the least recently used is evicted first.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be greater than 0.")
+        self.name = name
+        self.max_size = max_size
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._hit_counter = RESPONSE_CACHE_REQUESTS.labels(name, "hit")
+        self._miss_counter = RESPONSE_CACHE_REQUESTS.labels(name, "miss")
+
+    @classmethod
+    def from_settings(cls, name: str, settings: ResponseCacheSettings = RESPONSE_CACHE_CONFIG) -> "ResponseCache":
+        return cls(name, settings.max_size)
+
+    def get(self, key: str) -> CachedResponse | None:
+        """
+        Retrieve a response.
+
+        :return: The cached response or None if the key is unknown or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and time.monotonic() >= entry.expires_at:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                self._miss_counter.inc()
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        self._hit_counter.inc()
+        return entry
+
+    def put(self, key: str, content: Any, ttl: float | None = None) -> CachedResponse:
+        """
+        Serialize a response content to JSON, like FastAPI, and store it with its ETag.
+
+        :param key: The key of the response, e.g. the URL of the request.
+        :param content: The content returned by the route.
+        :param ttl: Number of seconds the response is served from the cache, until it's evicted if None.
+        :return: The cached response.
+        """
+        body = json.dumps(
+            jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode()
+        entry = CachedResponse(
+            body,
+            f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            None if ttl is None else time.monotonic() + ttl,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return entry
+
+    def stats(self) -> ResponseCacheStats:
+        with self._lock:
+            return ResponseCacheStats(self._hits, self._misses, self._evictions, len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+STATIC_RESPONSE_CACHE = ResponseCache.from_settings("static")
+
+
+def cache_response(ttl: float, cache: ResponseCache = STATIC_RESPONSE_CACHE) -> Callable[[Callable], Callable]:
+    """
+    Cache the responses of a GET route for ``ttl`` seconds, keyed by the URL, and answer ``If-None-Match`` requests
+    with a 304. The route must not depend on anything but its URL, e.g. not on the caller, and return its content:
+    a returned ``Response`` is not cached.
+
+    :param ttl: Number of seconds a response is served from the cache.
+    :param cache: The cache of the responses.
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        if not RESPONSE_CACHE_CONFIG.enabled:
+            return endpoint
+
+        signature = inspect.signature(endpoint)
+        is_coroutine = inspect.iscoroutinefunction(endpoint)
+        parameters = list(signature.parameters.values())
+        # the request is given to the wrapper only
+        parameters.append(inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, _cache_request: Request, **kwargs: Any) -> Any:
+            key = f"{_cache_request.url.path}?{_cache_request.url.query}"
+            cached = cache.get(key)
+            if cached is None:
+                if is_coroutine:
+                    content = await endpoint(*args, **kwargs)
+                else:
+                    content = await run_in_threadpool(endpoint, *args, **kwargs)
+                if isinstance(content, Response):
+                    return content
+                cached = cache.put(key, content, ttl)
+            return cached.response(_cache_request, f"max-age={int(ttl)}")
+
+        cast(Any, wrapper).__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+
+    return decorator
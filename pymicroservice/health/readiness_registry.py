@@ -0,0 +1,144 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ReadinessSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="READINESS_", validate_default=False)
+    interval: float = 10
+    timeout: float = 2
+    concurrency: int = 4
+    # a check not run for this long is down, e.g. when the event loop is blocked
+    stale_after: float = 60
+
+
+READINESS_CONFIG = ReadinessSettings()
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    ok: bool
+    latency: float
+    checked_at: float
+    error: str | None = None
+
+
+class ReadinessRegistry:
+    """
+    The dependency checks of the readiness probe, run periodically in the background.
+
+    The probe only reads the last results, so the dependencies are checked once per ``interval`` by each process
+    whatever the number of probes, and a slow dependency doesn't slow the probe down.
+    """
+
+    def __init__(self, interval: float = 10, timeout: float = 2, concurrency: int = 4, stale_after: float = 60):
+        """
+        :param interval: Number of seconds between two runs of the checks.
+        :param timeout: Timeout in seconds of a check.
+        :param concurrency: Maximum number of checks running at the same time.
+        :param stale_after: Number of seconds after which the result of a check is considered down.
+        """
+        self.interval = interval
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.stale_after = stale_after
+        self._checks: dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._results: dict[str, CheckResult] = {}
+        self._task: asyncio.Task | None = None
+
+    @classmethod
+    def from_settings(cls, settings: ReadinessSettings = READINESS_CONFIG) -> "ReadinessRegistry":
+        return cls(settings.interval, settings.timeout, settings.concurrency, settings.stale_after)
+
+    def register(self, name: str, check: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Register a dependency check, the registry is not ready until it passed.
+
+        :param name: The name of the check in the probe response.
+        :param check: A coroutine function, the check fails if it raises or returns False.
+        """
+        self._checks[name] = check
+
+    async def run_checks(self) -> None:
+        """
+        Run all the checks once and store their results.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._run_check(name, check, semaphore) for name, check in list(self._checks.items())))
+
+    async def _run_check(self, name: str, check: Callable[[], Awaitable[Any]], semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            error = None
+            try:
+                if await asyncio.wait_for(check(), self.timeout) is False:
+                    error = "failed"
+            except TimeoutError:
+                error = f"timed out after {self.timeout}s"
+            except Exception as e:
+                error = type(e).__name__
+                logger.debug("Readiness check {} failed: {}", name, e)
+            result = CheckResult(error is None, time.perf_counter() - start, time.monotonic(), error)
+
+        previous = self._results.get(name)
+        self._results[name] = result
+        if previous is not None and previous.ok and not result.ok:
+            logger.warning(f"Readiness check {name} is down: {error}")
+        elif previous is not None and not previous.ok and result.ok:
+            logger.info(f"Readiness check {name} is up")
+
+    async def start(self) -> None:
+        """
+        Run the checks once, then periodically in the background, to be called on application startup.
+        The startup waits for the first results up to the timeout, so the first probe is answered accurately.
+        """
+        if self._task is None:
+            await self.run_checks()
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def _run_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_checks()
+
+    async def close(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    def snapshot(self) -> tuple[bool, dict[str, Any]]:
+        """
+        Read the last results of the checks, without running them.
+
+        :return: Whether all the checks are up, and the probe response with the status, the age and the last latency
+            in seconds of each check.
+        """
+        now = time.monotonic()
+        ready = True
+        checks: dict[str, Any] = {}
+        for name in self._checks:
+            result = self._results.get(name)
+            if result is None:
+                ready = False
+                checks[name] = {"status": "pending"}
+                continue
+            age = now - result.checked_at
+            up = result.ok and age <= self.stale_after
+            ready = ready and up
+            checks[name] = {"status": "up" if up else "down", "age": round(age, 3), "latency": round(result.latency, 6)}
+            if result.error is not None:
+                checks[name]["error"] = result.error
+            elif not up:
+                checks[name]["error"] = "stale"
+        return ready, {"status": "up" if ready else "not ready", "checks": checks}
+
+
+READINESS_REGISTRY = ReadinessRegistry.from_settings()
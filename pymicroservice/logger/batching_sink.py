@@ -0,0 +1,105 @@
+import os
+import queue
+import threading
+import weakref
+from typing import TextIO
+
+_STOP = object()
+# the sinks not stopped yet, restarted in the forked children
+_ACTIVE_SINKS: "weakref.WeakSet[BatchingSink]" = weakref.WeakSet()
+
+
+class BatchingSink:
+    """
+    A loguru sink handing formatted messages to a background writer thread.
+
+    The messages are kept in a bounded queue, and written to the stream in batches, so the logging call never
+    waits on the stream. When the queue is full, messages are either dropped and counted, or the logging
+    call blocks until the writer catches up.
+    """
+
+    def __init__(self, stream: TextIO, queue_size: int = 10000, batch_size: int = 512, block: bool = False):
+        """
+        Initialize the sink and start its writer thread.
+
+        :param stream: The stream the messages are written to, e.g. ``sys.stdout``.
+        :param queue_size: Maximum number of messages waiting to be written.
+        :param batch_size: Maximum number of messages written at once.
+        :param block: Block the logging call when the queue is full, instead of dropping the message.
+        """
+        self.stream = stream
+        self.batch_size = batch_size
+        self.block = block
+        self.queue_size = queue_size
+        self._start()
+        _ACTIVE_SINKS.add(self)
+
+    def _start(self) -> None:
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        if self.block:
+            self._queue.put(message)
+            return
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def isatty(self) -> bool:
+        return self.stream.isatty()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Write the pending messages and stop the writer thread, called by loguru when the handler is removed.
+
+        :param timeout: Maximum number of seconds to wait for the pending messages to be written.
+        """
+        _ACTIVE_SINKS.discard(self)
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = _STOP in batch
+            if stopping:
+                batch = batch[: batch.index(_STOP)]
+            self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch: list) -> None:
+        dropped = self.dropped - self._reported_dropped
+        if dropped:
+            self._reported_dropped += dropped
+            batch.append(f"{dropped} log messages dropped, the log queue is full.\n")
+        if not batch:
+            return
+        try:
+            self.stream.write("".join(batch))
+            self.stream.flush()
+        except (OSError, ValueError):
+            # the stream is gone (closed pipe, interpreter shutdown), nothing left to report to
+            pass
+
+
+def _restart_active_sinks() -> None:
+    for sink in list(_ACTIVE_SINKS):
+        sink._start()
+
+
+# gunicorn forks its workers after the logger is configured, threads don't survive a fork
+os.register_at_fork(after_in_child=_restart_active_sinks)
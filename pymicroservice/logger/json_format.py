@@ -0,0 +1,88 @@
+import json
+import os
+import traceback
+import weakref
+from typing import Any, TextIO
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+# the encoders in use, their pid is encoded again in the forked children
+_ENCODERS: "weakref.WeakSet[CompactJsonEncoder]" = weakref.WeakSet()
+
+
+class CompactJsonEncoder:
+    """
+    Encode a loguru record to a flat JSON line with a fixed field set:
+    ``service``, ``pid``, ``ts``, ``level``, ``logger``, ``function``, ``line``, ``msg``, and when present
+    ``exception`` and ``extra``.
+
+    The static fields are encoded once, only the varying ones are encoded for each record.
+    """
+
+    def __init__(self, service_name: str):
+        self.service_name = service_name
+        self._levels: dict[str, str] = {}
+        self._encode_static_fields()
+        _ENCODERS.add(self)
+
+    def _encode_static_fields(self) -> None:
+        self.pid = os.getpid()
+        self._prefix = f'{{"service":{_encode(self.service_name)},"pid":{self.pid},"ts":"'
+
+    def encode(self, record: dict[str, Any]) -> str:
+        level_name = record["level"].name
+        level = self._levels.get(level_name)
+        if level is None:
+            level = self._levels[level_name] = _encode(level_name)
+
+        line = (
+            f'{self._prefix}{record["time"].isoformat(timespec="milliseconds")}",'
+            f'"level":{level},"logger":{_encode(record["name"])},"function":{_encode(record["function"])},'
+            f'"line":{record["line"]},"msg":{_encode(record["message"])}'
+        )
+
+        exception = record["exception"]
+        if exception is not None:
+            formatted = "".join(traceback.format_exception(exception.type, exception.value, exception.traceback))
+            line += f',"exception":{_encode(formatted)}'
+
+        extra = record["extra"]
+        if extra:
+            line += f',"extra":{_encode(extra)}'
+
+        return line + "}\n"
+
+
+def _encode_static_fields_of_all_encoders() -> None:
+    for encoder in list(_ENCODERS):
+        encoder._encode_static_fields()
+
+
+# gunicorn forks its workers after the logger is configured
+os.register_at_fork(after_in_child=_encode_static_fields_of_all_encoders)
+
+
+class CompactJsonSink:
+    """
+    A loguru sink writing the records encoded by a CompactJsonEncoder to a stream.
+    """
+
+    def __init__(self, stream: TextIO, service_name: str):
+        """
+        Initialize the sink.
+
+        :param stream: The stream the JSON lines are written to, e.g. ``sys.stdout`` or a ``BatchingSink``.
+        :param service_name: The service name written on every line.
+        """
+        self.stream = stream
+        self.encoder = CompactJsonEncoder(service_name)
+        self._flush = getattr(stream, "flush", None)
+
+    def write(self, message: Any) -> None:
+        self.stream.write(self.encoder.encode(message.record))
+        if self._flush is not None:
+            self._flush()
+
+    def stop(self) -> None:
+        stop = getattr(self.stream, "stop", None)
+        if stop is not None:
+            stop()
@@ -1,17 +1,29 @@
 import inspect
 import logging
 import sys
+from typing import Any, Literal
 
 from gunicorn.glogging import Logger
 from loguru import logger
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from pymicroservice.logger.batching_sink import BatchingSink
+from pymicroservice.logger.json_format import CompactJsonSink
+
 
 class LoggerSettings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="LOG_", validate_default=False)
     level: str = "INFO"
     format: str = ""
     json_output: bool = False
+    # "loguru" is the serialized record of loguru, "compact" a flat JSON line with a fixed field set
+    json_format: Literal["loguru", "compact"] = "loguru"
+    service_name: str = "pymicroservice"
+    # write logs from a background thread, in batches
+    async_output: bool = False
+    queue_size: int = 10000
+    batch_size: int = 512
+    queue_full_policy: Literal["drop", "block"] = "drop"
 
 
 LOGGER_CONFIG = LoggerSettings()
@@ -29,6 +41,10 @@ class StubbedGunicornLogger(Logger):
 
 
 class InterceptHandler(logging.Handler):
+    # Depth of the caller by call site: the logging frames between a call site and the handler never change,
+    # the stack is only walked the first time a call site logs.
+    _depths: dict[tuple[str, int], int] = {}
+
     def emit(self, record: logging.LogRecord) -> None:
         # Get corresponding Loguru level if it exists.
         level: str | int
@@ -37,13 +53,22 @@ class InterceptHandler(logging.Handler):
         except ValueError:
             level = record.levelno
 
-        # Find caller from where originated the logged message.
-        frame, depth = inspect.currentframe(), 0
+        call_site = (record.pathname, record.lineno)
+        depth = self._depths.get(call_site)
+        if depth is None:
+            depth = self._depths[call_site] = self._caller_depth()
+
+        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+    @staticmethod
+    def _caller_depth() -> int:
+        # Find caller from where originated the logged message, relative to emit().
+        current_frame = inspect.currentframe()
+        frame, depth = current_frame.f_back if current_frame else None, 0
         while frame and (depth == 0 or frame.f_code.co_filename == logging.__file__):
             frame = frame.f_back
             depth += 1
-
-        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+        return depth
 
 
 logging.basicConfig(handlers=[InterceptHandler()], level=0, force=True)
@@ -61,26 +86,38 @@ class LoggerConfig:
         else:
             cls._setup_simple()
 
+    @classmethod
+    def _handler(cls) -> dict[str, Any]:
+        sink: Any = sys.stdout
+        if LOGGER_CONFIG.async_output:
+            sink = BatchingSink(
+                sys.stdout,
+                queue_size=LOGGER_CONFIG.queue_size,
+                batch_size=LOGGER_CONFIG.batch_size,
+                block=LOGGER_CONFIG.queue_full_policy == "block",
+            )
+        if LOGGER_CONFIG.json_output and LOGGER_CONFIG.json_format == "compact":
+            return {
+                "sink": CompactJsonSink(sink, LOGGER_CONFIG.service_name),
+                "format": "{message}",
+                "level": LOGGER_CONFIG.level,
+            }
+        return {"sink": sink, "serialize": LOGGER_CONFIG.json_output, "level": LOGGER_CONFIG.level}
+
     @classmethod
     def _setup_guvicorn(cls):
         intercept_handler = InterceptHandler()
+        logging.root.handlers = [intercept_handler]
         logging.root.setLevel(LOGGER_CONFIG.level)
 
-        seen = set()
-        for name in [
-            *logging.root.manager.loggerDict.keys(),
-            "gunicorn",
-            "gunicorn.access",
-            "gunicorn.error",
-            "uvicorn",
-            "uvicorn.access",
-            "uvicorn.error",
-        ]:
-            if name not in seen:
-                seen.add(name.split(".")[0])
-                logging.getLogger(name).handlers = [intercept_handler]
-
-        logger.configure(handlers=[{"sink": sys.stdout, "serialize": LOGGER_CONFIG.json_output}])
+        # the other loggers propagate to the intercepted root logger, the loggers of every imported library are not
+        # walked, and their records are not intercepted twice
+        for name in ("gunicorn", "gunicorn.access", "gunicorn.error", "uvicorn", "uvicorn.access", "uvicorn.error"):
+            server_logger = logging.getLogger(name)
+            server_logger.handlers = [intercept_handler]
+            server_logger.propagate = False
+
+        logger.configure(handlers=[cls._handler()])
 
     @classmethod
     def _setup_simple(cls):
@@ -95,4 +132,4 @@ class LoggerConfig:
             logging.getLogger(key).propagate = True
 
         # configure loguru
-        logger.configure(handlers=[{"sink": sys.stdout, "serialize": LOGGER_CONFIG.json_output}])
+        logger.configure(handlers=[cls._handler()])
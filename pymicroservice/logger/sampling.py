@@ -0,0 +1,170 @@
+import sys
+import time
+from types import CodeType
+from typing import Any
+
+from loguru import logger
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from pymicroservice.logger.logger_config import LOGGER_CONFIG
+
+
+class LogSamplingSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="LOG_SAMPLING_", validate_default=False)
+    # e.g. {"pymicroservice.security.oidc": "1/100", "sample.application.user.tasks:user_sample_task": "10/s"}
+    rules: dict[str, str] = {}
+
+
+LOG_SAMPLING_CONFIG = LogSamplingSettings()
+
+_LEVEL_NUMBERS = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+
+class _OneInN:
+    __slots__ = ("n", "seen", "suppressed")
+
+    def __init__(self, n: int):
+        self.n = n
+        self.seen = 0
+        self.suppressed = 0
+
+    def allow(self) -> bool:
+        allowed = self.seen % self.n == 0
+        self.seen += 1
+        if not allowed:
+            self.suppressed += 1
+        return allowed
+
+
+class _PerSecond:
+    __slots__ = ("rate", "tokens", "updated_at", "suppressed")
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self.suppressed = 0
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.suppressed += 1
+        return False
+
+
+def _parse_rule(rule: str) -> tuple[str, float]:
+    value, _, unit = rule.replace(" ", "").partition("/")
+    if value == "1" and unit.isdigit() and int(unit) > 0:
+        return "one_in_n", int(unit)
+    if unit == "s":
+        return "per_second", float(value)
+    raise ValueError(f"Invalid log sampling rule '{rule}', expected '1/N' or 'N/s'.")
+
+
+class LogSampler:
+    """
+    Sample log messages by call site, with rules declared by logger name or by call site.
+
+    A rule is either ``1/N`` (one message out of N) or ``N/s`` (at most N messages per second). Rules are
+    looked up from the most specific key to the least specific one: ``name:function:line``, ``name:function``,
+    ``name``, then the parent packages of ``name``. Each call site gets its own counter, and the rule of a call
+    site is only resolved the first time it logs.
+    """
+
+    def __init__(self, rules: dict[str, str] | None = None):
+        """
+        Initialize the sampler.
+
+        :param rules: Sampling rules by logger name or call site.
+        """
+        self.rules = {key: _parse_rule(rule) for key, rule in (rules or {}).items()}
+        self._samplers: dict[tuple[CodeType, int], _OneInN | _PerSecond | None] = {}
+        self._call_sites: dict[tuple[CodeType, int], str] = {}
+
+    def allow(self, name: str, code: CodeType, line: int) -> bool:
+        """
+        Whether the message logged at a call site should be emitted.
+
+        :param name: The logger name, i.e. the module name of the call site.
+        :param code: The code object of the call site.
+        :param line: The line of the call site.
+        """
+        key = (code, line)
+        try:
+            sampler = self._samplers[key]
+        except KeyError:
+            sampler = self._samplers[key] = self._resolve(name, code.co_name, line)
+            self._call_sites[key] = f"{name}:{code.co_name}:{line}"
+        return sampler is None or sampler.allow()
+
+    def _resolve(self, name: str, function: str, line: int) -> _OneInN | _PerSecond | None:
+        keys = [f"{name}:{function}:{line}", f"{name}:{function}", name]
+        parts = name.split(".")
+        keys.extend(".".join(parts[:i]) for i in range(len(parts) - 1, 0, -1))
+
+        for rule_key in keys:
+            rule = self.rules.get(rule_key)
+            if rule is not None:
+                kind, value = rule
+                return _OneInN(int(value)) if kind == "one_in_n" else _PerSecond(value)
+        return None
+
+    def suppressed(self) -> dict[str, int]:
+        """
+        Number of suppressed messages by call site.
+        """
+        return {
+            self._call_sites[key]: sampler.suppressed
+            for key, sampler in list(self._samplers.items())
+            if sampler is not None and sampler.suppressed
+        }
+
+
+LOG_SAMPLER = LogSampler(LOG_SAMPLING_CONFIG.rules)
+
+
+class SampledLogger:
+    """
+    A loguru facade applying the sampling rules before a message is formatted.
+
+    Suppressed messages are only counted, see ``LogSampler.suppressed``::
+
+        from pymicroservice.logger.sampling import sampled_logger
+
+        sampled_logger.debug("JWT token decoded: {}", jwt_token_object)
+    """
+
+    def __init__(self, sampler: LogSampler = LOG_SAMPLER):
+        self.sampler = sampler
+
+    def _log(self, level: str, message: str, args: tuple, kwargs: dict[str, Any]) -> None:
+        # the level of the loguru handler, see LoggerConfig: a message it drops is neither sampled nor counted
+        if _LEVEL_NUMBERS[level] < _LEVEL_NUMBERS.get(LOGGER_CONFIG.level.upper(), 0):
+            return
+        if self.sampler.rules:
+            frame = sys._getframe(2)
+            if not self.sampler.allow(frame.f_globals["__name__"], frame.f_code, frame.f_lineno):
+                return
+        logger.opt(depth=2).log(level, message, *args, **kwargs)
+
+    def trace(self, message: str, *args: Any, **kwargs: Any) -> None:
+        self._log("TRACE", message, args, kwargs)
+
+    def debug(self, message: str, *args: Any, **kwargs: Any) -> None:
+        self._log("DEBUG", message, args, kwargs)
+
+    def info(self, message: str, *args: Any, **kwargs: Any) -> None:
+        self._log("INFO", message, args, kwargs)
+
+    def warning(self, message: str, *args: Any, **kwargs: Any) -> None:
+        self._log("WARNING", message, args, kwargs)
+
+    def error(self, message: str, *args: Any, **kwargs: Any) -> None:
+        self._log("ERROR", message, args, kwargs)
+
+
+sampled_logger = SampledLogger()
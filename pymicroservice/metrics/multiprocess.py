@@ -0,0 +1,37 @@
+import glob
+import os
+import tempfile
+from typing import Any
+
+# read by prometheus_client when it's imported, the metrics of each process are then written to this directory
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+
+def prepare_multiprocess_dir(workers: int) -> str | None:
+    """
+    Prepare the directory aggregating the metrics of the gunicorn workers, to be called before prometheus_client is
+    imported. The metrics of a previous run are removed, a temporary directory is used when none is configured.
+
+    :param workers: The number of gunicorn workers, a single worker keeps its metrics in memory.
+    :return: The metrics directory, or None if the metrics are kept in memory.
+    """
+    directory = os.environ.get(MULTIPROC_DIR_ENV)
+    if not directory:
+        if workers <= 1:
+            return None
+        directory = os.environ[MULTIPROC_DIR_ENV] = tempfile.mkdtemp(prefix="prometheus-")
+
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+    return directory
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    """
+    Gunicorn ``child_exit`` hook, the live gauges of a dead worker are not reported anymore.
+    """
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,144 @@
+import os
+import time
+from typing import Any
+
+from fastapi import APIRouter, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from pymicroservice.metrics.multiprocess import MULTIPROC_DIR_ENV
+
+
+class MetricsSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="METRICS_", validate_default=False)
+    enabled: bool = True
+    path: str = "/metrics"
+
+
+METRICS_CONFIG = MetricsSettings()
+
+# fast operations, from 100µs to 100ms
+_FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duration of the HTTP requests, by route template.",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Number of HTTP requests being served.",
+    multiprocess_mode="livesum",
+)
+JWT_VERIFICATION_DURATION = Histogram(
+    "jwt_verification_duration_seconds",
+    "Duration of the verification of the JWT access tokens, by result: cached, valid, expired or invalid.",
+    ["result"],
+    buckets=_FAST_BUCKETS,
+)
+JWKS_FETCH_DURATION = Histogram(
+    "jwks_fetch_duration_seconds",
+    "Duration of the fetches of the JWK Set, by result: success or failure.",
+    ["result"],
+)
+TASK_PUBLISH_DURATION = Histogram(
+    "task_publish_duration_seconds",
+    "Duration of the publishing of tasks to the broker, from their submission, by result: success or failure.",
+    ["result"],
+    buckets=_FAST_BUCKETS,
+)
+TASK_STATUS_LOOKUP_DURATION = Histogram(
+    "task_status_lookup_duration_seconds",
+    "Duration of the lookups of task states in the result backend, by result: success or failure.",
+    ["result"],
+    buckets=_FAST_BUCKETS,
+)
+
+# the hit ratio is rate(hit) / rate(hit + miss), counters are aggregated correctly over the processes
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests",
+    "Lookups of the response caches, by cache and result: hit or miss.",
+    ["cache", "result"],
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections",
+    "Task submissions rejected by the admission control, by route template and reason: queue_depth or in_flight.",
+    ["route", "reason"],
+)
+TASK_QUEUE_DEPTH = Gauge(
+    "task_queue_depth",
+    "Number of messages waiting in a broker queue, as last read by the admission control.",
+    ["queue"],
+    multiprocess_mode="livemax",
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware measuring the duration of the HTTP requests by route template, and the requests in progress.
+
+    The route template, e.g. ``/api/v1/worker/task/{task_id}``, keeps the number of series bounded: the requests
+    matching no route are reported under ``unmatched``.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+def collect_metrics() -> bytes:
+    """
+    Render the metrics in the Prometheus text format, aggregated over the processes sharing the metrics directory.
+    """
+    if not os.environ.get(MULTIPROC_DIR_ENV):
+        return generate_latest(REGISTRY)
+
+    from prometheus_client import multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def build_metrics_router(path: str = "/metrics") -> APIRouter:
+    router = APIRouter()
+
+    @router.get(path, tags=["metrics"], include_in_schema=False)
+    async def metrics() -> Response:
+        """
+        Prometheus metrics of the application.
+        """
+        return Response(collect_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+    return router
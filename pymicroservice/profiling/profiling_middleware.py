@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import random
+import re
+import tempfile
+import time
+from typing import Any
+
+from loguru import logger
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from pymicroservice.profiling.stack_profiler import StackProfiler
+
+
+class ProfilingSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="PROFILING_", validate_default=False)
+    enabled: bool = False
+    # fraction of the requests profiled, e.g. 0.001
+    sample_rate: float = 0.0
+    # requests carrying a token signed with this secret in the header are profiled, disabled if empty
+    secret: str = ""
+    header: str = "X-Profile"
+    output_dir: str = os.path.join(tempfile.gettempdir(), "pymicroservice-profiles")
+
+
+PROFILING_CONFIG = ProfilingSettings()
+
+
+def sign_profiling_token(secret: str, ttl: float = 300, now: float | None = None) -> str:
+    """
+    Sign a token selecting the requests carrying it for profiling, until it expires.
+
+    :param secret: The secret of the profiling middleware.
+    :param ttl: Number of seconds the token is valid.
+    :return: The token, ``<expiry timestamp>.<signature>``.
+    """
+    expires = str(int((time.time() if now is None else now) + ttl))
+    return f"{expires}.{hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()}"
+
+
+def verify_profiling_token(secret: str, token: str, now: float | None = None) -> bool:
+    """
+    Whether a token is signed with the secret and not expired.
+    """
+    expires, _, signature = token.partition(".")
+    if not secret or not expires.isdigit():
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected) and int(expires) >= (time.time() if now is None else now)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling the requests selected by a signed header or by the sample rate, from the dependencies
+    of the route to the serialization of the response. The stacks of each profiled request are written to a
+    ``.collapsed`` file of the output directory, ready for flamegraph.pl, speedscope or inferno.
+
+    The profile hook is installed for the whole event loop thread while a request is profiled: the concurrent
+    requests aren't recorded, but each of their calls goes through the hook until the profiled request completes.
+    When no request is profiled, the other requests only pay for the selection.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        sample_rate: float = 0.0,
+        secret: str = "",
+        header: str = "X-Profile",
+        output_dir: str = PROFILING_CONFIG.output_dir,
+    ):
+        """
+        :param app: The ASGI application.
+        :param sample_rate: Fraction of the requests profiled.
+        :param secret: The secret of the tokens selecting a request in the header, disabled if empty.
+        :param header: The name of the header carrying the token.
+        :param output_dir: The directory of the profiles, created if needed.
+        """
+        self.app = app
+        self.sample_rate = sample_rate
+        self.secret = secret
+        self.header = header.lower().encode("latin-1")
+        self.output_dir = output_dir
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = StackProfiler()
+        started_at = time.time()
+        try:
+            await profiler.run(self.app(scope, receive, send))
+        finally:
+            route = getattr(scope.get("route"), "path", scope["path"])
+            await asyncio.to_thread(self._write, profiler, f"{scope['method']} {route}", started_at)
+
+    def _selected(self, scope: dict) -> bool:
+        if self.secret:
+            for name, value in scope["headers"]:
+                if name == self.header:
+                    return verify_profiling_token(self.secret, value.decode("latin-1"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _write(self, profiler: StackProfiler, request: str, started_at: float) -> None:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", request).strip("_")
+        path = os.path.join(self.output_dir, f"{int(started_at * 1000)}-{os.getpid()}-{slug}.collapsed")
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(path, "w") as file:
+                file.write(profiler.collapsed(request))
+            logger.info("Profile of {} written to {}", request, path)
+        except OSError as e:
+            logger.error(f"Failed to write the profile of {request} to {path}: {e}")
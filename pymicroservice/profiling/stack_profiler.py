@@ -0,0 +1,160 @@
+import dis
+import os
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Awaitable
+from contextvars import ContextVar
+from types import CodeType, FrameType
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# the profiler of the request run by the current task
+_ACTIVE_PROFILER: ContextVar["StackProfiler | None"] = ContextVar("active_stack_profiler", default=None)
+
+AWAIT_FRAME = "<await>"
+
+_YIELD_VALUE = dis.opmap["YIELD_VALUE"]
+_RESUME = dis.opmap["RESUME"]
+
+
+def _suspended(frame: FrameType) -> bool:
+    # whether a frame returning to its caller yields, i.e. a coroutine is suspended: its last instruction is the
+    # yield up to Python 3.12, the RESUME following the yield from Python 3.13
+    code = frame.f_code.co_code
+    lasti = frame.f_lasti
+    if code[lasti] == _YIELD_VALUE:
+        return True
+    return code[lasti] == _RESUME and lasti >= 2 and code[lasti - 2] == _YIELD_VALUE
+
+
+def _dispatch(frame: FrameType, event: str, arg: Any) -> None:
+    profiler = _ACTIVE_PROFILER.get()
+    if profiler is not None:
+        profiler._on_event(frame, event, arg)
+
+
+class StackProfiler:
+    """
+    A deterministic profiler of a coroutine, recording the wall time spent in each call stack.
+
+    The profile hook is installed on the event loop thread while at least one coroutine is profiled, and only the
+    events of the task running a profiled coroutine are recorded, so concurrent requests don't pollute its stacks.
+    The hook is still called for every call of the thread meanwhile, the events of the other tasks are dropped
+    first thing, by the lookup of the profiler of the running task.
+    The time a coroutine waits, e.g. for I/O, is attributed to the stack it's suspended in, under ``<await>``.
+    Tasks spawned by the coroutine and functions run in threads are not profiled.
+    """
+
+    _running = 0
+    _previous_hook: Any = None
+    _labels: dict[CodeType, str] = {}
+
+    def __init__(self) -> None:
+        self.stacks: dict[tuple[str, ...], float] = defaultdict(float)
+        self._root: FrameType | None = None
+        self._last_stack: tuple[str, ...] = ()
+        self._last_time = 0.0
+        self._unwound_from: tuple[str, ...] | None = None
+
+    async def run(self, coroutine: Awaitable[T]) -> T:
+        """
+        Await a coroutine while recording its call stacks.
+
+        :param coroutine: The coroutine to profile, awaited in the current task.
+        :return: The result of the coroutine.
+        """
+        self._root = sys._getframe()
+        self._install()
+        self._last_time = time.perf_counter()
+        token = _ACTIVE_PROFILER.set(self)
+        try:
+            return await coroutine
+        finally:
+            _ACTIVE_PROFILER.reset(token)
+            self._add_elapsed(time.perf_counter())
+            self._uninstall()
+
+    @classmethod
+    def _install(cls) -> None:
+        if cls._running == 0:
+            cls._previous_hook = sys.getprofile()
+            sys.setprofile(_dispatch)
+        cls._running += 1
+
+    @classmethod
+    def _uninstall(cls) -> None:
+        cls._running -= 1
+        if cls._running == 0:
+            sys.setprofile(cls._previous_hook)
+            cls._previous_hook = None
+
+    @classmethod
+    def _label(cls, code: CodeType) -> str:
+        label = cls._labels.get(code)
+        if label is None:
+            label = cls._labels[code] = (
+                f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+        return label
+
+    def _stack(self, frame: FrameType | None) -> tuple[str, ...] | None:
+        # the stack from the profiled coroutine to the frame, None for the frames of other tasks
+        labels = []
+        while frame is not None and frame is not self._root:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        if frame is None:
+            return None
+        labels.reverse()
+        return tuple(labels)
+
+    def _add_elapsed(self, now: float) -> None:
+        self.stacks[self._last_stack] += now - self._last_time
+        self._last_time = now
+
+    def _on_event(self, frame: FrameType, event: str, arg: Any) -> None:
+        now = time.perf_counter()
+        if frame is self._root:
+            if event not in ("call", "return"):
+                return
+            self._add_elapsed(now)
+            # the coroutine is suspended: the wait goes to the stack it unwound from, until it's resumed
+            self._last_stack = (*(self._unwound_from or ()), AWAIT_FRAME) if event == "return" else ()
+            self._unwound_from = None
+            return
+
+        stack = self._stack(frame)
+        if stack is None:
+            return
+        self._add_elapsed(now)
+        if event == "call":
+            self._unwound_from = None
+            self._last_stack = stack
+        elif event == "return":
+            if not _suspended(frame):
+                self._unwound_from = None
+            elif self._unwound_from is None:
+                # the innermost frame of a suspension
+                self._unwound_from = stack
+            self._last_stack = stack[:-1]
+        elif event == "c_call":
+            self._unwound_from = None
+            self._last_stack = (*stack, f"{getattr(arg, '__qualname__', arg)} (built-in)")
+        else:
+            self._last_stack = stack
+
+    def collapsed(self, root: str = "request") -> str:
+        """
+        Render the recorded stacks in the collapsed format of flamegraph.pl, speedscope or inferno, one line per stack
+        with its wall time in microseconds.
+
+        :param root: The label of the bottom frame of all the stacks, e.g. the route of the request.
+        """
+        lines = []
+        for stack, seconds in self.stacks.items():
+            microseconds = round(seconds * 1_000_000)
+            if microseconds > 0:
+                lines.append(f"{';'.join((root, *stack))} {microseconds}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,197 @@
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+import jwt
+from loguru import logger
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from pymicroservice.metrics.prometheus_metrics import JWKS_FETCH_DURATION
+
+
+class JwksStoreSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="OIDC_JWKS_", validate_default=False)
+    refresh_interval: float = 300
+    min_refresh_interval: float = 30
+    timeout: float = 10
+
+
+JWKS_STORE_CONFIG = JwksStoreSettings()
+
+
+class AsyncJwksStore:
+    """
+    An asyncio-native store of the signing keys published on a JWKS endpoint.
+
+    Keys are indexed by ``kid``. Fetches never block the event loop, concurrent lookups of an unknown ``kid``
+    share a single fetch, and fetches triggered by unknown ``kid`` values are rate-limited so forged tokens
+    can't force a flood of JWKS downloads. Once the key set is older than ``refresh_interval``, it is
+    refreshed in the background while the current keys keep being served.
+    """
+
+    def __init__(
+        self,
+        jwks_uri: str,
+        refresh_interval: float = 300,
+        min_refresh_interval: float = 30,
+        timeout: float = 10,
+    ):
+        """
+        Initialize the JWKS store, no key is fetched until the first lookup or refresh.
+
+        :param jwks_uri: The URL of the JWKS endpoint.
+        :param refresh_interval: Number of seconds after which the key set is refreshed in the background.
+        :param min_refresh_interval: Minimum number of seconds between two fetches triggered by an unknown kid.
+        :param timeout: Timeout in seconds of a JWKS fetch.
+        """
+        self.jwks_uri = jwks_uri
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self.jwks: dict[str, Any] | None = None
+        self._keys: dict[str | None, jwt.PyJWK] = {}
+        self._fetched_at: float | None = None
+        self._last_attempt: float | None = None
+        self._inflight: asyncio.Future[bool] | None = None
+        # referenced until done, the event loop only keeps a weak reference to its tasks
+        self._background_refresh: asyncio.Future[bool] | None = None
+        self._rotation_listeners: list[Callable[[], None]] = []
+        self._load_listeners: list[Callable[[dict[str, Any]], None]] = []
+
+    @classmethod
+    def from_settings(cls, jwks_uri: str, settings: JwksStoreSettings = JWKS_STORE_CONFIG) -> "AsyncJwksStore":
+        return cls(jwks_uri, settings.refresh_interval, settings.min_refresh_interval, settings.timeout)
+
+    @property
+    def loaded(self) -> bool:
+        return self._fetched_at is not None
+
+    def add_rotation_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Register a callback called when a previously published key is withdrawn from the key set.
+
+        :param listener: A callable without arguments, e.g. ``TokenCache.invalidate``.
+        """
+        self._rotation_listeners.append(listener)
+
+    def add_load_listener(self, listener: Callable[[dict[str, Any]], None]) -> None:
+        """
+        Register a callback called with the JWK Set each time a key set is loaded.
+
+        :param listener: A callable taking the JWK Set as argument.
+        """
+        self._load_listeners.append(listener)
+
+    def load_jwks(self, jwks: dict[str, Any]) -> None:
+        """
+        Replace the indexed keys with the signing keys of a JWK Set.
+
+        :param jwks: The JWK Set as returned by the JWKS endpoint.
+        :raises jwt.PyJWKSetError: If the JWK Set contains no usable keys.
+        """
+        jwk_set = jwt.PyJWKSet.from_dict(jwks)
+        keys = {key.key_id: key for key in jwk_set.keys if key.public_key_use in ("sig", None)}
+        withdrawn = self._keys.keys() - keys.keys()
+
+        self.jwks = jwks
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+        for load_listener in self._load_listeners:
+            load_listener(jwks)
+
+        if withdrawn:
+            logger.info("JWKS keys rotated, withdrawn kids: {}", withdrawn)
+            for listener in self._rotation_listeners:
+                listener()
+
+    async def refresh(self) -> bool:
+        """
+        Fetch the key set, concurrent calls share the same fetch.
+
+        :return: True if the key set was fetched, False if the fetch failed.
+        """
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch())
+            self._inflight.add_done_callback(self._clear_inflight)
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, _: asyncio.Future) -> None:
+        self._inflight = None
+
+    async def _fetch(self) -> bool:
+        # the attempt itself starts the rate-limit window, a failing endpoint must not be hammered either
+        self._last_attempt = time.monotonic()
+        start = time.perf_counter()
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.get(self.jwks_uri)
+                response.raise_for_status()
+            self.load_jwks(response.json())
+            logger.debug("JWKS loaded from {}: {}", self.jwks_uri, list(self._keys))
+            JWKS_FETCH_DURATION.labels("success").observe(time.perf_counter() - start)
+            return True
+        except (httpx.HTTPError, ValueError, jwt.PyJWTError) as e:
+            logger.error(f"Failed to fetch JWKS from {self.jwks_uri}: {e}")
+            JWKS_FETCH_DURATION.labels("failure").observe(time.perf_counter() - start)
+            return False
+
+    def _is_stale(self, now: float) -> bool:
+        return self._fetched_at is not None and now - self._fetched_at >= self.refresh_interval
+
+    def _can_refetch(self, now: float) -> bool:
+        return self._last_attempt is None or now - self._last_attempt >= self.min_refresh_interval
+
+    async def get_signing_key(self, kid: str | None) -> jwt.PyJWK:
+        """
+        Retrieve the signing key matching a kid, fetching the key set if the kid is unknown.
+
+        :param kid: The key ID to look up.
+        :return: The matching signing key.
+        :raises jwt.PyJWKClientError: If no matching key is found.
+        """
+        now = time.monotonic()
+        key = self._keys.get(kid)
+        if key is not None:
+            if self._is_stale(now) and self._inflight is None:
+                # serve the current key, the refresh happens in the background
+                self._background_refresh = asyncio.ensure_future(self.refresh())
+            return key
+
+        if self._inflight is not None or self._can_refetch(now):
+            await self.refresh()
+
+        return self.get_cached_signing_key(kid)
+
+    async def get_signing_key_from_jwt(self, token: str) -> jwt.PyJWK:
+        """
+        Retrieve the signing key matching the kid header of a token.
+
+        :param token: The encoded JWT.
+        :return: The matching signing key.
+        """
+        return await self.get_signing_key(jwt.get_unverified_header(token).get("kid"))
+
+    def get_cached_signing_key(self, kid: str | None) -> jwt.PyJWK:
+        """
+        Retrieve the signing key matching a kid without any I/O.
+
+        :param kid: The key ID to look up.
+        :return: The matching signing key.
+        :raises jwt.PyJWKClientError: If no matching key is loaded.
+        """
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.PyJWKClientError(f'Unable to find a signing key that matches: "{kid}"')
+        return key
+
+    def get_cached_signing_key_from_jwt(self, token: str) -> jwt.PyJWK:
+        """
+        Retrieve the signing key matching the kid header of a token without any I/O.
+
+        :param token: The encoded JWT.
+        :return: The matching signing key.
+        """
+        return self.get_cached_signing_key(jwt.get_unverified_header(token).get("kid"))
@@ -1,32 +1,81 @@
-from asyncio import Lock
+import time
+from asyncio import CancelledError, Lock
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
 
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from loguru import logger
 
+from pymicroservice.logger.sampling import sampled_logger
+from pymicroservice.metrics.prometheus_metrics import JWT_VERIFICATION_DURATION
 from pymicroservice.security.oidc_config_loader import OidcConfig, OidcConfigLoader
-from pymicroservice.security.token import (
-    JWTAccessToken,
-    map_payload_to_jwt_access_token,
-)
+from pymicroservice.security.token import REQUIRED_CLAIMS, JWTAccessToken
 
 SECURITY_BEARER = HTTPBearer()
 
 
 class OidcConfigSingleton:
     _instance: OidcConfig | None = None
+    _loader: OidcConfigLoader | None = None
     _lock = Lock()
 
     @classmethod
     async def get_instance(cls):
-        if cls._instance is None:
+        if cls._loader is None:
             async with cls._lock:  # Ensure thread safety
-                if cls._instance is None:
+                if cls._loader is None:
                     loader = OidcConfigLoader()
-                    cls._instance = loader.load()
+                    cls._instance = await loader.load()
+                    cls._loader = loader
         return cls._instance
 
+    @classmethod
+    async def initialize(cls) -> None:
+        """
+        Eagerly load the OIDC configuration and its signing keys, to be called on application startup.
+        On failure, the loading is retried by the readiness check, see ``load``.
+        """
+        try:
+            await cls.get_instance()
+        except Exception as e:
+            logger.error(f"OIDC configuration not loaded on startup: {e}")
+
+    @classmethod
+    async def load(cls) -> bool:
+        """
+        Load the OIDC configuration and its signing keys if they aren't yet, e.g. when the provider was down on
+        startup. A not ready process receives no protected request, the loading must be retried apart from them.
+
+        :return: Whether protected requests can be served, see ``is_ready``.
+        :raises httpx.HTTPError: If the OIDC configuration can't be fetched.
+        :raises ValueError: If the OIDC configuration is invalid.
+        """
+        if cls._loader is None and not OidcConfigLoader().enabled:
+            return True
+        oidc_config = await cls.get_instance()
+        if oidc_config is not None and not oidc_config.key_store.loaded:
+            await oidc_config.key_store.refresh()
+        return cls.is_ready()
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        """
+        Whether protected requests can be served: OIDC is disabled or its signing keys are loaded.
+        """
+        if cls._loader is None:
+            return not OidcConfigLoader().enabled
+        return cls._instance is None or cls._instance.key_store.loaded
+
+    @classmethod
+    async def close(cls) -> None:
+        revalidation = cls._loader.revalidation if cls._loader is not None else None
+        if revalidation is not None and not revalidation.done():
+            revalidation.cancel()
+            with suppress(CancelledError):
+                await revalidation
+
 
 async def get_oidc_config() -> OidcConfig:
     return await OidcConfigSingleton.get_instance()
@@ -36,31 +85,47 @@ def decode_jwt_token(
     token: str,
     oidc_config: OidcConfig,
 ) -> JWTAccessToken:
+    start = time.perf_counter()
+    result = "invalid"
     try:
-        signing_key = oidc_config.jwks_client.get_signing_key_from_jwt(token).key
+        token_cache = oidc_config.token_cache
+        if token_cache is not None:
+            cached_token = token_cache.get(token)
+            if cached_token is not None:
+                result = "cached"
+                return cached_token
+
+        signing_key = oidc_config.key_store.get_cached_signing_key_from_jwt(token).key
         payload = jwt.decode(
             token,
             signing_key,
             algorithms=oidc_config.signing_algos,
             audience=oidc_config.audience,
+            options={"require": REQUIRED_CLAIMS},
         )
 
-        jwt_token_object: JWTAccessToken = map_payload_to_jwt_access_token(payload)
-        logger.debug("JWT token decoded: {}", jwt_token_object)
+        jwt_token_object = JWTAccessToken.from_payload(payload)
+        sampled_logger.debug("JWT token decoded: {}", jwt_token_object)
+        if token_cache is not None:
+            token_cache.put(token, jwt_token_object)
+        result = "valid"
         return jwt_token_object
 
     except jwt.ExpiredSignatureError as e:
+        result = "expired"
         logger.debug("JWT expired token error: {}", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Bearer token has expired.",
         ) from e
-    except jwt.InvalidTokenError as e:
+    except (jwt.InvalidTokenError, jwt.PyJWKClientError) as e:
         logger.debug("JWT invalid token error: {}", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Bearer token is invalid.",
         ) from e
+    finally:
+        JWT_VERIFICATION_DURATION.labels(result).observe(time.perf_counter() - start)
 
 
 security_bearer_dependency = Depends(SECURITY_BEARER)
@@ -72,4 +137,51 @@ async def oidc_auth(
     oidc_config: OidcConfig = get_oidc_config_dependency,
 ) -> JWTAccessToken:
     token = credentials.credentials
+    # a cached token is served by decode_jwt_token without any signing key
+    if oidc_config is not None and (oidc_config.token_cache is None or token not in oidc_config.token_cache):
+        # make sure the signing key is loaded without blocking the event loop,
+        # an invalid token is reported by decode_jwt_token
+        with suppress(jwt.PyJWTError):
+            await oidc_config.key_store.get_signing_key_from_jwt(token)
     return decode_jwt_token(token, oidc_config)
+
+
+oidc_auth_dependency = Depends(oidc_auth)
+
+
+def require_roles(*roles: str, client_id: str | None = None) -> Callable[..., Awaitable[JWTAccessToken]]:
+    """
+    Build a dependency authenticating the request and requiring all the roles, e.g.
+    ``access_token: JWTAccessToken = Depends(require_roles("admin"))``.
+
+    :param roles: The required roles.
+    :param client_id: The client of the roles, the realm roles by default.
+    :return: The dependency, answering 403 when a role is missing.
+    """
+    required = frozenset(roles)
+
+    async def check_roles(access_token: JWTAccessToken = oidc_auth_dependency) -> JWTAccessToken:
+        granted = access_token.roles if client_id is None else access_token.client_roles(client_id)
+        if not required <= granted:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Missing required roles.")
+        return access_token
+
+    return check_roles
+
+
+def require_scopes(*scopes: str) -> Callable[..., Awaitable[JWTAccessToken]]:
+    """
+    Build a dependency authenticating the request and requiring all the scopes, e.g.
+    ``access_token: JWTAccessToken = Depends(require_scopes("tasks:write"))``.
+
+    :param scopes: The required scopes.
+    :return: The dependency, answering 403 when a scope is missing.
+    """
+    required = frozenset(scopes)
+
+    async def check_scopes(access_token: JWTAccessToken = oidc_auth_dependency) -> JWTAccessToken:
+        if not required <= access_token.scopes:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Missing required scopes.")
+        return access_token
+
+    return check_scopes
@@ -1,17 +1,26 @@
+import asyncio
 import os
+import time
 from dataclasses import dataclass
+from typing import cast
 
+import httpx
 import jwt
-import requests
 from loguru import logger
 
+from pymicroservice.security.jwks_store import JWKS_STORE_CONFIG, AsyncJwksStore
+from pymicroservice.security.oidc_discovery_cache import OidcDiscoveryCache
+from pymicroservice.security.shared_jwks_store import SharedJwksStore
+from pymicroservice.security.token_cache import TokenCache, build_token_cache
+
 
 @dataclass
 class OidcConfig:
     signing_algos: list[str]
     jwks_uri: str
-    jwks_client: jwt.PyJWKClient
+    key_store: AsyncJwksStore
     audience: str
+    token_cache: TokenCache | None = None
 
 
 class OidcConfigLoader:
@@ -23,20 +32,40 @@ class OidcConfigLoader:
         self,
         config_url_env: str = "OIDC_CONFIGURATION_URL",
         audience_env: str = "OIDC_AUDIENCE",
+        cache_path_env: str = "OIDC_DISCOVERY_CACHE_PATH",
+        cache_shared_env: str = "OIDC_DISCOVERY_CACHE_SHARED",
     ):
         """
         Initialize the OIDC configuration loader.
 
         :param config_url_env: Name of the environment variable containing the OIDC configuration URL.
         :param audience_env: Name of the environment variable containing the audience.
+        :param cache_path_env: Name of the environment variable containing the path of the discovery cache file.
+        :param cache_shared_env: Name of the environment variable enabling the sharing of the discovery cache file
+            by the processes of a host, e.g. the gunicorn workers.
         """
         self.config_url_env = config_url_env
         self.audience_env = audience_env
+        self.cache_path_env = cache_path_env
+        self.cache_shared_env = cache_shared_env
         self.config: OidcConfig | None = None
+        self.revalidation: asyncio.Task | None = None
+        self._discovery: dict = {}
 
-    def load(self) -> OidcConfig | None:
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether OIDC security is configured.
         """
-        Load the OIDC configuration.
+        return bool(os.getenv(self.config_url_env))
+
+    async def load(self) -> OidcConfig | None:
+        """
+        Load the OIDC configuration and its signing keys.
+
+        When a discovery cache file is configured and valid, the configuration is served from it right away
+        and revalidated in the background, see ``revalidation``. When the cache file is shared, the configuration
+        and its key set are fetched by a single process and read from the file by the others, see ``SharedJwksStore``.
 
         :return: An instance of OidcConfig or None if the configuration is invalid.
         """
@@ -53,8 +82,89 @@ class OidcConfigLoader:
         if not audience:
             raise OSError(f"{self.audience_env} not found in environment variables.")
 
-        oidc_config = self._fetch_oidc_config(oidc_config_url)
+        cache_path = os.getenv(self.cache_path_env)
+        cache = OidcDiscoveryCache(cache_path) if cache_path else None
+        if cache is not None and os.getenv(self.cache_shared_env, "false").lower() == "true":
+            self.config = await self._load_shared(oidc_config_url, audience, cache)
+            logger.debug("OIDC configuration loaded: {}", self.config)
+            return self.config
+
+        cached = cache.read(oidc_config_url) if cache else None
+
+        if cached is not None:
+            self.config = self._build_config(oidc_config_url, cached.discovery, audience)
+            if cached.jwks:
+                try:
+                    self.config.key_store.load_jwks(cached.jwks)
+                except jwt.PyJWTError as e:
+                    logger.warning(f"Ignoring invalid JWKS of OIDC discovery cache {cache_path}: {e}")
+            logger.info(f"OIDC configuration loaded from cache {cache_path}")
+        else:
+            self.config = self._build_config(oidc_config_url, await self._fetch_oidc_config(oidc_config_url), audience)
+
+        if cache is not None:
+            self.config.key_store.add_load_listener(lambda jwks: cache.write(oidc_config_url, self._discovery, jwks))
+
+        if cached is not None:
+            self.revalidation = asyncio.ensure_future(self._revalidate(oidc_config_url))
+        else:
+            await self.config.key_store.refresh()
+
+        logger.debug("OIDC configuration loaded: {}", self.config)
+        return self.config
+
+    async def _load_shared(self, oidc_config_url: str, audience: str, cache: OidcDiscoveryCache) -> OidcConfig:
+        """
+        Load the OIDC configuration from the shared discovery cache, only the first process finding it missing
+        or expired fetches it, the others wait for it.
+        """
+        async with cache.locked():
+            cached = cache.read(oidc_config_url)
+            if (
+                cached is not None
+                and cached.jwks
+                and time.time() - cached.fetched_at < JWKS_STORE_CONFIG.refresh_interval
+            ):
+                config = self._build_config(oidc_config_url, cached.discovery, audience, cache)
+                try:
+                    cast(SharedJwksStore, config.key_store).load_cached(cached)
+                    logger.info(f"OIDC configuration loaded from shared cache {cache.path}")
+                    return config
+                except jwt.PyJWTError as e:
+                    logger.warning(f"Ignoring invalid JWKS of OIDC discovery cache {cache.path}: {e}")
+
+            config = self._build_config(
+                oidc_config_url, await self._fetch_oidc_config(oidc_config_url), audience, cache
+            )
+            await cast(SharedJwksStore, config.key_store).fetch_and_share()
+            return config
+
+    def _build_config(
+        self, oidc_config_url: str, oidc_config: dict, audience: str, shared_cache: OidcDiscoveryCache | None = None
+    ) -> OidcConfig:
+        signing_algos, jwks_uri = self._parse_oidc_config(oidc_config_url, oidc_config)
+
+        key_store: AsyncJwksStore
+        if shared_cache is None:
+            key_store = AsyncJwksStore.from_settings(jwks_uri)
+        else:
+            key_store = SharedJwksStore(
+                shared_cache,
+                oidc_config_url,
+                oidc_config,
+                jwks_uri,
+                JWKS_STORE_CONFIG.refresh_interval,
+                JWKS_STORE_CONFIG.min_refresh_interval,
+                JWKS_STORE_CONFIG.timeout,
+            )
+        token_cache = build_token_cache()
+        if token_cache is not None:
+            key_store.add_rotation_listener(token_cache.invalidate)
+
+        self._discovery = oidc_config
+        return OidcConfig(signing_algos, jwks_uri, key_store, audience, token_cache)
 
+    def _parse_oidc_config(self, oidc_config_url: str, oidc_config: dict) -> tuple[list[str], str]:
         signing_algos = oidc_config.get("id_token_signing_alg_values_supported")
         if not signing_algos:
             raise ValueError(
@@ -69,13 +179,30 @@ class OidcConfigLoader:
                 f"Check environment variable {self.config_url_env}={oidc_config_url}."
             )
 
-        jwks_client = jwt.PyJWKClient(jwks_uri)
-        self.config = OidcConfig(signing_algos, jwks_uri, jwks_client, audience)
+        return signing_algos, jwks_uri
 
-        logger.debug("OIDC configuration loaded: {}", self.config)
-        return self.config
+    async def _revalidate(self, oidc_config_url: str) -> None:
+        """
+        Refresh a configuration loaded from the discovery cache, the cached one is kept on failure.
 
-    def _fetch_oidc_config(self, url: str) -> dict:
+        :param oidc_config_url: The OIDC configuration URL.
+        """
+        if self.config is None:
+            return
+
+        try:
+            oidc_config = await self._fetch_oidc_config(oidc_config_url)
+            signing_algos, jwks_uri = self._parse_oidc_config(oidc_config_url, oidc_config)
+        except (httpx.HTTPError, ValueError):
+            return
+
+        self._discovery = oidc_config
+        self.config.signing_algos = signing_algos
+        self.config.jwks_uri = jwks_uri
+        self.config.key_store.jwks_uri = jwks_uri
+        await self.config.key_store.refresh()
+
+    async def _fetch_oidc_config(self, url: str) -> dict:
         """
         Fetch the OIDC configuration from a given URL.
 
@@ -83,10 +210,11 @@ class OidcConfigLoader:
         :return: A dictionary containing the OIDC configuration.
         """
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(url)
+                response.raise_for_status()
+                return response.json()
+        except httpx.HTTPError as e:
             logger.error(f"Failed to fetch OIDC configuration from {url}: {e}")
             raise
 
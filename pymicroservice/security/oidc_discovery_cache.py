@@ -0,0 +1,101 @@
+import asyncio
+import fcntl
+import json
+import os
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+
+
+@dataclass
+class OidcDiscovery:
+    configuration_url: str
+    discovery: dict[str, Any]
+    jwks: dict[str, Any] | None
+    fetched_at: float
+
+
+class OidcDiscoveryCache:
+    """
+    A local file persisting the OIDC discovery document and the JWK Set, so a restarted process can serve
+    traffic right away and revalidate them in the background.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the discovery cache.
+
+        :param path: Path of the cache file, its directory must exist.
+        """
+        self.path = path
+
+    def read(self, configuration_url: str) -> OidcDiscovery | None:
+        """
+        Read the cached discovery.
+
+        :param configuration_url: The OIDC configuration URL the cached discovery must come from.
+        :return: An OidcDiscovery instance or None if the cache is missing, invalid or for another provider.
+        """
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+            discovery = OidcDiscovery(**data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring invalid OIDC discovery cache {self.path}: {e}")
+            return None
+
+        if discovery.configuration_url != configuration_url:
+            logger.info(f"Ignoring OIDC discovery cache {self.path} of {discovery.configuration_url}")
+            return None
+        return discovery
+
+    def write(
+        self,
+        configuration_url: str,
+        discovery: dict[str, Any],
+        jwks: dict[str, Any] | None,
+        fetched_at: float | None = None,
+    ) -> None:
+        """
+        Atomically replace the cached discovery, errors are logged and never raised.
+
+        :param configuration_url: The OIDC configuration URL the discovery comes from.
+        :param discovery: The OIDC discovery document.
+        :param jwks: The JWK Set published on the ``jwks_uri`` of the discovery document.
+        :param fetched_at: The time of the fetch, now by default.
+        """
+        data = OidcDiscovery(configuration_url, discovery, jwks, fetched_at or time.time())
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, encoding="utf-8") as file:
+                json.dump(data.__dict__, file)
+            os.replace(file.name, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to write OIDC discovery cache {self.path}: {e}")
+
+    @asynccontextmanager
+    async def locked(self, poll_interval: float = 0.05) -> AsyncIterator[None]:
+        """
+        Hold an exclusive lock shared by the processes using the cache file, e.g. the gunicorn workers of a pod,
+        without blocking the event loop while another process holds it.
+
+        :param poll_interval: Number of seconds between two attempts to take the lock.
+        """
+        with open(f"{self.path}.lock", "a") as lock_file:
+            while True:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(poll_interval)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
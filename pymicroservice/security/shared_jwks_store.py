@@ -0,0 +1,79 @@
+import time
+from typing import Any
+
+import jwt
+from loguru import logger
+
+from pymicroservice.security.jwks_store import AsyncJwksStore
+from pymicroservice.security.oidc_discovery_cache import OidcDiscovery, OidcDiscoveryCache
+
+
+class SharedJwksStore(AsyncJwksStore):
+    """
+    A JWKS store sharing its key set with the other processes using the same discovery cache file.
+
+    A refresh takes the lock of the cache file: when another process fetched the key set since this one loaded its
+    keys, the cached key set is loaded, otherwise it's fetched and written to the cache for the others. Each key set
+    is fetched once for all the processes, on startup, on expiry and on rotation.
+    """
+
+    def __init__(
+        self,
+        cache: OidcDiscoveryCache,
+        configuration_url: str,
+        discovery: dict[str, Any],
+        jwks_uri: str,
+        refresh_interval: float = 300,
+        min_refresh_interval: float = 30,
+        timeout: float = 10,
+    ):
+        """
+        Initialize the shared JWKS store, no key is fetched or read until the first lookup or refresh.
+
+        :param cache: The discovery cache shared by the processes.
+        :param configuration_url: The OIDC configuration URL of the discovery document.
+        :param discovery: The discovery document, written to the cache with the key set.
+        """
+        super().__init__(jwks_uri, refresh_interval, min_refresh_interval, timeout)
+        self.cache = cache
+        self.configuration_url = configuration_url
+        self.discovery = discovery
+        # wall clock time of the fetch of the loaded key set, comparable between processes
+        self._shared_fetched_at = 0.0
+
+    def load_cached(self, cached: OidcDiscovery) -> None:
+        """
+        Load the key set of the cache, it expires ``refresh_interval`` seconds after it was fetched.
+
+        :raises jwt.PyJWKSetError: If the JWK Set contains no usable keys.
+        """
+        if cached.jwks is None:
+            return
+        self.load_jwks(cached.jwks)
+        self._shared_fetched_at = cached.fetched_at
+        self._fetched_at = time.monotonic() - max(0.0, time.time() - cached.fetched_at)
+
+    async def fetch_and_share(self) -> bool:
+        """
+        Fetch the key set and write it to the cache, the caller holds the lock of the cache.
+
+        :return: True if the key set was fetched, False if the fetch failed.
+        """
+        if not await super()._fetch():
+            return False
+        self._shared_fetched_at = time.time()
+        self.cache.write(self.configuration_url, self.discovery, self.jwks, self._shared_fetched_at)
+        return True
+
+    async def _fetch(self) -> bool:
+        self._last_attempt = time.monotonic()
+        async with self.cache.locked():
+            cached = self.cache.read(self.configuration_url)
+            if cached is not None and cached.jwks and cached.fetched_at > self._shared_fetched_at:
+                try:
+                    self.load_cached(cached)
+                    logger.debug("JWKS loaded from shared cache {}", self.cache.path)
+                    return True
+                except jwt.PyJWTError as e:
+                    logger.warning(f"Ignoring invalid JWKS of OIDC discovery cache {self.cache.path}: {e}")
+            return await self.fetch_and_share()
@@ -1,42 +1,171 @@
-from dataclasses import dataclass, field
+from collections.abc import Mapping
 from typing import Any
 
+# verified by decode_jwt_token
+REQUIRED_CLAIMS = ["iss", "exp", "aud", "sub", "iat", "jti"]
+STANDARD_CLAIMS = frozenset({"iss", "exp", "aud", "sub", "iat", "jti", "auth_time", "acr", "amr"})
+
+
+def _names(claims: Any, name: str) -> frozenset[str]:
+    # a missing, null or malformed claim grants nothing
+    values = claims.get(name) if isinstance(claims, dict) else None
+    if not isinstance(values, list):
+        return frozenset()
+    return frozenset(value for value in values if isinstance(value, str))
+
 
-@dataclass
 class JWTAccessToken:
-    iss: str
-    exp: int
-    aud: str
-    sub: str
-    iat: int
-    jti: str
+    """
+    A verified access token, backed by its decoded payload.
+
+    The claims are read from the payload on access: nothing is copied when the token is built, the extra claims are
+    only collected when ``extra_claims`` is read, and the roles and scopes are parsed once per token.
+    """
+
+    __slots__ = ("_payload", "_roles", "_scopes")
+
+    def __init__(
+        self,
+        iss: str,
+        exp: int,
+        aud: str,
+        sub: str,
+        iat: int,
+        jti: str,
+        auth_time: str | None = None,
+        acr: str | None = None,
+        amr: list[str] | None = None,
+        extra_claims: Mapping[str, Any] | None = None,
+    ):
+        payload: dict[str, Any] = {"iss": iss, "exp": exp, "aud": aud, "sub": sub, "iat": iat, "jti": jti}
+        for name, value in (("auth_time", auth_time), ("acr", acr), ("amr", amr)):
+            if value is not None:
+                payload[name] = value
+        if extra_claims:
+            payload.update(extra_claims)
+        self._payload = payload
+        self._roles: frozenset[str] | None = None
+        self._scopes: frozenset[str] | None = None
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "JWTAccessToken":
+        """
+        Wrap a verified payload holding the ``REQUIRED_CLAIMS``, which must not be modified afterwards.
+        """
+        token = cls.__new__(cls)
+        token._payload = payload
+        token._roles = None
+        token._scopes = None
+        return token
+
+    @property
+    def iss(self) -> str:
+        return self._payload["iss"]
+
+    @property
+    def exp(self) -> int:
+        return self._payload["exp"]
+
+    @property
+    def aud(self) -> str:
+        return self._payload["aud"]
+
+    @property
+    def sub(self) -> str:
+        return self._payload["sub"]
+
+    @property
+    def iat(self) -> int:
+        return self._payload["iat"]
+
+    @property
+    def jti(self) -> str:
+        return self._payload["jti"]
+
+    @property
+    def auth_time(self) -> str | None:
+        return self._payload.get("auth_time")
+
+    @property
+    def acr(self) -> str | None:
+        return self._payload.get("acr")
+
+    @property
+    def amr(self) -> list[str]:
+        return self._payload.get("amr") or []
+
+    @property
+    def payload(self) -> Mapping[str, Any]:
+        """
+        All the claims of the token, not to be modified.
+        """
+        return self._payload
+
+    @property
+    def extra_claims(self) -> dict[str, Any]:
+        """
+        The claims which are not standard claims, collected on each access: prefer ``claim`` to read one.
+        """
+        return {name: value for name, value in self._payload.items() if name not in STANDARD_CLAIMS}
+
+    def claim(self, name: str, default: Any = None) -> Any:
+        """
+        Read a claim of the token without copying the claim set.
+        """
+        return self._payload.get(name, default)
+
+    @property
+    def roles(self) -> frozenset[str]:
+        """
+        The realm roles of the token, in the ``realm_access.roles`` claim.
+        """
+        if self._roles is None:
+            self._roles = _names(self._payload.get("realm_access"), "roles")
+        return self._roles
+
+    def client_roles(self, client_id: str) -> frozenset[str]:
+        """
+        The roles of the token for a client, in the ``resource_access.<client_id>.roles`` claim.
+        """
+        resource_access = self._payload.get("resource_access")
+        return _names(resource_access.get(client_id) if isinstance(resource_access, dict) else None, "roles")
+
+    @property
+    def scopes(self) -> frozenset[str]:
+        """
+        The scopes of the token, in the space separated ``scope`` claim, or the ``scp`` list claim.
+        """
+        if self._scopes is None:
+            scope = self._payload.get("scope")
+            if isinstance(scope, str):
+                self._scopes = frozenset(scope.split())
+            else:
+                self._scopes = _names(self._payload, "scope" if isinstance(scope, list) else "scp")
+        return self._scopes
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Render the token like a dataclass, the standard claims and the ``extra_claims``, e.g. for a JSON response.
+        """
+        return {
+            "iss": self.iss,
+            "exp": self.exp,
+            "aud": self.aud,
+            "sub": self.sub,
+            "iat": self.iat,
+            "jti": self.jti,
+            "auth_time": self.auth_time,
+            "acr": self.acr,
+            "amr": self.amr,
+            "extra_claims": self.extra_claims,
+        }
 
-    # Optional fields for authentication information
-    auth_time: str | None = None
-    acr: str | None = None
-    amr: list[str] | None = field(default_factory=list)
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, JWTAccessToken) and self._payload == other._payload
 
-    extra_claims: dict[str, Any] = field(default_factory=dict)
+    def __repr__(self) -> str:
+        return f"JWTAccessToken(sub={self.sub!r}, iss={self.iss!r}, exp={self.exp!r})"
 
 
 def map_payload_to_jwt_access_token(payload: dict) -> JWTAccessToken:
-    standard_fields = {
-        "iss",
-        "exp",
-        "aud",
-        "sub",
-        "iat",
-        "jti",
-        "auth_time",
-        "acr",
-        "amr",
-    }
-
-    standard_data = {field: payload.get(field) for field in standard_fields}
-
-    extra_claims = {key: value for key, value in payload.items() if key not in standard_fields}
-
-    return JWTAccessToken(
-        **{key: value for key, value in standard_data.items() if value is not None},
-        extra_claims=extra_claims,
-    )
+    return JWTAccessToken.from_payload(payload)
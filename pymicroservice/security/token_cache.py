@@ -0,0 +1,136 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from pymicroservice.security.token import JWTAccessToken
+
+
+class TokenCacheSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="OIDC_TOKEN_CACHE_", validate_default=False)
+    enabled: bool = False
+    max_size: int = 1024
+    ttl: int = 300
+
+
+TOKEN_CACHE_CONFIG = TokenCacheSettings()
+
+
+@dataclass(frozen=True)
+class TokenCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class TokenCache:
+    """
+    An in-process LRU cache of verified JWT access tokens.
+
+    Entries are keyed by a SHA-256 digest of the raw token, so the bearer token itself is never kept in memory
+    by the cache. An entry is never served past the token's ``exp`` claim, nor past ``ttl`` seconds after it
+    was verified.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: int = 300):
+        """
+        Initialize the token cache.
+
+        :param max_size: Maximum number of verified tokens kept, the least recently used is evicted first.
+        :param ttl: Maximum number of seconds a verified token is served from the cache.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be greater than 0.")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[float, JWTAccessToken]] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> JWTAccessToken | None:
+        """
+        Retrieve a verified token.
+
+        :param token: The raw bearer token.
+        :return: The cached JWTAccessToken or None if the token is unknown or expired.
+        """
+        key = self._digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, access_token = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return access_token
+
+    def put(self, token: str, access_token: JWTAccessToken) -> None:
+        """
+        Store a verified token, tokens without an ``exp`` claim are never cached.
+
+        :param token: The raw bearer token.
+        :param access_token: The JWTAccessToken resulting of the verification.
+        """
+        if not access_token.exp:
+            return
+
+        expires_at = min(float(access_token.exp), time.time() + self.ttl)
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (expires_at, access_token)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self) -> None:
+        """
+        Drop every cached token, to be called when the signing keys are rotated.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> TokenCacheStats:
+        with self._lock:
+            return TokenCacheStats(self._hits, self._misses, self._evictions, len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, token: object) -> bool:
+        """
+        Whether a verified token is cached and not expired, without counting a hit or a miss.
+        """
+        if not isinstance(token, str):
+            return False
+        entry = self._entries.get(self._digest(token))
+        return entry is not None and time.time() < entry[0]
+
+
+def build_token_cache(settings: TokenCacheSettings = TOKEN_CACHE_CONFIG) -> TokenCache | None:
+    """
+    Build the token cache according to the settings.
+
+    :return: A TokenCache instance or None if the cache is disabled.
+    """
+    if not settings.enabled:
+        return None
+    return TokenCache(settings.max_size, settings.ttl)
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable
+
+from fastapi import Request
+
+
+class DeferredSetup:
+    """
+    A setup of an application deferred to its first use, e.g. to keep Celery out of the startup of a process which
+    only uses it on some requests.
+
+    It runs once, in a thread: its imports don't stall the requests in flight on the event loop.
+    """
+
+    def __init__(self, setup: Callable[[], None]):
+        """
+        :param setup: The blocking setup, called again on the next use if it fails.
+        """
+        self._setup = setup
+        self._lock = threading.Lock()
+        self._done = False
+        self._running: asyncio.Future[None] | None = None
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def run(self) -> None:
+        """
+        Run the setup if it isn't done yet, blocking the calling thread.
+        """
+        with self._lock:
+            if not self._done:
+                self._setup()
+                self._done = True
+
+    async def wait(self) -> None:
+        """
+        Run the setup in a thread if it isn't done yet, the concurrent callers wait for the same run.
+        """
+        if self._done:
+            return
+        if self._running is None:
+            self._running = asyncio.ensure_future(asyncio.to_thread(self.run))
+            self._running.add_done_callback(self._forget_failure)
+        # a cancelled request doesn't cancel the run the other requests wait for
+        await asyncio.shield(self._running)
+
+    def _forget_failure(self, running: "asyncio.Future[None]") -> None:
+        if running.cancelled() or running.exception() is not None:
+            self._running = None
+
+
+def wait_for_setup(name: str) -> Callable[[Request], Awaitable[None]]:
+    """
+    Create a dependency waiting for the ``DeferredSetup`` of the application stored in ``app.state``, nothing to
+    wait for when the application has none.
+
+    :param name: The name of the setup in ``app.state``.
+    """
+
+    async def wait(request: Request) -> None:
+        setup: DeferredSetup | None = getattr(request.app.state, name, None)
+        if setup is not None:
+            await setup.wait()
+
+    return wait
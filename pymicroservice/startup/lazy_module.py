@@ -0,0 +1,35 @@
+import importlib
+import sys
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule:
+    """
+    A module imported on the first access to one of its attributes, e.g. to keep Celery out of the startup of a
+    process which only uses it on some requests.
+
+    The setup the lazily imported modules depend on is completed beforehand, see ``DeferredSetup``.
+    """
+
+    def __init__(self, name: str):
+        """
+        :param name: The absolute name of the module.
+        """
+        self._name = name
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Whether the module is imported, without importing it.
+        """
+        return self._name in sys.modules
+
+    def _module(self) -> ModuleType:
+        return importlib.import_module(self._name)
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._module(), attribute)
+
+    def __repr__(self) -> str:
+        return f"<LazyModule {self._name}{'' if self.loaded else ' (not loaded)'}>"
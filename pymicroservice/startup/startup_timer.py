@@ -0,0 +1,44 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from loguru import logger
+
+
+class StartupTimer:
+    """
+    Measure the phases of the startup of a process, e.g. the imports, the configuration of the logger or the loading
+    of the OIDC configuration, and log them in a single report.
+    """
+
+    def __init__(self):
+        self._phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Measure the duration of a phase, the durations of the phases with the same name are summed.
+        """
+        self._phases.setdefault(name, 0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases[name] = self._phases.get(name, 0.0) + time.perf_counter() - start
+
+    def phases(self) -> dict[str, float]:
+        """
+        Return the duration in seconds of each phase, in their start order.
+        """
+        return dict(self._phases)
+
+    def report(self, name: str = "Startup") -> None:
+        """
+        Log the duration of the phases measured so far, and reset them.
+        """
+        phases, self._phases = self._phases, {}
+        details = ", ".join(f"{phase} {duration * 1000:.0f} ms" for phase, duration in phases.items())
+        logger.info(f"{name} in {sum(phases.values()) * 1000:.0f} ms: {details}")
+
+
+STARTUP_TIMER = StartupTimer()
@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+class OidcStub:
+    """
+    A local stand-in of an OIDC provider, serving a discovery document and a JWKS, for the tests and the load tests.
+    """
+
+    def __init__(self, kids: tuple[str, ...] = ("key-1",), delay: float = 0.0, audience: str = "account"):
+        self.delay = delay
+        # answers 503 to every request while False, e.g. to start an application while the provider is down
+        self.available = True
+        self.audience = audience
+        self.requests: dict[str, int] = {}
+        self.private_keys = {kid: rsa.generate_private_key(public_exponent=65537, key_size=2048) for kid in kids}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    @property
+    def configuration_url(self) -> str:
+        return f"{self.base_url}/.well-known/openid-configuration"
+
+    @property
+    def jwks_uri(self) -> str:
+        return f"{self.base_url}/certs"
+
+    def discovery(self) -> dict:
+        return {
+            "issuer": self.base_url,
+            "jwks_uri": self.jwks_uri,
+            "id_token_signing_alg_values_supported": ["RS256"],
+        }
+
+    def jwks(self) -> dict:
+        keys = []
+        for kid, private_key in self.private_keys.items():
+            jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+            keys.append({**jwk, "kid": kid, "use": "sig", "alg": "RS256"})
+        return {"keys": keys}
+
+    def token(self, kid: str = "key-1", expires_in: int = 300, **claims) -> str:
+        now = int(time.time())
+        payload = {
+            "iss": self.base_url,
+            "aud": self.audience,
+            "sub": "user",
+            "iat": now,
+            "exp": now + expires_in,
+            "jti": f"jti-{now}",
+            **claims,
+        }
+        private_key = self.private_keys.get(kid) or rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+    def rotate(self, kids: tuple[str, ...]) -> None:
+        self.private_keys = {
+            kid: self.private_keys.get(kid) or rsa.generate_private_key(public_exponent=65537, key_size=2048)
+            for kid in kids
+        }
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests[self.path] = stub.requests.get(self.path, 0) + 1
+                time.sleep(stub.delay)
+                if not stub.available:
+                    self.send_error(503)
+                    return
+                if self.path == "/.well-known/openid-configuration":
+                    body = stub.discovery()
+                elif self.path == "/certs":
+                    body = stub.jwks()
+                else:
+                    self.send_error(404)
+                    return
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "OidcStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,259 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any
+
+from fastapi import HTTPException, Request, status
+from loguru import logger
+from pydantic import BaseModel
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from pymicroservice.metrics.prometheus_metrics import ADMISSION_REJECTIONS, TASK_QUEUE_DEPTH
+
+if TYPE_CHECKING:
+    from celery import Celery
+
+
+class AdmissionLimits(BaseModel):
+    # 0 disables a limit, None keeps the one of the less specific level
+    max_queue_depth: int | None = None
+    max_in_flight: int | None = None
+    retry_after: int | None = None
+
+
+class AdmissionSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="ADMISSION_", validate_default=False)
+    enabled: bool = True
+    max_queue_depth: int = 10000
+    max_in_flight: int = 100
+    retry_after: int = 5
+    queue_depth_refresh_interval: float = 2
+    queue_depth_timeout: float = 2
+    queue_depth_stale_after: float = 30
+    # JSON overrides by task name, e.g. {"sample.application.user.tasks.user_sample_task": {"max_queue_depth": 500}}
+    tasks: dict[str, AdmissionLimits] = {}
+    # JSON overrides by route template, which take precedence, e.g. {"/api/v1/user/tasks": {"max_in_flight": 10}}
+    routes: dict[str, AdmissionLimits] = {}
+
+
+ADMISSION_CONFIG = AdmissionSettings()
+
+
+class QueueDepthMonitor:
+    """
+    The number of messages waiting in the broker queues, cached by the process.
+
+    A lookup answers the cached reading and, when it's older than ``refresh_interval``, refreshes it in the
+    background: a queue is read at most once per interval by each process, never while serving a request.
+    """
+
+    def __init__(self, app: "Celery", refresh_interval: float = 2, timeout: float = 2, stale_after: float = 30):
+        """
+        :param app: The Celery application whose broker is read.
+        :param refresh_interval: Number of seconds a reading is used before it's refreshed.
+        :param timeout: Timeout in seconds of a reading.
+        :param stale_after: Number of seconds after which a reading is unknown, e.g. when the broker is down.
+        """
+        self.app = app
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self._depths: dict[str, tuple[int, float]] = {}
+        self._refreshes: dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_settings(cls, app: "Celery", settings: AdmissionSettings = ADMISSION_CONFIG) -> "QueueDepthMonitor":
+        return cls(
+            app,
+            settings.queue_depth_refresh_interval,
+            settings.queue_depth_timeout,
+            settings.queue_depth_stale_after,
+        )
+
+    def queue_for(self, task_name: str) -> str:
+        """
+        The name of the queue the calls of a task are routed to.
+        """
+        return self.app.amqp.router.route({}, task_name)["queue"].name
+
+    def depth(self, queue: str) -> int | None:
+        """
+        The last reading of the depth of a queue, to be called from the event loop.
+
+        :return: The number of messages, or None until the queue is read or if the reading is stale.
+        """
+        now = time.monotonic()
+        reading = self._depths.get(queue)
+        if (reading is None or now - reading[1] >= self.refresh_interval) and queue not in self._refreshes:
+            self._refreshes[queue] = asyncio.create_task(self._refresh(queue))
+        if reading is None or now - reading[1] > self.stale_after:
+            return None
+        return reading[0]
+
+    async def _refresh(self, queue: str) -> None:
+        try:
+            depth = await asyncio.wait_for(asyncio.to_thread(self._read_depth, queue), self.timeout)
+            self._depths[queue] = (depth, time.monotonic())
+            TASK_QUEUE_DEPTH.labels(queue).set(depth)
+        except Exception as e:
+            logger.warning(f"Failed to read the depth of the queue {queue}: {e!r}")
+        finally:
+            self._refreshes.pop(queue, None)
+
+    def _read_depth(self, queue: str) -> int:
+        with self.app.pool.acquire(block=True, timeout=self.timeout) as connection, connection.channel() as channel:
+            try:
+                return channel.queue_declare(queue=queue, passive=True).message_count
+            except connection.channel_errors:
+                # not declared yet, e.g. an empty Redis queue
+                return 0
+
+    async def close(self) -> None:
+        refreshes = list(self._refreshes.values())
+        for refresh in refreshes:
+            refresh.cancel()
+        await asyncio.gather(*refreshes, return_exceptions=True)
+
+
+class ConcurrencyLimiter:
+    """
+    A limit of requests in flight, which rejects instead of queueing the requests above it.
+    """
+
+    def __init__(self, limit: int):
+        """
+        :param limit: Maximum number of requests in flight, unlimited if 0.
+        """
+        self.limit = limit
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        # called from the event loop only, no lock is needed
+        if self.limit and self.in_flight >= self.limit:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+
+class AdmissionController:
+    """
+    The admission control of the task submissions: a submission is rejected with a 429 and a ``Retry-After``
+    when the queue of the task is deeper than ``max_queue_depth``, or when ``max_in_flight`` submissions of the
+    task to the same route are already in progress in the process.
+
+    The limits are the defaults, overridden by the limits of the task name, overridden by the limits of the route.
+    """
+
+    def __init__(
+        self,
+        monitor: QueueDepthMonitor,
+        max_queue_depth: int = 10000,
+        max_in_flight: int = 100,
+        retry_after: int = 5,
+        tasks: dict[str, AdmissionLimits] | None = None,
+        routes: dict[str, AdmissionLimits] | None = None,
+    ):
+        """
+        :param monitor: The reader of the queue depths.
+        :param max_queue_depth: Default maximum depth of the queue of a task, unlimited if 0.
+        :param max_in_flight: Default maximum number of requests in flight per route, unlimited if 0.
+        :param retry_after: Default number of seconds after which a rejected client should retry.
+        :param tasks: Limits by task name.
+        :param routes: Limits by route template, e.g. ``/api/v1/user/task``.
+        """
+        self.monitor = monitor
+        self.defaults = AdmissionLimits(
+            max_queue_depth=max_queue_depth, max_in_flight=max_in_flight, retry_after=retry_after
+        )
+        self.tasks = tasks or {}
+        self.routes = routes or {}
+        self._limiters: dict[tuple[str, str], ConcurrencyLimiter] = {}
+
+    @classmethod
+    def from_settings(
+        cls, monitor: QueueDepthMonitor, settings: AdmissionSettings = ADMISSION_CONFIG
+    ) -> "AdmissionController":
+        return cls(
+            monitor,
+            settings.max_queue_depth,
+            settings.max_in_flight,
+            settings.retry_after,
+            settings.tasks,
+            settings.routes,
+        )
+
+    def limits(self, route: str, task_name: str) -> AdmissionLimits:
+        """
+        Resolve the limits of the submissions of a task to a route.
+        """
+        limits = self.defaults.model_dump()
+        for overrides in (self.tasks.get(task_name), self.routes.get(route)):
+            if overrides is not None:
+                limits.update(overrides.model_dump(exclude_none=True))
+        return AdmissionLimits(**limits)
+
+    @asynccontextmanager
+    async def admit(self, route: str, task_name: str) -> AsyncIterator[None]:
+        """
+        Admit a submission for the time of the request, to be used from the event loop.
+
+        :param route: The route template of the request.
+        :param task_name: The name of the submitted task.
+        :raises HTTPException: 429 if the submission is rejected.
+        """
+        limits = self.limits(route, task_name)
+        retry_after = limits.retry_after or 0
+        if limits.max_queue_depth:
+            # unknown until the first reading, or while the broker can't be read: the broker errors are reported
+            # by the submission itself
+            depth = self.monitor.depth(self.monitor.queue_for(task_name))
+            if depth is not None and depth >= limits.max_queue_depth:
+                self._reject(route, "queue_depth", "Task queue is full.", retry_after)
+
+        # by task too, the limits of the tasks submitted by a route may differ
+        limiter = self._limiters.get((route, task_name))
+        if limiter is None:
+            limiter = self._limiters[route, task_name] = ConcurrencyLimiter(limits.max_in_flight or 0)
+        if not limiter.try_acquire():
+            self._reject(route, "in_flight", "Too many task submissions in progress.", retry_after)
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    @staticmethod
+    def _reject(route: str, reason: str, detail: str, retry_after: int) -> None:
+        ADMISSION_REJECTIONS.labels(route, reason).inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def close(self) -> None:
+        await self.monitor.close()
+
+
+def admission_control(
+    task_name: str, controller: Callable[[], AdmissionController]
+) -> Callable[[Request], AsyncIterator[None]]:
+    """
+    Create a dependency admitting the submissions of a task to a route, see ``AdmissionController``.
+
+    :param task_name: The name of the task submitted by the route.
+    :param controller: Return the controller, called on each request, e.g. to load it on first use.
+    """
+
+    async def admit(request: Request) -> AsyncIterator[None]:
+        if not ADMISSION_CONFIG.enabled:
+            yield
+            return
+        route: Any = request.scope.get("route")
+        async with controller().admit(route.path if route is not None else request.url.path, task_name):
+            yield
+
+    return admit
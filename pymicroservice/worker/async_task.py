@@ -0,0 +1,169 @@
+import asyncio
+import inspect
+import os
+import threading
+from collections.abc import Container, Coroutine
+from concurrent.futures import CancelledError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextvars import ContextVar
+from typing import Any
+
+from celery import Task
+from celery.app.task import Context
+from celery.concurrency.thread import ApplyResult
+from celery.concurrency.thread import TaskPool as ThreadTaskPool
+from celery.exceptions import Ignore, SoftTimeLimitExceeded, TimeLimitExceeded
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+ASYNCIO_POOL = "pymicroservice.worker.async_task:AsyncioPool"
+
+
+class AsyncioWorkerSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="WORKER_ASYNCIO_", validate_default=False)
+    enabled: bool = False
+    concurrency: int = 100
+
+
+ASYNCIO_WORKER_CONFIG = AsyncioWorkerSettings()
+
+# the request of the async task running in the current asyncio task, the request stack of Celery is per thread
+_current_request: ContextVar[Context | None] = ContextVar("current_request", default=None)
+
+
+class EventLoopThread:
+    """
+    Run coroutines on an event loop running in a background thread, one per process.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+        self._running: dict[str, asyncio.Task] = {}
+        # the thread of the loop doesn't survive a fork, a new one is started in the child on demand
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._loop = None
+        self._lock = threading.Lock()
+        self._running = {}
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="asyncio-tasks", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run(
+        self,
+        coroutine: Coroutine,
+        task_id: str | None = None,
+        soft_time_limit: float | None = None,
+        time_limit: float | None = None,
+    ) -> Any:
+        """
+        Run a coroutine on the event loop and wait for its result.
+
+        :param coroutine: The coroutine.
+        :param task_id: The id used to cancel the coroutine.
+        :param soft_time_limit: Seconds after which the coroutine is cancelled, ``SoftTimeLimitExceeded`` is raised.
+        :param time_limit: Seconds after which the result is not waited for anymore, ``TimeLimitExceeded`` is raised.
+        :raises Ignore: If the coroutine was cancelled with ``cancel``.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._execute(coroutine, task_id, soft_time_limit), self._get_loop())
+        try:
+            return future.result(timeout=time_limit)
+        except FutureTimeoutError as e:
+            future.cancel()
+            raise TimeLimitExceeded(time_limit) from e
+        except CancelledError as e:
+            # the task was revoked, its state is already stored
+            raise Ignore() from e
+
+    async def _execute(self, coroutine: Coroutine, task_id: str | None, soft_time_limit: float | None) -> Any:
+        if task_id is not None:
+            self._running[task_id] = asyncio.current_task()  # type: ignore[assignment]
+        try:
+            if soft_time_limit is None:
+                return await coroutine
+            timeout = asyncio.timeout(soft_time_limit)
+            try:
+                async with timeout:
+                    return await coroutine
+            except TimeoutError as e:
+                if timeout.expired():
+                    raise SoftTimeLimitExceeded(soft_time_limit) from e
+                raise
+        finally:
+            if task_id is not None:
+                self._running.pop(task_id, None)
+
+    def cancel(self, task_ids: Container[str]) -> None:
+        """
+        Cancel the running coroutines of the tasks.
+        """
+        if self._loop is None:
+            return
+
+        def cancel_tasks():
+            for task_id, task in self._running.items():
+                if task_id in task_ids:
+                    task.cancel()
+
+        self._loop.call_soon_threadsafe(cancel_tasks)
+
+
+EVENT_LOOP_THREAD = EventLoopThread()
+
+
+class AsyncTask(Task):
+    """
+    Celery task whose ``run`` can be an ``async def``, the coroutine runs on the event loop of the worker process.
+
+    The time limits apply like for a sync task: the coroutine is cancelled at the soft limit, and the task fails at
+    the hard limit. A task revoked with ``terminate=True`` is cancelled when the worker uses the ``AsyncioPool``.
+    """
+
+    @property
+    def request(self) -> Context:
+        return _current_request.get() or self._get_request()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if not inspect.iscoroutinefunction(self.run):
+            return super().__call__(*args, **kwargs)
+
+        request = Context(**{**self._get_request().__dict__, "args": args, "kwargs": kwargs})
+        hard_time_limit, soft_time_limit = request.timelimit or (None, None)
+        return EVENT_LOOP_THREAD.run(
+            self._run_with_request(request, self.run(*args, **kwargs)),
+            request.id,
+            soft_time_limit or self.soft_time_limit or self.app.conf.task_soft_time_limit,
+            hard_time_limit or self.time_limit or self.app.conf.task_time_limit,
+        )
+
+    @staticmethod
+    async def _run_with_request(request: Context, coroutine: Coroutine) -> Any:
+        _current_request.set(request)
+        return await coroutine
+
+
+class AsyncioApplyResult(ApplyResult):
+    def terminate(self, signal: int | None = None) -> None:
+        # the coroutine is cancelled by AsyncioPool.terminate_job
+        pass
+
+
+class AsyncioPool(ThreadTaskPool):
+    """
+    Celery pool for async tasks: each thread waits for a coroutine running on the event loop of the process, so the
+    concurrency of the pool is the number of tasks in flight.
+    """
+
+    def on_apply(self, *args: Any, **kwargs: Any) -> AsyncioApplyResult:
+        return AsyncioApplyResult(super().on_apply(*args, **kwargs).f)
+
+    def terminate_job(self, pid: int, signal: int | None = None) -> None:
+        from celery.worker import state
+
+        EVENT_LOOP_THREAD.cancel(state.revoked)
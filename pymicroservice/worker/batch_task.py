@@ -0,0 +1,147 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+from celery import Celery
+from celery.utils.imports import symbol_by_name
+from celery.utils.time import timezone
+from celery.worker.request import create_request_cls
+from kombu.asynchronous.timer import to_timestamp
+from loguru import logger
+
+from pymicroservice.worker.async_task import AsyncTask
+
+
+@dataclass
+class BatchRequest:
+    id: str
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+
+
+class BatchTask(AsyncTask):
+    """
+    Celery task called once with a batch of queued messages, instead of once per message.
+
+    The worker collects up to ``flush_every`` messages, or waits at most ``flush_interval`` seconds, and calls ``run``
+    with the list of ``BatchRequest``. ``run`` returns the result of each request, in the same order: a result which is
+    an exception fails its request only. Each message is acknowledged on its own, after the batch with ``acks_late``.
+
+    The worker prefetch limit (``worker_prefetch_multiplier`` times the concurrency) must allow ``flush_every``
+    unacknowledged messages, otherwise the batches are flushed by the interval only.
+    """
+
+    Strategy = "pymicroservice.worker.batch_task:batch_strategy"
+    flush_every = 100
+    flush_interval = 1.0
+    # the calls are checked against the signature of run, which takes the batch
+    typing = False
+
+
+def run_batch(task: BatchTask, requests: list[BatchRequest]) -> None:
+    """
+    Call the task with a batch of requests, and store the result of each request.
+    """
+    try:
+        results = task(requests)
+        if len(results) != len(requests):
+            raise ValueError(f"{task.name} returned {len(results)} results for {len(requests)} requests")
+    except Exception as e:
+        logger.error(f"Batch of {len(requests)} {task.name} tasks failed: {e}")
+        results = [e] * len(requests)
+
+    for request, result in zip(requests, results, strict=True):
+        if isinstance(result, Exception):
+            task.backend.mark_as_failure(request.id, result)
+        elif not task.ignore_result:
+            task.backend.mark_as_done(request.id, result)
+
+
+def batch_strategy(task: BatchTask, app: Celery, consumer: Any, **kwargs: Any):
+    """
+    Worker strategy of the batch tasks: buffer the received messages, and apply the task to them in the pool.
+    """
+    Request = symbol_by_name(task.Request)
+    Req = create_request_cls(Request, task, consumer.pool, consumer.hostname, consumer.event_dispatcher, app=app)
+    revoked_tasks = consumer.controller.state.revoked
+    lock = threading.Lock()
+    buffer: list = []
+    # the buffered requests received with an ETA, which raised the prefetch limit until they are flushed
+    delayed: set[str] = set()
+
+    def flush() -> None:
+        with lock:
+            requests = buffer[:]
+            buffer.clear()
+            flushed_delayed = len(delayed.intersection(request.id for request in requests))
+            delayed.difference_update(request.id for request in requests)
+        if not requests:
+            return
+
+        batch = [BatchRequest(request.id, tuple(request.args), request.kwargs) for request in requests]
+        if not task.acks_late:
+            for request in requests:
+                request.acknowledge()
+
+        def on_return(*args: Any) -> None:
+            if task.acks_late:
+                for request in requests:
+                    request.acknowledge()
+
+        consumer.pool.apply_async(
+            run_batch,
+            args=(task, batch),
+            callback=on_return,
+            error_callback=on_return,
+            timeout=task.time_limit,
+            soft_timeout=task.soft_time_limit,
+        )
+        if flushed_delayed:
+            # like the ETA tasks of the default strategy, once they are moved to the pool
+            consumer.qos.decrement_eventually(flushed_delayed)
+
+    def add(request) -> None:
+        with lock:
+            buffer.append(request)
+            full = len(buffer) >= task.flush_every
+        if full:
+            flush()
+
+    def add_delayed(request) -> None:
+        with lock:
+            delayed.add(request.id)
+        add(request)
+
+    consumer.timer.call_repeatedly(task.flush_interval, flush)
+
+    def task_message_handler(message, body, ack, reject, callbacks, **kw):
+        request = Req(
+            message,
+            on_ack=ack,
+            on_reject=reject,
+            app=app,
+            hostname=consumer.hostname,
+            eventer=consumer.event_dispatcher,
+            task=task,
+            connection_errors=consumer.connection_errors,
+            body=message.body,
+            headers=message.headers,
+            decoded=False,
+            utc=app.uses_utc_timezone(),
+        )
+        if (request.expires or request.id in revoked_tasks) and request.revoked():
+            return
+
+        if request.eta:
+            # the timer runs on the monotonic clock, like the ETA of the default strategy
+            eta = (
+                to_timestamp(timezone.to_system(request.eta))
+                if request.utc
+                else to_timestamp(request.eta, app.timezone)
+            )
+            consumer.qos.increment_eventually()
+            consumer.timer.call_at(eta, add_delayed, (request,), priority=6)
+            return
+        add(request)
+
+    return task_message_handler
@@ -0,0 +1,69 @@
+import zlib
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class LargeResultSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="WORKER_LARGE_RESULT_", validate_default=False)
+    enabled: bool = False
+    # size in bytes of the serialized result above which it's compressed
+    threshold: int = 65536
+    compression_level: int = 6
+    chunk_size: int = 65536
+
+
+LARGE_RESULT_CONFIG = LargeResultSettings()
+
+# the name of the backend in a Celery result_backend URL
+LARGE_RESULT_BACKEND = "pymicroservice.worker.large_result_backend:LargeResultRedisBackend"
+
+_MARKER = "__large_result__"
+
+
+@dataclass(frozen=True)
+class LargeResult:
+    """
+    The reference stored in the task state in place of a large result, whose payload is stored apart, compressed.
+    """
+
+    size: int
+    compressed_size: int
+    content_type: str
+
+    def to_result(self) -> dict[str, Any]:
+        return {_MARKER: asdict(self)}
+
+    @classmethod
+    def from_result(cls, result: Any) -> "LargeResult | None":
+        """
+        :return: The reference if the result is a large result, None otherwise.
+        """
+        if isinstance(result, dict) and len(result) == 1 and isinstance(result.get(_MARKER), dict):
+            return cls(**result[_MARKER])
+        return None
+
+
+def large_result_backend_url(result_backend: str, settings: LargeResultSettings = LARGE_RESULT_CONFIG) -> str:
+    """
+    Select the LargeResultRedisBackend for a Redis result backend URL, when the compression is enabled.
+    """
+    if settings.enabled and result_backend.startswith(("redis://", "rediss://", "unix://")):
+        return f"{LARGE_RESULT_BACKEND}+{result_backend}"
+    return result_backend
+
+
+async def decompress_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Decompress a gzip stream chunk by chunk, without holding the whole payload in memory.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    data = decompressor.flush()
+    if data:
+        yield data
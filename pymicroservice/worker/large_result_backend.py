@@ -0,0 +1,86 @@
+import gzip
+from typing import Any
+
+from celery import states
+from celery.backends.redis import RedisBackend
+from celery.backends.redis import ResultConsumer as RedisResultConsumer
+
+from pymicroservice.worker.large_result import LARGE_RESULT_CONFIG, LargeResult
+
+
+class LargeResultConsumer(RedisResultConsumer):
+    def on_state_change(self, meta: dict[str, Any], message: Any) -> None:
+        super().on_state_change(self.backend.resolve_large_result(meta), message)
+
+
+class LargeResultRedisBackend(RedisBackend):
+    """
+    A Redis result backend storing the results above a size threshold compressed with gzip, under a key of their own.
+
+    The task state only holds a ``LargeResult`` reference, so reading the state of a task doesn't load its result:
+    ``TaskStatusReader`` returns the reference, and the payload can be streamed in chunks with
+    ``TaskStatusReader.stream_large_result``. The results are decompressed transparently for ``AsyncResult``.
+    """
+
+    ResultConsumer = LargeResultConsumer
+
+    def __init__(
+        self,
+        *args: Any,
+        threshold: int = LARGE_RESULT_CONFIG.threshold,
+        compression_level: int = LARGE_RESULT_CONFIG.compression_level,
+        **kwargs: Any,
+    ):
+        """
+        :param threshold: Size in bytes of the serialized result above which it's compressed.
+        :param compression_level: The gzip compression level, from 1 (fastest) to 9 (smallest).
+        """
+        super().__init__(*args, **kwargs)
+        self.threshold = threshold
+        self.compression_level = compression_level
+
+    def get_key_for_large_result(self, task_id: str) -> Any:
+        return self.get_key_for_task(task_id, ".payload")
+
+    def _store_result(
+        self, task_id: str, result: Any, state: str, traceback: Any = None, request: Any = None, **kwargs: Any
+    ) -> Any:
+        if state == states.SUCCESS:
+            payload = self.encode(result)
+            if isinstance(payload, str):
+                payload = payload.encode()
+            if len(payload) > self.threshold:
+                compressed = gzip.compress(payload, compresslevel=self.compression_level, mtime=0)
+                # stored before the state, which must not reference a missing payload
+                self.ensure(self._set_payload, (self.get_key_for_large_result(task_id), compressed))
+                reference = LargeResult(len(payload), len(compressed), self.content_type).to_result()
+                super()._store_result(task_id, reference, state, traceback, request, **kwargs)
+                return result
+        return super()._store_result(task_id, result, state, traceback, request, **kwargs)
+
+    def _set_payload(self, key: Any, value: bytes) -> None:
+        # not published, unlike the task states
+        self.client.set(key, value, ex=self.expires or None)
+
+    def resolve_large_result(self, meta: dict[str, Any]) -> dict[str, Any]:
+        """
+        Replace the reference to a large result in a task state with the decompressed result.
+        The reference is kept if the payload expired.
+        """
+        if meta.get("status") != states.SUCCESS or LargeResult.from_result(meta.get("result")) is None:
+            return meta
+        compressed = self.get(self.get_key_for_large_result(meta["task_id"]))
+        if compressed is None:
+            return meta
+        return {**meta, "result": self.decode(gzip.decompress(compressed))}
+
+    def _get_task_meta_for(self, task_id: str) -> dict[str, Any]:
+        return self.resolve_large_result(super()._get_task_meta_for(task_id))
+
+    def _filter_ready(self, values: Any, READY_STATES: frozenset[str] = states.READY_STATES) -> Any:
+        for key, meta in super()._filter_ready(values, READY_STATES):
+            yield key, self.resolve_large_result(meta)
+
+    def _forget(self, task_id: str) -> None:
+        super()._forget(task_id)
+        self.delete(self.get_key_for_large_result(task_id))
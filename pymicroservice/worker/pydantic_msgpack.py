@@ -0,0 +1,140 @@
+import datetime
+import decimal
+import uuid
+import zlib
+from collections.abc import Mapping
+from typing import Any
+
+import msgpack
+from kombu.serialization import register
+from pydantic import BaseModel
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from pymicroservice.worker.register_pydantic import class_full_name
+
+SERIALIZER_NAME = "pydantic-msgpack"
+CONTENT_TYPE = "application/x-pydantic-msgpack"
+
+# msgpack extension codes, they are part of the wire format and must never change
+_MODEL = 1
+_DATETIME = 2
+_DATE = 3
+_TIME = 4
+_UUID = 5
+_DECIMAL = 6
+
+
+class PydanticMsgpackSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="WORKER_MSGPACK_", validate_default=False)
+    trusted: bool = False
+
+
+PYDANTIC_MSGPACK_CONFIG = PydanticMsgpackSettings()
+
+
+def type_id(model: type[BaseModel]) -> int:
+    """
+    Return the default type id of a model, a CRC32 of its full class name.
+    """
+    return zlib.crc32(class_full_name(model).encode())
+
+
+class PydanticMsgpackSerializer:
+    """
+    Serialize task payloads with msgpack, pydantic models are encoded as a type id and their field values.
+
+    The type ids are stable across versions: the CRC32 of the full class name by default, or an explicit id which
+    survives the renaming or the moving of the class. In trusted mode, models are rebuilt without validation.
+    """
+
+    def __init__(self, trusted: bool = False):
+        """
+        :param trusted: Skip the validation of the decoded models, only for messages from trusted producers.
+        """
+        self.trusted = trusted
+        self._models: dict[int, type[BaseModel]] = {}
+        self._type_ids: dict[type[BaseModel], int] = {}
+        self._field_names: dict[type[BaseModel], frozenset[str]] = {}
+
+    def register_types(self, models: list[type[BaseModel]] | Mapping[int, type[BaseModel]]) -> None:
+        """
+        Register the models which can be serialized.
+
+        :param models: The models, or the models by explicit type id.
+        :raises ValueError: If a type id is already used by another model.
+        """
+        items = models.items() if isinstance(models, Mapping) else ((type_id(model), model) for model in models)
+        for model_type_id, model in items:
+            registered = self._models.get(model_type_id, model)
+            if registered is not model:
+                raise ValueError(
+                    f"Type id {model_type_id} of {class_full_name(model)} is used by {class_full_name(registered)}"
+                )
+            self._models[model_type_id] = model
+            self._type_ids[model] = model_type_id
+            self._field_names[model] = frozenset(model.model_fields)
+
+    def dumps(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, default=self._default, use_bin_type=True, datetime=False)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+    def _default(self, obj: Any) -> msgpack.ExtType:
+        model_type_id = self._type_ids.get(type(obj))
+        if model_type_id is not None:
+            # nested models stay models in the field values, and are encoded with their own type id
+            fields = obj.__dict__ if not obj.__pydantic_extra__ else {**obj.__dict__, **obj.__pydantic_extra__}
+            return msgpack.ExtType(_MODEL, self.dumps((model_type_id, fields)))
+        if isinstance(obj, datetime.datetime):
+            return msgpack.ExtType(_DATETIME, obj.isoformat().encode())
+        if isinstance(obj, datetime.date):
+            return msgpack.ExtType(_DATE, obj.isoformat().encode())
+        if isinstance(obj, datetime.time):
+            return msgpack.ExtType(_TIME, obj.isoformat().encode())
+        if isinstance(obj, uuid.UUID):
+            return msgpack.ExtType(_UUID, obj.bytes)
+        if isinstance(obj, decimal.Decimal):
+            return msgpack.ExtType(_DECIMAL, str(obj).encode())
+        if isinstance(obj, BaseModel):
+            raise TypeError(f"{class_full_name(type(obj))} is not registered")
+        raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code == _MODEL:
+            model_type_id, fields = self.loads(data)
+            model = self._models.get(model_type_id)
+            if model is None:
+                raise ValueError(f"Unknown type id {model_type_id}")
+            return self._construct(model, fields) if self.trusted else model.model_validate(fields)
+        if code == _DATETIME:
+            return datetime.datetime.fromisoformat(data.decode())
+        if code == _DATE:
+            return datetime.date.fromisoformat(data.decode())
+        if code == _TIME:
+            return datetime.time.fromisoformat(data.decode())
+        if code == _UUID:
+            return uuid.UUID(bytes=data)
+        if code == _DECIMAL:
+            return decimal.Decimal(data.decode())
+        return msgpack.ExtType(code, data)
+
+    def _construct(self, model: type[BaseModel], fields: dict[str, Any]) -> BaseModel:
+        # faster than model_construct when the values of all the fields are known
+        if fields.keys() != self._field_names[model]:
+            return model.model_construct(**fields)
+        instance = model.__new__(model)
+        object.__setattr__(instance, "__dict__", fields)
+        object.__setattr__(instance, "__pydantic_fields_set__", set(fields))
+        object.__setattr__(instance, "__pydantic_extra__", None)
+        object.__setattr__(instance, "__pydantic_private__", None)
+        return instance
+
+    def register(self, name: str = SERIALIZER_NAME) -> None:
+        """
+        Register the serializer in kombu, to be selected with ``task_serializer`` and allowed in ``accept_content``.
+        """
+        register(name, self.dumps, self.loads, content_type=CONTENT_TYPE, content_encoding="binary")
+
+
+PYDANTIC_MSGPACK_SERIALIZER = PydanticMsgpackSerializer(PYDANTIC_MSGPACK_CONFIG.trusted)
@@ -0,0 +1,115 @@
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+if TYPE_CHECKING:
+    from celery import Celery, Task
+    from kombu import Producer
+
+
+class TaskBatchSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="WORKER_BATCH_", validate_default=False)
+    max_size: int = 5000
+    chunk_size: int = 500
+
+
+TASK_BATCH_CONFIG = TaskBatchSettings()
+
+
+@dataclass
+class TaskSubmission:
+    task_id: str | None = None
+    error: str | None = None
+
+
+@contextmanager
+def _pipelined(channel: Any, pipeline: Any) -> Iterator[None]:
+    # the Redis channel sends each command with the client given by conn_or_acquire
+    channel.conn_or_acquire = lambda client=None: nullcontext(client or pipeline)
+    try:
+        yield
+    finally:
+        del channel.conn_or_acquire
+
+
+class TaskBatchPublisher:
+    """
+    Publish many calls of a task with a single producer, instead of acquiring one per call.
+
+    With a Redis broker, the messages of each chunk are sent in a single pipelined round trip. With any other broker,
+    they are published one after the other.
+    """
+
+    def __init__(self, app: "Celery", chunk_size: int = 500):
+        """
+        :param app: The Celery application.
+        :param chunk_size: Maximum number of messages sent in a single round trip.
+        """
+        self.app = app
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_settings(cls, app: "Celery", settings: TaskBatchSettings = TASK_BATCH_CONFIG) -> "TaskBatchPublisher":
+        return cls(app, settings.chunk_size)
+
+    def publish(self, task: "Task", calls: Sequence[tuple], **options: Any) -> list[TaskSubmission]:
+        """
+        Publish a call of the task for each tuple of arguments, a failed call doesn't prevent the others.
+
+        :param task: The task to call.
+        :param calls: The positional arguments of each call.
+        :param options: The options of ``apply_async``.
+        :return: The submission of each call, in the order of the calls, with its task id or its error.
+        """
+        submissions: list[TaskSubmission] = []
+        with self.app.producer_or_acquire() as producer:
+            for start in range(0, len(calls), self.chunk_size):
+                chunk = calls[start : start + self.chunk_size]
+                submissions.extend(self._publish_chunk(producer, task, chunk, options))
+        return submissions
+
+    def _publish_chunk(
+        self, producer: "Producer", task: "Task", chunk: Sequence[tuple], options: dict[str, Any]
+    ) -> list[TaskSubmission]:
+        from kombu.transport.redis import Channel
+
+        channel = producer.channel
+        if not isinstance(channel, Channel):
+            return [self._apply(producer, task, args, options) for args in chunk]
+
+        pipeline = channel.client.pipeline(transaction=False)
+        submissions = []
+        commands = []
+        with _pipelined(channel, pipeline):
+            for args in chunk:
+                first_command = len(pipeline.command_stack)
+                submissions.append(self._apply(producer, task, args, options))
+                commands.append(slice(first_command, len(pipeline.command_stack)))
+
+        try:
+            results = pipeline.execute(raise_on_error=False)
+        except Exception as e:
+            # the round trip failed: nothing of the chunk was queued, and the pipeline was reset
+            logger.error(f"Failed to publish {len(chunk)} {task.name} tasks: {e}")
+            for submission in submissions:
+                if submission.error is None:
+                    submission.task_id, submission.error = None, str(e)
+            return submissions
+
+        for submission, submission_commands in zip(submissions, commands, strict=True):
+            error = next((result for result in results[submission_commands] if isinstance(result, Exception)), None)
+            if error is not None:
+                submission.task_id, submission.error = None, str(error)
+        return submissions
+
+    @staticmethod
+    def _apply(producer: "Producer", task: "Task", args: tuple, options: dict[str, Any]) -> TaskSubmission:
+        try:
+            return TaskSubmission(task_id=task.apply_async(args, producer=producer, **options).id)
+        except Exception as e:
+            logger.error(f"Failed to publish a {task.name} task: {e}")
+            return TaskSubmission(error=str(e))
@@ -0,0 +1,169 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from typing import Any
+
+from celery import states
+from loguru import logger
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from pymicroservice.worker.task_status import TaskStatus, TaskStatusReader
+
+
+class TaskEventSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="WORKER_EVENTS_", validate_default=False)
+    heartbeat: float = 15
+    poll_interval: float = 1
+
+
+TASK_EVENT_CONFIG = TaskEventSettings()
+
+
+class TaskEventHub:
+    """
+    Push the state changes of tasks to the subscribers of the process.
+
+    With a Redis result backend, the hub listens to the messages the backend publishes each time it stores a task
+    state, on a single pubsub connection shared by all the subscribers. With any other backend, a single loop polls the
+    states of all the subscribed tasks.
+    """
+
+    def __init__(self, reader: TaskStatusReader, heartbeat: float = 15, poll_interval: float = 1):
+        """
+        Initialize the hub, nothing is started until the first subscription.
+
+        :param reader: The reader of the result backend, used for the current states and the Redis connection.
+        :param heartbeat: Seconds without state change after which a subscriber is woken up with ``None``.
+        :param poll_interval: Seconds between two polls, when the result backend is not Redis.
+        """
+        self.reader = reader
+        self.heartbeat = heartbeat
+        self.poll_interval = poll_interval
+        self._queues: dict[str, set[asyncio.Queue[TaskStatus]]] = {}
+        self._pubsub: Any = None
+        self._listener: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @classmethod
+    def from_settings(cls, reader: TaskStatusReader, settings: TaskEventSettings = TASK_EVENT_CONFIG) -> "TaskEventHub":
+        return cls(reader, settings.heartbeat, settings.poll_interval)
+
+    async def subscribe(self, task_ids: Iterable[str]) -> AsyncIterator[TaskStatus | None]:
+        """
+        Yield the current status of the tasks, then each of their state changes, until they are all ready.
+
+        :param task_ids: The task ids.
+        :return: The statuses, ``None`` when nothing changed during ``heartbeat`` seconds.
+        :raises TimeoutError: If the result backend doesn't answer the reading of the current states.
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        queue: asyncio.Queue[TaskStatus] = asyncio.Queue()
+        # subscribe before reading the current states, so that no change can be missed in between
+        await self._register(task_ids, queue)
+        try:
+            pending = set(task_ids)
+            last_states: dict[str, str] = {}
+            for task_status in await self.reader.get_many(task_ids):
+                queue.put_nowait(task_status)
+
+            while pending:
+                try:
+                    task_status = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except TimeoutError:
+                    yield None
+                    continue
+                if task_status.task_id not in pending or last_states.get(task_status.task_id) == task_status.status:
+                    continue
+                last_states[task_status.task_id] = task_status.status
+                if task_status.status in states.READY_STATES:
+                    pending.discard(task_status.task_id)
+                yield task_status
+        finally:
+            await self._unregister(task_ids, queue)
+
+    async def _register(self, task_ids: list[str], queue: asyncio.Queue[TaskStatus]) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # the connection and the listener of another event loop can't be used
+            self._queues, self._pubsub, self._listener, self._loop = {}, None, None, loop
+
+        new_task_ids = []
+        for task_id in task_ids:
+            if task_id not in self._queues:
+                self._queues[task_id] = set()
+                new_task_ids.append(task_id)
+            self._queues[task_id].add(queue)
+
+        if not self.reader.uses_redis:
+            if self._listener is None:
+                self._listener = asyncio.create_task(self._poll())
+        elif new_task_ids:
+            if self._pubsub is None:
+                self._pubsub = self.reader.redis().pubsub()
+            await self._pubsub.subscribe(*self._channels(new_task_ids))
+            # the pubsub connection can only be read once a first subscription has opened it
+            if self._listener is None:
+                self._listener = asyncio.create_task(self._listen())
+
+    async def _unregister(self, task_ids: list[str], queue: asyncio.Queue[TaskStatus]) -> None:
+        if self._loop is not asyncio.get_running_loop():
+            return
+
+        unused_task_ids = []
+        for task_id in task_ids:
+            queues = self._queues.get(task_id)
+            if queues is None:
+                continue
+            queues.discard(queue)
+            if not queues:
+                del self._queues[task_id]
+                unused_task_ids.append(task_id)
+
+        if self._pubsub is not None and unused_task_ids:
+            await self._pubsub.unsubscribe(*self._channels(unused_task_ids))
+
+    def _channels(self, task_ids: list[str]) -> list[bytes]:
+        # the Redis backend publishes the task meta-data on the key it is stored at
+        return [self.reader.app.backend.get_key_for_task(task_id) for task_id in task_ids]
+
+    def _publish(self, task_status: TaskStatus) -> None:
+        for queue in self._queues.get(task_status.task_id, ()):
+            queue.put_nowait(task_status)
+
+    async def _listen(self) -> None:
+        prefix_length = len(self.reader.app.backend.task_keyprefix)
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to read the task events: {e}")
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if message is None or message["type"] != "message":
+                continue
+            task_id = message["channel"][prefix_length:].decode()
+            # the state is decoded once, whatever the number of subscribers
+            self._publish(self.reader.to_status(task_id, message["data"]))
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if not self._queues:
+                continue
+            try:
+                task_statuses = await self.reader.get_many(list(self._queues))
+            except Exception as e:
+                logger.error(f"Failed to poll the task states: {e}")
+                continue
+            for task_status in task_statuses:
+                self._publish(task_status)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._pubsub is not None:
+            pubsub, self._pubsub = self._pubsub, None
+            await pubsub.aclose()
+        self._queues = {}
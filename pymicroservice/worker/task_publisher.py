@@ -0,0 +1,185 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from loguru import logger
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from pymicroservice.metrics.prometheus_metrics import TASK_PUBLISH_DURATION
+from pymicroservice.worker.task_batch import TASK_BATCH_CONFIG, TaskBatchPublisher, TaskSubmission
+
+if TYPE_CHECKING:
+    from celery import Celery, Task
+    from celery.result import AsyncResult
+
+T = TypeVar("T")
+
+
+class TaskPublisherSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="WORKER_PUBLISH_", validate_default=False)
+    pool_size: int = 10
+    timeout: float = 5
+    drain_timeout: float = 10
+
+
+TASK_PUBLISHER_CONFIG = TaskPublisherSettings()
+
+
+@dataclass(frozen=True)
+class TaskPublisherStats:
+    pending: int
+    published: int
+    failed: int
+    latency_p50: float
+    latency_p99: float
+
+
+class AsyncTaskPublisher:
+    """
+    Publish tasks from the event loop without blocking it, the broker I/O runs in a bounded thread pool.
+
+    Each thread publishes with a producer of the Celery producer pool, whose size is ``broker_pool_limit``: the pool
+    size of the publisher should not exceed it.
+    """
+
+    def __init__(
+        self,
+        app: "Celery",
+        pool_size: int = 10,
+        timeout: float = 5,
+        drain_timeout: float = 10,
+        chunk_size: int = 500,
+    ):
+        """
+        Initialize the publisher, no thread is started until the first publishing.
+
+        :param app: The Celery application.
+        :param pool_size: Maximum number of concurrent publishings.
+        :param timeout: Timeout in seconds of a publishing, including its wait for a free thread.
+        :param drain_timeout: Maximum time in seconds to wait for the pending publishings on close.
+        :param chunk_size: Maximum number of messages sent in a single round trip by ``publish_many``.
+        """
+        self.app = app
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.drain_timeout = drain_timeout
+        self._batch_publisher = TaskBatchPublisher(app, chunk_size)
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending: set[Future] = set()
+        self._published = 0
+        self._failed = 0
+        self._latencies: deque[float] = deque(maxlen=1024)
+
+    @classmethod
+    def from_settings(
+        cls, app: "Celery", settings: TaskPublisherSettings = TASK_PUBLISHER_CONFIG, chunk_size: int | None = None
+    ) -> "AsyncTaskPublisher":
+        return cls(
+            app,
+            settings.pool_size,
+            settings.timeout,
+            settings.drain_timeout,
+            chunk_size or TASK_BATCH_CONFIG.chunk_size,
+        )
+
+    async def publish(self, task: "Task", *args: Any, **options: Any) -> "AsyncResult":
+        """
+        Publish a call of the task, like ``apply_async``.
+
+        :param task: The task to call.
+        :param args: The positional arguments of the call.
+        :param options: The options of ``apply_async``.
+        :raises TimeoutError: If the message is not published within the timeout, it may still be published later.
+        """
+        return await self._run(lambda: task.apply_async(args, **options))
+
+    async def publish_many(self, task: "Task", calls: Sequence[tuple], **options: Any) -> list[TaskSubmission]:
+        """
+        Publish a call of the task for each tuple of arguments, pipelined like ``TaskBatchPublisher.publish``.
+
+        :raises TimeoutError: If the messages are not published within the timeout, they may still be published later.
+        """
+        return await self._run(lambda: self._batch_publisher.publish(task, calls, **options))
+
+    async def _run(self, publish: Callable[[], T]) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.pool_size, thread_name_prefix="task-publisher")
+        submitted_at = time.perf_counter()
+
+        def run() -> T:
+            try:
+                result = publish()
+            except Exception:
+                with self._lock:
+                    self._failed += 1
+                TASK_PUBLISH_DURATION.labels("failure").observe(time.perf_counter() - submitted_at)
+                raise
+            latency = time.perf_counter() - submitted_at
+            with self._lock:
+                self._published += 1
+                self._latencies.append(latency)
+            TASK_PUBLISH_DURATION.labels("success").observe(latency)
+            return result
+
+        future = self._executor.submit(run)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_done)
+        return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+
+    async def ping(self) -> None:
+        """
+        Check the broker is reachable with a connection of the producer pool, opened if needed.
+
+        :raises TimeoutError: If the broker isn't reached within the timeout.
+        """
+
+        def ping() -> None:
+            with self.app.pool.acquire(block=True, timeout=self.timeout) as connection:
+                connection.ensure_connection(max_retries=0, timeout=self.timeout)
+
+        await asyncio.wait_for(asyncio.to_thread(ping), self.timeout)
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    def stats(self) -> TaskPublisherStats:
+        """
+        Return the number of publishings in progress or waiting for a thread, the count of completed ones, and the
+        latencies in seconds of the last ones, from their submission.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            pending, published, failed = len(self._pending), self._published, self._failed
+        if not latencies:
+            return TaskPublisherStats(pending, published, failed, 0.0, 0.0)
+        return TaskPublisherStats(
+            pending,
+            published,
+            failed,
+            latencies[len(latencies) // 2],
+            latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        )
+
+    async def close(self) -> None:
+        """
+        Wait for the pending publishings, up to the drain timeout, and stop the threads.
+        """
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        with self._lock:
+            pending = set(self._pending)
+        if pending:
+            logger.info(f"Waiting for {len(pending)} pending task publishings")
+            _, not_done = await asyncio.to_thread(wait, pending, self.drain_timeout)
+            if not_done:
+                logger.error(f"{len(not_done)} task publishings not completed on shutdown")
+        executor.shutdown(wait=False, cancel_futures=True)
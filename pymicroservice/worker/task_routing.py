@@ -0,0 +1,119 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+if TYPE_CHECKING:
+    from celery import Celery
+
+
+class WorkerQueueSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="WORKER_", validate_default=False)
+    # comma separated names of the queues consumed by a worker, all the declared queues if empty
+    queues: str = ""
+
+    @property
+    def queue_names(self) -> list[str]:
+        return [name.strip() for name in self.queues.split(",") if name.strip()]
+
+
+WORKER_QUEUE_CONFIG = WorkerQueueSettings()
+
+
+@dataclass(frozen=True)
+class WorkerQueue:
+    """
+    A broker queue, with the tuning of the workers consuming it.
+    """
+
+    name: str
+    # pool size added by the queue to the workers consuming it, Celery's default if no consumed queue declares one
+    concurrency: int | None = None
+    # messages reserved per pool slot, 1 for long tasks so they don't wait behind each other on a busy worker
+    prefetch_multiplier: int = 4
+    # enables the message priorities from 0 to max_priority with RabbitMQ, Redis always supports them
+    max_priority: int | None = None
+
+
+@dataclass(frozen=True)
+class TaskRoute:
+    """
+    The queue of a task, and the options applied to all its calls.
+    """
+
+    task: str
+    queue: str
+    # default priority of the calls, see the broker for its order
+    priority: int | None = None
+    # maximum rate of execution by each worker, e.g. "10/s" or "100/m"
+    rate_limit: str | None = None
+
+
+def configure_task_routing(app: "Celery", queues: Sequence[WorkerQueue], routes: Sequence[TaskRoute]) -> None:
+    """
+    Declare the queues and route the tasks to them, before the tasks are registered: the first queue is the queue of
+    the tasks without route.
+
+    :param app: The Celery application, used by the API and the workers.
+    :param queues: The queues.
+    :param routes: The routes of the tasks, by task name.
+    :raises ValueError: If a task is routed to an undeclared queue.
+    """
+    from kombu import Exchange, Queue
+
+    if not queues:
+        raise ValueError("At least one queue must be declared.")
+    names = {queue.name for queue in queues}
+    for route in routes:
+        if route.queue not in names:
+            raise ValueError(f"Task {route.task} is routed to the undeclared queue {route.queue}.")
+
+    annotations: dict[str, dict[str, Any]] = {}
+    for route in routes:
+        options = {"priority": route.priority, "rate_limit": route.rate_limit}
+        if any(value is not None for value in options.values()):
+            annotations[route.task] = {name: value for name, value in options.items() if value is not None}
+
+    app.conf.update(
+        task_queues=[
+            Queue(
+                queue.name,
+                Exchange(queue.name),
+                routing_key=queue.name,
+                queue_arguments=None if queue.max_priority is None else {"x-max-priority": queue.max_priority},
+            )
+            for queue in queues
+        ],
+        task_default_queue=queues[0].name,
+        task_routes={route.task: {"queue": route.queue} for route in routes},
+        task_annotations=annotations,
+    )
+
+
+def bind_worker_to_queues(
+    app: "Celery", queues: Sequence[WorkerQueue], names: Sequence[str] = (), tune_concurrency: bool = True
+) -> list[WorkerQueue]:
+    """
+    Make the worker consume a set of queues, with the sum of their concurrencies and the lowest of their prefetch
+    multipliers, so a worker serving a latency-sensitive queue doesn't reserve messages behind long tasks.
+
+    :param app: The Celery application of the worker, whose queues are declared.
+    :param queues: The declared queues.
+    :param names: The names of the consumed queues, all the queues if empty.
+    :param tune_concurrency: Whether the concurrency of the worker is set from the queues.
+    :return: The consumed queues.
+    :raises ValueError: If a name isn't a declared queue.
+    """
+    by_name = {queue.name: queue for queue in queues}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown queues: {', '.join(unknown)}.")
+    selected = [by_name[name] for name in names] if names else list(queues)
+
+    app.amqp.queues.select([queue.name for queue in selected])
+    app.conf.worker_prefetch_multiplier = min(queue.prefetch_multiplier for queue in selected)
+    concurrencies = [queue.concurrency for queue in selected if queue.concurrency is not None]
+    if tune_concurrency and concurrencies:
+        app.conf.worker_concurrency = sum(concurrencies)
+    return selected
@@ -0,0 +1,188 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from celery import states
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from pymicroservice.metrics.prometheus_metrics import TASK_STATUS_LOOKUP_DURATION
+
+if TYPE_CHECKING:
+    from celery import Celery
+
+
+class TaskStatusSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="WORKER_STATUS_", validate_default=False)
+    pool_size: int = 20
+    timeout: float = 5
+    max_batch_size: int = 1000
+
+
+TASK_STATUS_CONFIG = TaskStatusSettings()
+
+
+@dataclass
+class TaskStatus:
+    task_id: str
+    status: str
+    result: Any = None
+
+
+class TaskStatusReader:
+    """
+    Read the state and result of tasks from the result backend without blocking the event loop.
+
+    With a Redis result backend, lookups are made with a pooled asyncio Redis client, in a single round trip.
+    With any other backend, they run in a bounded thread pool.
+    """
+
+    def __init__(
+        self,
+        app: "Celery",
+        pool_size: int = 20,
+        timeout: float = 5,
+        client_factory: Callable[[], Any] | None = None,
+    ):
+        """
+        Initialize the reader, no connection is opened until the first lookup.
+
+        :param app: The Celery application whose result backend is read.
+        :param pool_size: Maximum number of connections (or threads) used for lookups.
+        :param timeout: Timeout in seconds of a lookup.
+        :param client_factory: Create the asyncio Redis client of an event loop, a client of the backend URL by
+            default.
+        """
+        self.app = app
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.client_factory = client_factory or self._create_client
+        self._client: Any = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    @classmethod
+    def from_settings(cls, app: "Celery", settings: TaskStatusSettings = TASK_STATUS_CONFIG) -> "TaskStatusReader":
+        return cls(app, settings.pool_size, settings.timeout)
+
+    @property
+    def uses_redis(self) -> bool:
+        from celery.backends.redis import RedisBackend
+
+        return isinstance(self.app.backend, RedisBackend)
+
+    def _create_client(self) -> Any:
+        import redis.asyncio
+
+        return redis.asyncio.Redis.from_url(self.app.backend.url, max_connections=self.pool_size)
+
+    def redis(self) -> Any:
+        """
+        Return the asyncio Redis client of the running event loop, only for a Redis result backend.
+        """
+        # an asyncio connection pool is bound to the event loop it was created in
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = self.client_factory()
+            self._client_loop = loop
+        return self._client
+
+    async def get(self, task_id: str) -> TaskStatus:
+        """
+        Read the status of a task, an unknown task is PENDING.
+
+        :param task_id: The task id.
+        :raises TimeoutError: If the result backend doesn't answer within the timeout.
+        """
+        return (await self.get_many([task_id]))[0]
+
+    async def get_many(self, task_ids: list[str]) -> list[TaskStatus]:
+        """
+        Read the status of several tasks, in the order of the task ids.
+
+        :param task_ids: The task ids.
+        :raises TimeoutError: If the result backend doesn't answer within the timeout.
+        """
+        if not task_ids:
+            return []
+
+        start = time.perf_counter()
+        result = "failure"
+        try:
+            if self.uses_redis:
+                backend = self.app.backend
+                keys = [backend.get_key_for_task(task_id) for task_id in task_ids]
+                values = await asyncio.wait_for(self.redis().mget(keys), self.timeout)
+            else:
+                values = await asyncio.wait_for(self._read_in_executor(task_ids), self.timeout)
+            result = "success"
+        finally:
+            TASK_STATUS_LOOKUP_DURATION.labels(result).observe(time.perf_counter() - start)
+
+        return [self.to_status(task_id, value) for task_id, value in zip(task_ids, values, strict=True)]
+
+    async def stream_large_result(self, task_id: str, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+        """
+        Read the compressed payload of a large result in chunks, only for a LargeResultRedisBackend.
+        Nothing is yielded if the payload expired.
+
+        :param task_id: The task id.
+        :param chunk_size: Number of bytes read per round trip.
+        :raises TimeoutError: If the result backend doesn't answer within the timeout.
+        """
+        key = self.app.backend.get_key_for_large_result(task_id)
+        client = self.redis()
+        offset = 0
+        while True:
+            chunk = await asyncio.wait_for(client.getrange(key, offset, offset + chunk_size - 1), self.timeout)
+            if chunk:
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+            offset += chunk_size
+
+    async def ping(self) -> None:
+        """
+        Check the result backend answers, with a PING for Redis or a read of an unknown task otherwise.
+
+        :raises TimeoutError: If the result backend doesn't answer within the timeout.
+        """
+        if self.uses_redis:
+            await asyncio.wait_for(self.redis().ping(), self.timeout)
+        else:
+            await asyncio.wait_for(self._read_in_executor(["readiness-ping"]), self.timeout)
+
+    def _read_in_executor(self, task_ids: list[str]) -> asyncio.Future[list[Any]]:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.pool_size, thread_name_prefix="task-status")
+        return asyncio.get_running_loop().run_in_executor(self._executor, self._read_values, task_ids)
+
+    def _read_values(self, task_ids: list[str]) -> list[Any]:
+        from celery.backends.base import KeyValueStoreBackend
+
+        backend = self.app.backend
+        if isinstance(backend, KeyValueStoreBackend):
+            keys = [backend.get_key_for_task(task_id) for task_id in task_ids]
+            values = backend.mget(keys)
+            # some clients return a mapping instead of a list
+            return [values.get(key) for key in keys] if hasattr(values, "get") else values
+        return [backend.get_task_meta(task_id, cache=False) for task_id in task_ids]
+
+    def to_status(self, task_id: str, value: Any) -> TaskStatus:
+        """
+        Build the status of a task from the value stored in the result backend, an empty value is PENDING.
+        """
+        if not value:
+            return TaskStatus(task_id, states.PENDING)
+        meta = value if isinstance(value, dict) else self.app.backend.decode_result(value)
+        return TaskStatus(task_id, meta["status"], meta.get("result"))
+
+    async def close(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
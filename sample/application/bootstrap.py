@@ -1,41 +1,146 @@
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
 
-from celery import Celery
 from fastapi import FastAPI
 from loguru import logger
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from pymicroservice.health.readiness_registry import READINESS_REGISTRY
 from pymicroservice.logger.logger_config import LoggerConfig
-from pymicroservice.worker.register_pydantic import register_pydantic_types
-from sample.application.health import health_endpoint
+from pymicroservice.metrics.prometheus_metrics import METRICS_CONFIG, MetricsMiddleware, build_metrics_router
+from pymicroservice.profiling.profiling_middleware import PROFILING_CONFIG, ProfilingMiddleware
+from pymicroservice.security.oidc import OidcConfigSingleton
+from pymicroservice.startup.deferred_setup import DeferredSetup
+from pymicroservice.startup.lazy_module import LazyModule
+from pymicroservice.startup.startup_timer import STARTUP_TIMER
+from pymicroservice.worker.task_routing import (
+    WORKER_QUEUE_CONFIG,
+    TaskRoute,
+    WorkerQueue,
+    bind_worker_to_queues,
+    configure_task_routing,
+)
+from sample.application.health import health_endpoint, readiness_checks
 from sample.application.user import user_endpoint
 from sample.application.worker import worker_endpoint
 from sample.domain.user_model import UserTask
-from sample.infrastructure.celery import WORKER
+
+if TYPE_CHECKING:
+    from celery import Celery
 
 API_ROUTE_PREFIX: str = os.getenv("API_ROUTE_PREFIX", "/api/v1")
 
 
+class BootstrapSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="BOOTSTRAP_", validate_default=False)
+    # API only: Celery, the tasks and their types are loaded on the first request using them
+    lazy_workers: bool = False
+
+
+BOOTSTRAP_CONFIG = BootstrapSettings()
+
+celery_infrastructure = LazyModule("sample.infrastructure.celery")
+
+
 class Bootstrap:
     # List of endpoints
     API_ENDPOINTS = [user_endpoint, worker_endpoint]
     WORKER_PACKAGES = ["sample.application.user"]
     WORKER_PYDANTIC_MODELS = [UserTask]
+    # The first queue receives the tasks without route, a worker consumes the queues of WORKER_QUEUES
+    WORKER_QUEUES = [
+        WorkerQueue("celery", concurrency=4, prefetch_multiplier=4),
+        WorkerQueue("long_running", concurrency=4, prefetch_multiplier=1),
+    ]
+    WORKER_ROUTES = [
+        TaskRoute("sample.application.user.tasks.user_sample_task", queue="long_running"),
+    ]
 
     @classmethod
-    def build_api(cls, production: bool = False) -> FastAPI:
+    def build_api(cls, production: bool = False, lazy_workers: bool | None = None) -> FastAPI:
+        """
+        Build the API, the startup phases are measured and reported once the application is started.
+
+        :param production: Whether the logger is configured for gunicorn.
+        :param lazy_workers: Whether the worker setup waits for its first use, ``BOOTSTRAP_LAZY_WORKERS`` by default.
+        """
         logger.info("🚀 Creating API")
-        LoggerConfig.configure(production)
-        app = FastAPI(debug=False)
-        cls._setup_routers(logger, app)
-        cls._setup_workers()
+        with STARTUP_TIMER.phase("logger"):
+            LoggerConfig.configure(production)
+        app = FastAPI(debug=False, lifespan=cls._lifespan)
+        with STARTUP_TIMER.phase("routers"):
+            cls._setup_routers(logger, app)
+        if METRICS_CONFIG.enabled:
+            app.add_middleware(MetricsMiddleware)
+            app.include_router(build_metrics_router(METRICS_CONFIG.path))
+        if PROFILING_CONFIG.enabled:
+            app.add_middleware(
+                ProfilingMiddleware,
+                sample_rate=PROFILING_CONFIG.sample_rate,
+                secret=PROFILING_CONFIG.secret,
+                header=PROFILING_CONFIG.header,
+                output_dir=PROFILING_CONFIG.output_dir,
+            )
+        READINESS_REGISTRY.register("oidc", readiness_checks.oidc_check)
+        if BOOTSTRAP_CONFIG.lazy_workers if lazy_workers is None else lazy_workers:
+            # run off the event loop by the first request using the workers, see wait_for_setup
+            app.state.worker_setup = DeferredSetup(cls._setup_lazy_workers)
+        else:
+            with STARTUP_TIMER.phase("workers"):
+                cls._setup_workers()
+            cls._setup_worker_checks()
         return app
 
+    @staticmethod
+    @asynccontextmanager
+    async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+        # resolve OIDC discovery and signing keys before serving traffic
+        with STARTUP_TIMER.phase("oidc"):
+            await OidcConfigSingleton.initialize()
+        with STARTUP_TIMER.phase("readiness"):
+            await READINESS_REGISTRY.start()
+        STARTUP_TIMER.report()
+        yield
+        await READINESS_REGISTRY.close()
+        await OidcConfigSingleton.close()
+        # nothing to close when no request used the workers
+        if celery_infrastructure.loaded:
+            await celery_infrastructure.ADMISSION_CONTROLLER.close()
+            await celery_infrastructure.TASK_PUBLISHER.close()
+            await celery_infrastructure.TASK_EVENT_HUB.close()
+            await celery_infrastructure.TASK_STATUS_READER.close()
+
     @classmethod
-    def build_worker(cls, production: bool = False) -> Celery:
+    def build_worker(cls, production: bool = False, queues: list[str] | None = None) -> "Celery":
+        """
+        Build the worker, bound to a set of the declared queues.
+
+        :param production: Whether the logger is configured for production.
+        :param queues: The names of the consumed queues, ``WORKER_QUEUES`` by default, all the queues if empty.
+        """
+        from pymicroservice.worker.async_task import ASYNCIO_POOL, ASYNCIO_WORKER_CONFIG
+
         logger.info("🚀 Creating Worker")
-        LoggerConfig.configure(production)
-        cls._setup_workers()
-        return WORKER
+        with STARTUP_TIMER.phase("logger"):
+            LoggerConfig.configure(production)
+        with STARTUP_TIMER.phase("workers"):
+            cls._setup_workers()
+        STARTUP_TIMER.report()
+        worker = celery_infrastructure.WORKER
+        if ASYNCIO_WORKER_CONFIG.enabled:
+            # async tasks wait on the event loop of the process, a thread per task in flight
+            worker.conf.update(worker_pool=ASYNCIO_POOL, worker_concurrency=ASYNCIO_WORKER_CONFIG.concurrency)
+        # the concurrencies of the queues size a process or thread pool, not the coroutines of the asyncio pool
+        consumed = bind_worker_to_queues(
+            worker,
+            cls.WORKER_QUEUES,
+            WORKER_QUEUE_CONFIG.queue_names if queues is None else queues,
+            tune_concurrency=not ASYNCIO_WORKER_CONFIG.enabled,
+        )
+        logger.info(f"Consuming the queues {', '.join(queue.name for queue in consumed)}")
+        return worker
 
     @classmethod
     def _setup_routers(cls, logger, app: FastAPI):
@@ -48,5 +153,26 @@ class Bootstrap:
 
     @classmethod
     def _setup_workers(cls):
-        WORKER.autodiscover_tasks(Bootstrap.WORKER_PACKAGES, force=True)
+        # imported here, the API can defer them to the first request using the workers
+        from pymicroservice.worker.pydantic_msgpack import PYDANTIC_MSGPACK_SERIALIZER
+        from pymicroservice.worker.register_pydantic import register_pydantic_types
+
+        # the routes are used by the API to publish, and the annotations must be set before the tasks are registered
+        configure_task_routing(celery_infrastructure.WORKER, Bootstrap.WORKER_QUEUES, Bootstrap.WORKER_ROUTES)
+        celery_infrastructure.WORKER.autodiscover_tasks(Bootstrap.WORKER_PACKAGES, force=True)
         register_pydantic_types(Bootstrap.WORKER_PYDANTIC_MODELS)
+        PYDANTIC_MSGPACK_SERIALIZER.register_types(Bootstrap.WORKER_PYDANTIC_MODELS)
+        PYDANTIC_MSGPACK_SERIALIZER.register()
+
+    @classmethod
+    def _setup_worker_checks(cls):
+        # checked by the API only, the readiness of a worker is checked with celery inspect ping
+        READINESS_REGISTRY.register("broker", readiness_checks.broker_check)
+        READINESS_REGISTRY.register("result_backend", readiness_checks.result_backend_check)
+
+    @classmethod
+    def _setup_lazy_workers(cls):
+        with STARTUP_TIMER.phase("workers"):
+            cls._setup_workers()
+        cls._setup_worker_checks()
+        STARTUP_TIMER.report("Workers loaded on first use")
@@ -1,4 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from pymicroservice.health.readiness_registry import READINESS_REGISTRY
 
 router = APIRouter()
 
@@ -25,8 +28,8 @@ async def liveness_check():
 async def readiness_check():
     """
     Readiness check to monitor if the application is ready to serve traffic.
-    Add checks for database connections, external services, etc., here.
-    Returns 200 OK if the application is ready.
+    Returns the last results of the dependency checks registered in the Bootstrap, run in the background: 200 OK if
+    they are all up, 503 otherwise. The probe itself checks nothing.
 
     deployment.yaml :
 
@@ -37,9 +40,8 @@ async def readiness_check():
         initialDelaySeconds: 5
         periodSeconds: 5
     """
-    # # Example: Add logic to verify database connection or other dependencies
-    # db_connected = True  # Replace with actual check
-    # if not db_connected:
-    #     return {"status": "not ready"}, 503
+    ready, snapshot = READINESS_REGISTRY.snapshot()
+    if not ready:
+        return JSONResponse(snapshot, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
 
-    return {"status": "up"}
+    return snapshot
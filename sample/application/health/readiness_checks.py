@@ -0,0 +1,20 @@
+from pymicroservice.security.oidc import OidcConfigSingleton
+from pymicroservice.startup.lazy_module import LazyModule
+
+celery_infrastructure = LazyModule("sample.infrastructure.celery")
+
+
+async def oidc_check() -> bool:
+    """
+    The OIDC signing keys are loaded, or OIDC is disabled. They are loaded by the check until they are, the
+    check interval spaces the attempts while the provider is down.
+    """
+    return await OidcConfigSingleton.load()
+
+
+async def broker_check() -> None:
+    await celery_infrastructure.TASK_PUBLISHER.ping()
+
+
+async def result_backend_check() -> None:
+    await celery_infrastructure.TASK_STATUS_READER.ping()
@@ -1,6 +1,6 @@
-from time import sleep
+import asyncio
 
-from loguru import logger
+from pymicroservice.logger.sampling import sampled_logger
 
 # from sample.main_worker import CELERY_APP
 from sample.domain.user_model import UserTask
@@ -8,7 +8,7 @@ from sample.infrastructure.celery import WORKER
 
 
 @WORKER.task
-def user_sample_task(user: UserTask) -> str:
+async def user_sample_task(user: UserTask) -> str:
     """
     Executes a sample task that simulates a long-running operation.
 
@@ -18,7 +18,7 @@ def user_sample_task(user: UserTask) -> str:
     Returns:
         str: A message indicating that the task has been completed.
     """
-    logger.debug(f"Task {user.name} started")
-    sleep(5)  # Simulate a long-running operation
-    logger.debug(f"Task {user.name} completed")
+    sampled_logger.debug("Task {} started", user.name)
+    await asyncio.sleep(5)  # Simulate a long-running I/O-bound operation
+    sampled_logger.debug("Task {} completed", user.name)
     return f"Task completed: {user.name}"
@@ -1,13 +1,48 @@
-from fastapi import APIRouter, Depends
+from collections.abc import Awaitable
+from typing import Any
 
-from pymicroservice.security.oidc import oidc_auth
+from fastapi import APIRouter, Depends, HTTPException, status
+from kombu.exceptions import OperationalError
+from pydantic import BaseModel, Field
+
+from pymicroservice.cache.response_cache import cache_response
+from pymicroservice.security.oidc import oidc_auth, require_roles
 from pymicroservice.security.token import JWTAccessToken
-from sample.application.user.tasks import user_sample_task
+from pymicroservice.startup.deferred_setup import wait_for_setup
+from pymicroservice.startup.lazy_module import LazyModule
+from pymicroservice.worker.admission_control import admission_control
+from pymicroservice.worker.task_batch import TASK_BATCH_CONFIG
 from sample.domain.user_model import UserTask
 
 router = APIRouter()
 
+# imported on first use, see Bootstrap
+celery_infrastructure = LazyModule("sample.infrastructure.celery")
+user_tasks = LazyModule("sample.application.user.tasks")
+
 oidc_auth_dependency = Depends(oidc_auth)
+admin_role_dependency = Depends(require_roles("admin"))
+# the lazy setup of the workers, completed before any use of the lazy modules
+worker_setup_dependency = Depends(wait_for_setup("worker_setup"))
+sample_task_admission_dependency = Depends(
+    admission_control(
+        "sample.application.user.tasks.user_sample_task", lambda: celery_infrastructure.ADMISSION_CONTROLLER
+    )
+)
+
+
+class UserTaskBatch(BaseModel):
+    tasks: list[UserTask] = Field(min_length=1, max_length=TASK_BATCH_CONFIG.max_size)
+
+
+async def _publish(publishing: Awaitable[Any]) -> Any:
+    try:
+        return await publishing
+    except (TimeoutError, OperationalError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Broker unavailable.",
+        ) from e
 
 
 @router.get("/user/protected")
@@ -15,10 +50,19 @@ async def protected_route(access_token: JWTAccessToken = oidc_auth_dependency):
     """
     Protected route example.
     """
-    return {"message": "Authorized access", "JWTAccessToken": access_token}
+    return {"message": "Authorized access", "JWTAccessToken": access_token.to_dict()}
+
+
+@router.get("/user/admin")
+async def admin_route(access_token: JWTAccessToken = admin_role_dependency):
+    """
+    Protected route example, restricted to the tokens with the admin realm role.
+    """
+    return {"message": "Authorized admin access", "sub": access_token.sub}
 
 
 @router.get("/user/public")
+@cache_response(ttl=60)
 async def public_route():
     """
     Public route example.
@@ -26,10 +70,28 @@ async def public_route():
     return {"message": "Welcome in a public place"}
 
 
-@router.post("/user/task")
+@router.post("/user/task", dependencies=[worker_setup_dependency, sample_task_admission_dependency])
 async def run_sample_task(user: UserTask):
     """
     Public route example.
     """
-    task = user_sample_task.delay(user)
+    task = await _publish(celery_infrastructure.TASK_PUBLISHER.publish(user_tasks.user_sample_task, user))
     return {"task_id": task.id, "status": "Task submitted"}
+
+
+@router.post("/user/tasks", dependencies=[worker_setup_dependency, sample_task_admission_dependency])
+async def run_sample_tasks(batch: UserTaskBatch):
+    """
+    Submit a sample task for each user, published to the broker in pipelined chunks.
+    The submissions are rejected with a 429 while the queue of the task is full, see ``AdmissionController``.
+    """
+    calls = [(user,) for user in batch.tasks]
+    submissions = await _publish(celery_infrastructure.TASK_PUBLISHER.publish_many(user_tasks.user_sample_task, calls))
+    return {
+        "tasks": [
+            {"task_id": submission.task_id, "status": "Task submitted"}
+            if submission.error is None
+            else {"status": "Task not submitted", "error": submission.error}
+            for submission in submissions
+        ]
+    }
@@ -1,20 +1,166 @@
-from fastapi import APIRouter
+import json
+from collections.abc import AsyncIterator
+from typing import Annotated
 
-from sample.infrastructure.celery import WORKER
+from celery import states
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
-router = APIRouter()
+from pymicroservice.cache.response_cache import RESPONSE_CACHE_CONFIG, ResponseCache
+from pymicroservice.startup.deferred_setup import wait_for_setup
+from pymicroservice.startup.lazy_module import LazyModule
+from pymicroservice.worker.large_result import LARGE_RESULT_CONFIG, LargeResult, decompress_chunks
+from pymicroservice.worker.task_events import TaskEventHub
+from pymicroservice.worker.task_status import TASK_STATUS_CONFIG, TaskStatus, TaskStatusReader
+
+# all the routes use the workers, their lazy setup is completed before any use of the lazy modules
+router = APIRouter(dependencies=[Depends(wait_for_setup("worker_setup"))])
+
+# imported on first use, see Bootstrap
+celery_infrastructure = LazyModule("sample.infrastructure.celery")
+
+# the state of a finished task never changes, it's read once from the result backend by each process
+TASK_STATUS_CACHE = ResponseCache.from_settings("task_status")
+
+
+class TaskStatusBatch(BaseModel):
+    task_ids: list[str] = Field(min_length=1, max_length=TASK_STATUS_CONFIG.max_batch_size)
+
+
+def _task_status_response(task_status: TaskStatus, request: Request) -> dict:
+    if task_status.status == "SUCCESS":
+        large_result = LargeResult.from_result(task_status.result)
+        if large_result is not None:
+            # too large to be embedded, it's downloaded from the result route
+            return {
+                "task_id": task_status.task_id,
+                "status": task_status.status,
+                "result_url": request.url_for("get_task_result", task_id=task_status.task_id).path,
+                "result_size": large_result.size,
+            }
+        return {
+            "task_id": task_status.task_id,
+            "status": task_status.status,
+            "result": task_status.result,
+        }
+    return {"task_id": task_status.task_id, "status": task_status.status}
+
+
+async def _read_task_status(reader: TaskStatusReader, task_ids: list[str]) -> list[TaskStatus]:
+    try:
+        return await reader.get_many(task_ids)
+    except TimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Result backend unavailable.",
+        ) from e
 
 
 @router.get("/worker/task/{task_id}")
-async def get_task_status(task_id: str):
+async def get_task_status(task_id: str, request: Request):
     """
     Get the status of a Celery task by task_id.
+    The state of a finished task is served from the cache of the process, with an ETag.
     """
-    task_result = WORKER.AsyncResult(task_id)
-    if task_result.state == "SUCCESS":
-        return {
-            "task_id": task_id,
-            "status": task_result.state,
-            "result": task_result.result,
-        }
-    return {"task_id": task_id, "status": task_result.state}
+    cached = TASK_STATUS_CACHE.get(task_id) if RESPONSE_CACHE_CONFIG.enabled else None
+    if cached is None:
+        (task_status,) = await _read_task_status(celery_infrastructure.TASK_STATUS_READER, [task_id])
+        if not RESPONSE_CACHE_CONFIG.enabled or task_status.status not in states.READY_STATES:
+            return _task_status_response(task_status, request)
+        cached = TASK_STATUS_CACHE.put(task_id, _task_status_response(task_status, request))
+    return cached.response(request)
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            quality = params.strip().removeprefix("q=")
+            try:
+                return not quality or float(quality) > 0
+            except ValueError:
+                return False
+    return False
+
+
+async def _prepend(first: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    yield first
+    async for chunk in chunks:
+        yield chunk
+
+
+@router.get("/worker/task/{task_id}/result")
+async def get_task_result(task_id: str, request: Request):
+    """
+    Download the result of a successful Celery task.
+
+    A large result is streamed from the result backend in chunks, as stored when the client accepts gzip,
+    decompressed on the fly otherwise.
+    """
+    reader = celery_infrastructure.TASK_STATUS_READER
+    (task_status,) = await _read_task_status(reader, [task_id])
+    if task_status.status != states.SUCCESS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task result not available.")
+    large_result = LargeResult.from_result(task_status.result)
+    if large_result is None:
+        return task_status.result
+
+    chunks = reader.stream_large_result(task_id, LARGE_RESULT_CONFIG.chunk_size)
+    try:
+        first = await anext(chunks, None)
+    except TimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Result backend unavailable.",
+        ) from e
+    if first is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task result expired.")
+
+    headers = {"Vary": "Accept-Encoding"}
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        body = _prepend(first, chunks)
+        headers.update({"Content-Encoding": "gzip", "Content-Length": str(large_result.compressed_size)})
+    else:
+        body = decompress_chunks(_prepend(first, chunks))
+        headers["Content-Length"] = str(large_result.size)
+    return StreamingResponse(body, media_type=large_result.content_type, headers=headers)
+
+
+@router.post("/worker/tasks/status")
+async def get_tasks_status(batch: TaskStatusBatch, request: Request):
+    """
+    Get the status of several Celery tasks, read from the result backend in a single round trip.
+    """
+    task_statuses = await _read_task_status(celery_infrastructure.TASK_STATUS_READER, batch.task_ids)
+    return {"tasks": [_task_status_response(task_status, request) for task_status in task_statuses]}
+
+
+async def _task_events(hub: TaskEventHub, task_ids: list[str], request: Request) -> AsyncIterator[str]:
+    try:
+        async for task_status in hub.subscribe(task_ids):
+            if task_status is None:
+                yield ": keep-alive\n\n"
+            else:
+                data = json.dumps(jsonable_encoder(_task_status_response(task_status, request)))
+                yield f"event: status\ndata: {data}\n\n"
+    except TimeoutError:
+        yield f"event: error\ndata: {json.dumps({'detail': 'Result backend unavailable.'})}\n\n"
+
+
+@router.get("/worker/tasks/events")
+async def stream_tasks_events(
+    task_id: Annotated[list[str], Query(min_length=1, max_length=TASK_STATUS_CONFIG.max_batch_size)],
+    request: Request,
+):
+    """
+    Stream the state changes of Celery tasks as Server-Sent Events, until all the tasks are ready.
+
+    The current state of each task is sent first, so no state change is missed.
+    """
+    return StreamingResponse(
+        _task_events(celery_infrastructure.TASK_EVENT_HUB, task_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,6 +2,14 @@ from celery import Celery
 from loguru import logger
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from pymicroservice.worker.admission_control import AdmissionController, QueueDepthMonitor
+from pymicroservice.worker.async_task import AsyncTask
+from pymicroservice.worker.large_result import large_result_backend_url
+from pymicroservice.worker.pydantic_msgpack import SERIALIZER_NAME
+from pymicroservice.worker.task_events import TaskEventHub
+from pymicroservice.worker.task_publisher import AsyncTaskPublisher
+from pymicroservice.worker.task_status import TaskStatusReader
+
 logger.info("🔧 Setting up Celery")
 
 
@@ -9,15 +17,24 @@ class CeleryConfig(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="CELERY_", validate_default=False)
     broker_url: str = "redis://localhost:6379"
     result_backend: str = "redis://localhost:6379"
+    task_serializer: str = "json"
 
 
 CELERY_CONFIG = CeleryConfig()
 
 
-WORKER = Celery("sample_app", broker=CELERY_CONFIG.broker_url)
+WORKER = Celery("sample_app", broker=CELERY_CONFIG.broker_url, task_cls=AsyncTask)
 WORKER.conf.update(
     broker_url=CELERY_CONFIG.broker_url,
-    result_backend=CELERY_CONFIG.result_backend,
+    # results above WORKER_LARGE_RESULT_THRESHOLD are compressed when WORKER_LARGE_RESULT_ENABLED is set
+    result_backend=large_result_backend_url(CELERY_CONFIG.result_backend),
+    task_serializer=CELERY_CONFIG.task_serializer,
+    accept_content=["json", SERIALIZER_NAME],
 )
 
+TASK_STATUS_READER = TaskStatusReader.from_settings(WORKER)
+TASK_EVENT_HUB = TaskEventHub.from_settings(TASK_STATUS_READER)
+TASK_PUBLISHER = AsyncTaskPublisher.from_settings(WORKER)
+ADMISSION_CONTROLLER = AdmissionController.from_settings(QueueDepthMonitor.from_settings(WORKER))
+
 # This snippet is used to autodiscover tasks from the application, here we are using the user module as an example
@@ -1,13 +1,20 @@
 import os
 
-from gunicorn.app.base import BaseApplication
-
-from pymicroservice.logger.logger_config import StubbedGunicornLogger
-from sample.application.bootstrap import Bootstrap
+from pymicroservice.metrics.multiprocess import child_exit, prepare_multiprocess_dir
+from pymicroservice.startup.startup_timer import STARTUP_TIMER
 
 GUNICORN_WORKERS = int(os.environ.get("GUNICORN_WORKERS", "1"))
 PORT = int(os.environ.get("GUNICORN_PORT", "8000"))
 
+# before prometheus_client is imported, the workers write their metrics to a shared directory
+prepare_multiprocess_dir(GUNICORN_WORKERS)
+
+with STARTUP_TIMER.phase("imports"):
+    from gunicorn.app.base import BaseApplication
+
+    from pymicroservice.logger.logger_config import StubbedGunicornLogger
+    from sample.application.bootstrap import Bootstrap
+
 
 class StandaloneApplication(BaseApplication):
     def __init__(self, app, options=None):
@@ -32,6 +39,7 @@ if __name__ == "__main__":
         "errorlog": "-",
         "worker_class": "uvicorn.workers.UvicornWorker",
         "logger_class": StubbedGunicornLogger,
+        "child_exit": child_exit,
     }
 
     StandaloneApplication(Bootstrap.build_api(production=True), options).run()
@@ -1,6 +1,9 @@
-from celery import Celery
+from pymicroservice.startup.startup_timer import STARTUP_TIMER
 
-from sample.application.bootstrap import Bootstrap
+with STARTUP_TIMER.phase("imports"):
+    from celery import Celery
+
+    from sample.application.bootstrap import Bootstrap
 
 app: Celery = Bootstrap.build_worker(production=True)
 
@@ -1,5 +1,5 @@
+import json
 import os
-from time import sleep
 
 import requests
 from fastapi import FastAPI
@@ -12,7 +12,7 @@ client = TestClient(app)
 
 
 def _get_token():
-    token_url = f"{os.getenv("TEST_KEYCLOAK_URL")}/realms/pymicroservice/protocol/openid-connect/token"
+    token_url = f"{os.getenv('TEST_KEYCLOAK_URL')}/realms/pymicroservice/protocol/openid-connect/token"
     token_payload = {
         "grant_type": "password",
         "client_id": "myclient",
@@ -69,9 +69,9 @@ def test_task():
     status_task = response.json()
     assert status_task.get("status") == "PENDING"
 
-    # we need to wait for the task to be completed
-    sleep(10)
-    response = client.get(query)
-    assert response.status_code == 200
-    status_task = response.json()
-    assert status_task.get("status") == "SUCCESS"
+    # follow the task until it is completed
+    query = f"/api/v1/worker/tasks/events?task_id={created_task_data.get('task_id')}"
+    with client.stream("GET", query, timeout=30) as response:
+        assert response.status_code == 200
+        events = [json.loads(line[len("data: ") :]) for line in response.iter_lines() if line.startswith("data: ")]
+    assert events[-1].get("status") == "SUCCESS"
@@ -1,7 +1,11 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from pymicroservice.health.readiness_registry import ReadinessRegistry
 from sample.application.bootstrap import Bootstrap
+from sample.application.health import health_endpoint, readiness_checks
 
 app: FastAPI = Bootstrap.build_api()
 client = TestClient(app)
@@ -11,9 +15,22 @@ def test_health_liveness():
     response = client.get("/health/liveness")
     assert response.status_code == 200
     assert response.json() == {"status": "alive"}
+    # a probe is never answered from a cache
+    assert "Cache-Control" not in response.headers
+    assert "ETag" not in response.headers
+
 
+def test_health_readiness(monkeypatch):
+    registry = ReadinessRegistry()
+    registry.register("oidc", readiness_checks.oidc_check)
+    monkeypatch.setattr(health_endpoint, "READINESS_REGISTRY", registry)
+
+    response = client.get("/health/readiness")
+    assert response.status_code == 503
+    assert response.json() == {"status": "not ready", "checks": {"oidc": {"status": "pending"}}}
 
-def test_health_readiness():
+    asyncio.run(registry.run_checks())
     response = client.get("/health/readiness")
     assert response.status_code == 200
-    assert response.json() == {"status": "up"}
+    assert response.json()["status"] == "up"
+    assert response.json()["checks"]["oidc"].keys() == {"status", "age", "latency"}
@@ -0,0 +1,125 @@
+import asyncio
+from contextlib import AsyncExitStack
+
+from celery import Celery
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from pymicroservice.worker.admission_control import (
+    AdmissionController,
+    AdmissionLimits,
+    ConcurrencyLimiter,
+    QueueDepthMonitor,
+    admission_control,
+)
+
+
+class FixedDepthMonitor(QueueDepthMonitor):
+    def __init__(self, depth: int | None):
+        super().__init__(Celery("test", broker="memory://"))
+        self.fixed_depth = depth
+
+    def depth(self, queue: str) -> int | None:
+        return self.fixed_depth
+
+
+def test_queue_depth_is_read_in_the_background():
+    app = Celery("test", broker="memory://")
+
+    @app.task(name="test.add")
+    def add():
+        pass
+
+    monitor = QueueDepthMonitor(app, refresh_interval=0)
+    queue = monitor.queue_for("test.add")
+
+    async def read() -> list[int | None]:
+        depths = [monitor.depth(queue)]
+        await asyncio.sleep(0.1)
+        depths.append(monitor.depth(queue))
+        for _ in range(3):
+            add.delay()
+        await asyncio.sleep(0.1)
+        depths.append(monitor.depth(queue))
+        await monitor.close()
+        return depths
+
+    assert queue == "celery"
+    # unknown until the first reading, then the reading refreshed by the previous lookup
+    assert asyncio.run(read()) == [None, 0, 3]
+
+
+def test_concurrency_limiter():
+    limiter = ConcurrencyLimiter(2)
+
+    assert [limiter.try_acquire() for _ in range(3)] == [True, True, False]
+    limiter.release()
+    assert limiter.try_acquire()
+    assert all(ConcurrencyLimiter(0).try_acquire() for _ in range(1000))
+
+
+def test_limits_by_task_and_route():
+    controller = AdmissionController(
+        FixedDepthMonitor(0),
+        max_queue_depth=100,
+        max_in_flight=10,
+        retry_after=5,
+        tasks={"task": AdmissionLimits(max_queue_depth=50, max_in_flight=2)},
+        routes={"/route": AdmissionLimits(max_in_flight=0)},
+    )
+
+    assert controller.limits("/other", "other") == AdmissionLimits(max_queue_depth=100, max_in_flight=10, retry_after=5)
+    assert controller.limits("/other", "task") == AdmissionLimits(max_queue_depth=50, max_in_flight=2, retry_after=5)
+    assert controller.limits("/route", "task") == AdmissionLimits(max_queue_depth=50, max_in_flight=0, retry_after=5)
+
+
+def test_submissions_are_rejected_above_the_limits():
+    monitor = FixedDepthMonitor(None)
+    controller = AdmissionController(monitor, max_queue_depth=100, max_in_flight=1, retry_after=3)
+    api = FastAPI()
+    admission_dependency = Depends(admission_control("task", lambda: controller))
+
+    @api.post("/submit/{name}", dependencies=[admission_dependency])
+    async def submit(name: str):
+        return {"name": name}
+
+    client = TestClient(api)
+    assert client.post("/submit/a").json() == {"name": "a"}
+
+    monitor.fixed_depth = 100
+    response = client.post("/submit/b")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+    assert response.json() == {"detail": "Task queue is full."}
+
+    monitor.fixed_depth = 99
+    controller._limiters["/submit/{name}", "task"].in_flight = 1
+    response = client.post("/submit/c")
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many task submissions in progress."}
+
+    controller._limiters["/submit/{name}", "task"].in_flight = 0
+    assert client.post("/submit/d").status_code == 200
+    assert controller._limiters["/submit/{name}", "task"].in_flight == 0
+
+
+def test_in_flight_limit_by_route_and_task():
+    controller = AdmissionController(
+        FixedDepthMonitor(None),
+        max_in_flight=1,
+        tasks={"batch": AdmissionLimits(max_in_flight=2)},
+    )
+
+    async def admit(task_names: list[str]) -> list[bool]:
+        admitted = []
+        async with AsyncExitStack() as stack:
+            for task_name in task_names:
+                try:
+                    await stack.enter_async_context(controller.admit("/route", task_name))
+                    admitted.append(True)
+                except HTTPException:
+                    admitted.append(False)
+        return admitted
+
+    # the first task submitted by the route doesn't set the limit of the others
+    assert asyncio.run(admit(["task", "batch", "batch", "batch", "task"])) == [True, True, True, False, False]
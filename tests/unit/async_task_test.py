@@ -0,0 +1,101 @@
+import asyncio
+import time
+from contextlib import suppress
+
+import pytest
+from celery import Celery
+from celery.exceptions import SoftTimeLimitExceeded, TimeLimitExceeded
+from celery.worker import state
+
+from pymicroservice.worker.async_task import AsyncioPool, AsyncTask
+
+
+@pytest.fixture
+def app() -> Celery:
+    return Celery("test", task_cls=AsyncTask)
+
+
+def test_async_task(app):
+    @app.task(bind=True)
+    async def task_id(self, delay: float) -> str:
+        await asyncio.sleep(delay)
+        return self.request.id
+
+    @app.task
+    def sync_task(x: int) -> int:
+        return x * 2
+
+    assert task_id.apply(args=(0.01,), task_id="first").get() == "first"
+    assert sync_task.apply(args=(2,)).get() == 4
+
+
+def test_soft_time_limit(app):
+    cleaned = []
+
+    @app.task(soft_time_limit=0.05)
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cleaned.append(True)
+            raise
+
+    result = slow.apply()
+
+    assert isinstance(result.result, SoftTimeLimitExceeded)
+    assert cleaned == [True]
+
+
+def test_hard_time_limit(app):
+    @app.task(time_limit=0.05)
+    async def stuck():
+        while True:
+            with suppress(asyncio.CancelledError):
+                await asyncio.sleep(5)
+
+    assert isinstance(stuck.apply().result, TimeLimitExceeded)
+
+
+def test_pool_keeps_many_tasks_in_flight(app):
+    @app.task
+    async def wait() -> str:
+        await asyncio.sleep(0.2)
+        return "done"
+
+    # bind the tasks before their use from several threads, like a worker does
+    app.finalize()
+    pool = AsyncioPool(limit=100)
+    pool.start()
+    results: list[str] = []
+    start = time.perf_counter()
+    jobs = [pool.apply_async(lambda: wait.apply().get(), callback=results.append) for _ in range(100)]
+    for job in jobs:
+        job.get()
+    elapsed = time.perf_counter() - start
+    pool.stop()
+
+    assert results == ["done"] * 100
+    assert elapsed < 2
+
+
+def test_pool_terminates_revoked_tasks(app):
+    @app.task
+    async def wait() -> str:
+        await asyncio.sleep(5)
+        return "done"
+
+    app.finalize()
+    pool = AsyncioPool(limit=2)
+    pool.start()
+    states: list[str] = []
+    job = pool.apply_async(lambda: wait.apply(task_id="revoked").state, callback=states.append)
+    time.sleep(0.1)
+    state.revoked.add("revoked")
+    try:
+        pool.terminate_job(0)
+        job.wait(2)
+    finally:
+        state.revoked.discard("revoked")
+        pool.stop()
+
+    assert states == ["IGNORED"]
@@ -0,0 +1,75 @@
+import logging
+
+import pytest
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+from kombu import pools
+
+from pymicroservice.worker.batch_task import BatchRequest, BatchTask, run_batch
+
+
+@pytest.fixture
+def app() -> Celery:
+    pools.reset()
+    app = Celery("test", broker="memory://", backend="cache+memory://")
+    # the queues of the memory transport are shared by the whole process
+    with app.connection_for_read() as connection:
+        connection.SimpleQueue("celery").clear()
+    return app
+
+
+def test_run_batch_stores_each_result(app):
+    @app.task(base=BatchTask)
+    def double(requests: list[BatchRequest]) -> list:
+        return [ValueError("odd") if request.args[0] % 2 else request.args[0] * 2 for request in requests]
+
+    run_batch(double, [BatchRequest("batch-1", (2,)), BatchRequest("batch-2", (3,))])
+
+    assert app.AsyncResult("batch-1").get() == 4
+    assert isinstance(app.AsyncResult("batch-2").result, ValueError)
+
+
+def test_run_batch_fails_all_requests(app):
+    @app.task(base=BatchTask)
+    def wrong(requests: list[BatchRequest]) -> list:
+        return []
+
+    run_batch(wrong, [BatchRequest("batch-3"), BatchRequest("batch-4")])
+
+    assert app.AsyncResult("batch-3").state == "FAILURE"
+    assert app.AsyncResult("batch-4").state == "FAILURE"
+
+
+def test_worker_calls_the_task_with_batches(app):
+    batches: list[list[int]] = []
+
+    @app.task(base=BatchTask, flush_every=4, flush_interval=0.1)
+    def add(requests: list[BatchRequest]) -> list[int]:
+        batches.append([request.args[0] for request in requests])
+        return [request.args[0] + request.kwargs["y"] for request in requests]
+
+    results = [add.delay(i, y=10) for i in range(10)]
+    with start_worker(app, pool="threads", concurrency=2, perform_ping_check=False, loglevel=logging.root.level):
+        assert [result.get(timeout=5) for result in results] == list(range(10, 20))
+
+    assert sorted(i for batch in batches for i in batch) == list(range(10))
+    assert max(len(batch) for batch in batches) == 4
+    assert len(batches) < 10
+
+
+def test_delayed_tasks_release_the_prefetch_limit(app):
+    # a queue of its own, the worker of the previous test may still consume the shared celery queue
+    app.conf.task_default_queue = "delayed"
+
+    @app.task(base=BatchTask, flush_every=4, flush_interval=0.1)
+    def increment(requests: list[BatchRequest]) -> list[int]:
+        return [request.args[0] + 1 for request in requests]
+
+    with start_worker(
+        app, pool="threads", concurrency=2, perform_ping_check=False, loglevel=logging.root.level
+    ) as worker:
+        prefetch_limit = worker.consumer.qos.value
+        results = [increment.apply_async((i,), countdown=0.2) for i in range(3)]
+        assert [result.get(timeout=5) for result in results] == [1, 2, 3]
+
+        assert worker.consumer.qos.value == prefetch_limit
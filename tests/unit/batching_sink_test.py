@@ -0,0 +1,93 @@
+import io
+import logging
+import threading
+
+from loguru import logger
+
+from pymicroservice.logger.batching_sink import _ACTIVE_SINKS, BatchingSink, _restart_active_sinks
+from pymicroservice.logger.logger_config import InterceptHandler
+
+
+class SlowStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.release = threading.Event()
+
+    def write(self, s: str) -> int:
+        self.release.wait()
+        self.writes += 1
+        return super().write(s)
+
+
+def test_messages_are_written_in_batches():
+    stream = SlowStream()
+    sink = BatchingSink(stream, queue_size=100, batch_size=100)
+    for i in range(50):
+        sink.write(f"message {i}\n")
+    stream.release.set()
+    sink.stop()
+
+    assert stream.getvalue().splitlines() == [f"message {i}" for i in range(50)]
+    assert stream.writes < 50
+
+
+def test_messages_are_dropped_when_the_queue_is_full():
+    stream = SlowStream()
+    sink = BatchingSink(stream, queue_size=10, batch_size=10)
+    for i in range(100):
+        sink.write(f"message {i}\n")
+    stream.release.set()
+    sink.stop()
+
+    assert sink.dropped >= 80
+    assert f"{sink.dropped} log messages dropped" in stream.getvalue()
+
+
+def test_block_policy_never_drops():
+    stream = SlowStream()
+    stream.release.set()
+    sink = BatchingSink(stream, queue_size=1, batch_size=10, block=True)
+    for i in range(100):
+        sink.write(f"message {i}\n")
+    sink.stop()
+
+    assert sink.dropped == 0
+    assert len(stream.getvalue().splitlines()) == 100
+
+
+def test_only_the_active_sinks_are_restarted_after_a_fork():
+    stopped = BatchingSink(io.StringIO())
+    stopped.stop()
+    stopped_thread = stopped._thread
+    stream = io.StringIO()
+    active = BatchingSink(stream)
+
+    # the hook registered once for all the sinks, as run in a forked child
+    _restart_active_sinks()
+    active.write("after fork\n")
+    active.stop()
+
+    assert stopped._thread is stopped_thread
+    assert stream.getvalue() == "after fork\n"
+    assert active not in _ACTIVE_SINKS
+
+
+def test_intercept_handler_finds_the_caller():
+    stream = io.StringIO()
+    handler_id = logger.add(stream, format="{function}:{line} {message}")
+    std_logger = logging.getLogger("intercept_test")
+    std_logger.handlers = [InterceptHandler()]
+    std_logger.propagate = False
+
+    def log_from_call_site():
+        std_logger.warning("message")
+
+    log_from_call_site()
+    log_from_call_site()
+    logger.remove(handler_id)
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0] == lines[1]
+    assert lines[0].startswith("log_from_call_site:")
@@ -0,0 +1,59 @@
+import gc
+import io
+import json
+import os
+
+from loguru import logger
+
+from pymicroservice.logger.json_format import _ENCODERS, CompactJsonEncoder, CompactJsonSink
+
+
+def _log_lines(log) -> list[dict]:
+    stream = io.StringIO()
+    handler_id = logger.add(CompactJsonSink(stream, "sample"), format="{message}")
+    try:
+        log()
+    finally:
+        logger.remove(handler_id)
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_flat_fixed_field_set():
+    (line,) = _log_lines(lambda: logger.info('Task "{}" submitted', "é"))
+
+    assert list(line) == ["service", "pid", "ts", "level", "logger", "function", "line", "msg"]
+    assert line["service"] == "sample"
+    assert line["pid"] == os.getpid()
+    assert line["level"] == "INFO"
+    assert line["logger"] == __name__
+    assert line["msg"] == 'Task "é" submitted'
+
+
+def test_exception_and_extra():
+    def log():
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.bind(task_id="42").exception("failed")
+
+    (line,) = _log_lines(log)
+
+    assert line["extra"] == {"task_id": "42"}
+    assert "ValueError: boom" in line["exception"]
+
+
+def test_forked_children_encode_their_pid():
+    read_fd, write_fd = os.pipe()
+    encoder = CompactJsonEncoder("sample")
+    pid = os.fork()
+    if pid == 0:
+        os.write(write_fd, str(encoder.pid).encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    os.close(write_fd)
+
+    assert int(os.read(read_fd, 32)) == pid
+    assert encoder.pid == os.getpid()
+    del encoder
+    gc.collect()
+    assert not [encoder for encoder in _ENCODERS if encoder.service_name == "sample"]
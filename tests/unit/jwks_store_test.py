@@ -0,0 +1,76 @@
+import asyncio
+
+import jwt
+import pytest
+
+from pymicroservice.security.jwks_store import AsyncJwksStore
+from pymicroservice.testing.oidc_stub import OidcStub
+
+
+def test_get_signing_key_from_jwt():
+    with OidcStub() as stub:
+        store = AsyncJwksStore(stub.jwks_uri)
+        key = asyncio.run(store.get_signing_key_from_jwt(stub.token()))
+
+        assert key.key_id == "key-1"
+        assert store.get_cached_signing_key_from_jwt(stub.token()) is key
+        assert stub.requests["/certs"] == 1
+
+
+def test_concurrent_lookups_share_a_single_fetch():
+    async def lookup(store: AsyncJwksStore):
+        return await asyncio.gather(*(store.get_signing_key("key-1") for _ in range(50)))
+
+    with OidcStub(delay=0.2) as stub:
+        store = AsyncJwksStore(stub.jwks_uri)
+        keys = asyncio.run(lookup(store))
+
+        assert {key.key_id for key in keys} == {"key-1"}
+        assert stub.requests["/certs"] == 1
+
+
+def test_unknown_kid_refetch_is_rate_limited():
+    async def lookup(store: AsyncJwksStore, kid: str):
+        with pytest.raises(jwt.PyJWKClientError):
+            await store.get_signing_key(kid)
+
+    with OidcStub() as stub:
+        store = AsyncJwksStore(stub.jwks_uri, min_refresh_interval=60)
+        for i in range(20):
+            asyncio.run(lookup(store, f"forged-{i}"))
+
+        assert stub.requests["/certs"] == 1
+
+
+def test_rotation_notifies_listeners():
+    invalidations = []
+
+    with OidcStub() as stub:
+        store = AsyncJwksStore(stub.jwks_uri, min_refresh_interval=0)
+        store.add_rotation_listener(lambda: invalidations.append(True))
+        asyncio.run(store.refresh())
+
+        stub.rotate(("key-2",))
+        key = asyncio.run(store.get_signing_key("key-2"))
+
+        assert key.key_id == "key-2"
+        assert invalidations == [True]
+        with pytest.raises(jwt.PyJWKClientError):
+            store.get_cached_signing_key("key-1")
+
+
+def test_stale_keys_are_refreshed_in_background():
+    async def lookup(store: AsyncJwksStore):
+        key = await store.get_signing_key("key-1")
+        refresh = store._background_refresh
+        assert refresh is not None
+        await asyncio.sleep(0.1)
+        assert refresh.done()
+        return key
+
+    with OidcStub() as stub:
+        store = AsyncJwksStore(stub.jwks_uri, refresh_interval=0)
+        asyncio.run(store.refresh())
+        asyncio.run(lookup(store))
+
+        assert stub.requests["/certs"] == 2
@@ -0,0 +1,79 @@
+import asyncio
+import gzip
+
+import fakeredis
+from celery import Celery
+
+from pymicroservice.worker.large_result import (
+    LARGE_RESULT_BACKEND,
+    LargeResult,
+    LargeResultSettings,
+    decompress_chunks,
+    large_result_backend_url,
+)
+from pymicroservice.worker.large_result_backend import LargeResultRedisBackend
+from pymicroservice.worker.task_status import TaskStatusReader
+
+RESULT = {"rows": [{"id": i, "name": f"row {i}"} for i in range(1000)]}
+
+
+def _large_result_app() -> tuple[Celery, TaskStatusReader]:
+    server = fakeredis.FakeServer()
+    app = Celery("test", backend=f"{LARGE_RESULT_BACKEND}+redis://localhost:6379/0")
+    app.backend.client = fakeredis.FakeRedis(server=server)
+    app.backend.threshold = 1024
+    reader = TaskStatusReader(app, client_factory=lambda: fakeredis.aioredis.FakeRedis(server=server))
+    return app, reader
+
+
+def test_backend_url():
+    enabled = LargeResultSettings(enabled=True)
+
+    assert (
+        large_result_backend_url("redis://localhost:6379", enabled) == f"{LARGE_RESULT_BACKEND}+redis://localhost:6379"
+    )
+    assert large_result_backend_url("cache+memory://", enabled) == "cache+memory://"
+    assert large_result_backend_url("redis://localhost:6379", LargeResultSettings()) == "redis://localhost:6379"
+
+
+def test_large_result_is_compressed_apart():
+    app, reader = _large_result_app()
+    backend = app.backend
+    assert isinstance(backend, LargeResultRedisBackend)
+    assert backend.url == "redis://localhost:6379/0"
+    backend.store_result("large", RESULT, "SUCCESS")
+    backend.store_result("small", "Task completed", "SUCCESS")
+
+    large, small = asyncio.run(reader.get_many(["large", "small"]))
+
+    reference = LargeResult.from_result(large.result)
+    assert reference is not None
+    assert reference.content_type == "application/json"
+    assert reference.compressed_size < reference.size
+    assert len(backend.client.get(backend.get_key_for_task("large"))) < 512
+    assert small.result == "Task completed"
+    # transparent for the Celery API
+    assert app.AsyncResult("large").get(timeout=1) == RESULT
+    assert backend.get_task_meta("small")["result"] == "Task completed"
+
+    backend.forget("large")
+    assert backend.client.get(backend.get_key_for_large_result("large")) is None
+
+
+def test_stream_large_result():
+    app, reader = _large_result_app()
+    app.backend.store_result("large", RESULT, "SUCCESS")
+
+    async def read(task_id: str) -> tuple[list[bytes], bytes]:
+        chunks = [chunk async for chunk in reader.stream_large_result(task_id, chunk_size=256)]
+        payload = b"".join([chunk async for chunk in decompress_chunks(reader.stream_large_result(task_id, 256))])
+        await reader.close()
+        return chunks, payload
+
+    chunks, payload = asyncio.run(read("large"))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) == 256 for chunk in chunks[:-1])
+    assert app.backend.decode(gzip.decompress(b"".join(chunks))) == RESULT
+    assert app.backend.decode(payload) == RESULT
+    assert asyncio.run(read("unknown")) == ([], b"")
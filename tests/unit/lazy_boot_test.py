@@ -0,0 +1,127 @@
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from pymicroservice.startup.deferred_setup import DeferredSetup, wait_for_setup
+from pymicroservice.startup.lazy_module import LazyModule
+from pymicroservice.startup.startup_timer import StartupTimer
+
+
+def test_lazy_module_is_imported_on_first_use():
+    json_module = LazyModule("json")
+
+    assert json_module.loads("[2]") == [2]
+    assert json_module.loaded
+    assert not LazyModule("pymicroservice.missing").loaded
+
+
+def test_deferred_setup_runs_once_off_the_event_loop():
+    calls = []
+    setup = DeferredSetup(lambda: calls.append(threading.current_thread()))
+
+    async def use() -> None:
+        await asyncio.gather(setup.wait(), setup.wait())
+        await setup.wait()
+
+    asyncio.run(use())
+
+    assert setup.done
+    assert len(calls) == 1
+    assert calls[0] is not threading.main_thread()
+
+
+def test_failed_deferred_setup_runs_again():
+    calls = []
+
+    def failing_once() -> None:
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("broker unreachable")
+
+    setup = DeferredSetup(failing_once)
+
+    with pytest.raises(RuntimeError, match="broker unreachable"):
+        asyncio.run(setup.wait())
+    assert not setup.done
+    asyncio.run(setup.wait())
+    assert setup.done
+    assert calls == [0, 1]
+
+
+def test_deferred_setup_is_kept_per_application():
+    setup_calls = []
+    apps = []
+    for _ in range(2):
+        app = FastAPI()
+        app.state.setup = DeferredSetup(lambda: setup_calls.append(len(setup_calls)))
+
+        @app.get("/use", dependencies=[Depends(wait_for_setup("setup"))])
+        async def use():
+            return {}
+
+        apps.append(app)
+
+    assert TestClient(apps[0]).get("/use").status_code == 200
+    assert TestClient(apps[0]).get("/use").status_code == 200
+    assert setup_calls == [0]
+    assert (apps[0].state.setup.done, apps[1].state.setup.done) == (True, False)
+
+
+def test_startup_timer_reports_the_phases():
+    timer = StartupTimer()
+    with timer.phase("imports"):
+        pass
+    with timer.phase("oidc"):
+        pass
+    with timer.phase("imports"):
+        pass
+
+    assert list(timer.phases()) == ["imports", "oidc"]
+    timer.report()
+    assert timer.phases() == {}
+
+
+def _run(code: str, **env: str) -> str:
+    # a fresh interpreter, Celery is already imported by the other tests
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_api_only_boot_loads_the_workers_on_first_use():
+    output = _run(
+        """
+        import sys
+
+        from fastapi.testclient import TestClient
+
+        from sample.application.bootstrap import Bootstrap
+
+        app = Bootstrap.build_api()
+        with TestClient(app) as client:
+            print("celery loaded:", "celery.app" in sys.modules)
+            assert client.get("/api/v1/user/public").status_code == 200
+            print("celery loaded:", "celery.app" in sys.modules)
+            assert client.post("/api/v1/user/task", json={"name": "lazy"}).status_code == 200
+            print("celery loaded:", "celery.app" in sys.modules)
+        """,
+        BOOTSTRAP_LAZY_WORKERS="true",
+        CELERY_BROKER_URL="memory://",
+        CELERY_RESULT_BACKEND="cache+memory://",
+    )
+
+    loaded = [line.split(": ")[1] for line in output.splitlines() if line.startswith("celery loaded:")]
+    assert loaded == ["False", "False", "True"]
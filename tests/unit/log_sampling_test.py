@@ -0,0 +1,80 @@
+import io
+
+import pytest
+from loguru import logger
+
+from pymicroservice.logger.logger_config import LOGGER_CONFIG, LoggerConfig
+from pymicroservice.logger.sampling import LogSampler, SampledLogger
+
+
+@pytest.fixture(autouse=True)
+def debug_level(monkeypatch):
+    monkeypatch.setattr(LOGGER_CONFIG, "level", "DEBUG")
+
+
+def _log(sampled_logger: SampledLogger, count: int) -> list[str]:
+    stream = io.StringIO()
+    handler_id = logger.add(stream, format="{function}:{message}")
+    try:
+        for i in range(count):
+            sampled_logger.debug("message {}", i)
+    finally:
+        logger.remove(handler_id)
+    return stream.getvalue().splitlines()
+
+
+def test_one_in_n_by_logger_name():
+    sampler = LogSampler({__name__: "1/10"})
+    lines = _log(SampledLogger(sampler), 100)
+
+    assert len(lines) == 10
+    assert lines[0] == "_log:message 0"
+    assert list(sampler.suppressed().values()) == [90]
+
+
+def test_per_second_by_call_site():
+    sampler = LogSampler({f"{__name__}:_log": "5/s"})
+    lines = _log(SampledLogger(sampler), 100)
+
+    assert len(lines) == 5
+    assert list(sampler.suppressed().values()) == [95]
+
+
+def test_parent_package_rule():
+    sampler = LogSampler({__name__.split(".")[0]: "1/50"})
+    assert len(_log(SampledLogger(sampler), 100)) == 2
+
+
+def test_no_rule_logs_everything():
+    sampler = LogSampler({"another.module": "1/10"})
+    assert len(_log(SampledLogger(sampler), 100)) == 100
+    assert sampler.suppressed() == {}
+
+
+def test_disabled_levels_are_not_sampled(monkeypatch):
+    monkeypatch.setattr(LOGGER_CONFIG, "level", "INFO")
+    sampler = LogSampler({__name__: "1/10"})
+
+    assert _log(SampledLogger(sampler), 100) == []
+    assert sampler.suppressed() == {}
+    assert sampler._samplers == {}
+
+
+def test_handler_drops_the_disabled_levels(monkeypatch):
+    monkeypatch.setattr(LOGGER_CONFIG, "level", "INFO")
+    stream = io.StringIO()
+    handler = LoggerConfig._handler()
+    handler_id = logger.add(**{**handler, "sink": stream, "format": "{message}"})
+    try:
+        logger.debug("debug")
+        logger.info("info")
+    finally:
+        logger.remove(handler_id)
+
+    assert handler["level"] == "INFO"
+    assert stream.getvalue() == "info\n"
+
+
+def test_invalid_rule():
+    with pytest.raises(ValueError):
+        LogSampler({__name__: "2/10"})
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from prometheus_client.parser import text_string_to_metric_families
+
+from pymicroservice.metrics import prometheus_metrics
+from pymicroservice.metrics.multiprocess import MULTIPROC_DIR_ENV, prepare_multiprocess_dir
+from sample.application.bootstrap import Bootstrap
+
+
+def _request_count(route: str, status: str) -> float:
+    labels = {"method": "GET", "route": route, "status": status}
+    return REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) or 0.0
+
+
+def test_metrics_endpoint_reports_the_requests_by_route_template():
+    client = TestClient(Bootstrap.build_api())
+    liveness = _request_count("/health/liveness", "200")
+    unmatched = _request_count("unmatched", "404")
+
+    assert client.get("/health/liveness").status_code == 200
+    assert client.get("/not/a/route").status_code == 404
+
+    assert _request_count("/health/liveness", "200") == liveness + 1
+    assert _request_count("unmatched", "404") == unmatched + 1
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="/health/liveness",status="200"}' in response.text
+    assert "http_requests_in_progress" in response.text
+
+
+def test_metrics_are_aggregated_over_the_processes(tmp_path, monkeypatch):
+    monkeypatch.setenv(MULTIPROC_DIR_ENV, str(tmp_path))
+    assert prepare_multiprocess_dir(4) == str(tmp_path)
+    code = textwrap.dedent(
+        """
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from pymicroservice.metrics.prometheus_metrics import MetricsMiddleware
+
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/ping")
+        async def ping():
+            return "pong"
+
+        client = TestClient(app)
+        for _ in range(3):
+            client.get("/ping")
+        """
+    )
+    # each process writes its own metrics file, like the gunicorn workers
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", code], env={**os.environ}, check=True, timeout=60)
+
+    families = {
+        family.name: family for family in text_string_to_metric_families(prometheus_metrics.collect_metrics().decode())
+    }
+    counts = [
+        sample.value
+        for sample in families["http_request_duration_seconds"].samples
+        if sample.name == "http_request_duration_seconds_count" and sample.labels["route"] == "/ping"
+    ]
+    assert counts == [6]
@@ -0,0 +1,114 @@
+import asyncio
+from unittest.mock import ANY
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pymicroservice.health.readiness_registry import READINESS_REGISTRY
+from pymicroservice.security.jwks_store import JWKS_STORE_CONFIG
+from pymicroservice.security.oidc import OidcConfigSingleton
+from pymicroservice.security.oidc_config_loader import OidcConfigLoader
+from pymicroservice.testing.oidc_stub import OidcStub
+from sample.application.bootstrap import Bootstrap
+
+
+@pytest.fixture
+def oidc_env(monkeypatch, tmp_path):
+    def configure(stub: OidcStub) -> str:
+        cache_path = str(tmp_path / "oidc-cache.json")
+        monkeypatch.setenv("OIDC_CONFIGURATION_URL", stub.configuration_url)
+        monkeypatch.setenv("OIDC_DISCOVERY_CACHE_PATH", cache_path)
+        return cache_path
+
+    monkeypatch.setattr(OidcConfigSingleton, "_instance", None)
+    monkeypatch.setattr(OidcConfigSingleton, "_loader", None)
+    return configure
+
+
+def test_discovery_is_resolved_on_startup(oidc_env):
+    with OidcStub() as stub:
+        oidc_env(stub)
+        app = Bootstrap.build_api()
+        assert OidcConfigSingleton.is_ready() is False
+
+        with TestClient(app) as client:
+            assert stub.requests == {"/.well-known/openid-configuration": 1, "/certs": 1}
+            assert client.get("/health/readiness").json()["checks"]["oidc"]["status"] == "up"
+
+            response = client.get("/api/v1/user/protected", headers={"Authorization": f"Bearer {stub.token()}"})
+            assert response.status_code == 200
+            assert stub.requests["/certs"] == 1
+
+
+def test_restart_is_served_from_discovery_cache(oidc_env, monkeypatch):
+    with OidcStub() as stub:
+        oidc_env(stub)
+        with TestClient(Bootstrap.build_api()):
+            pass
+        token = stub.token()
+
+    # the provider is unreachable, the restarted application is served from the cache
+    monkeypatch.setattr(OidcConfigSingleton, "_instance", None)
+    monkeypatch.setattr(OidcConfigSingleton, "_loader", None)
+    with TestClient(Bootstrap.build_api()) as client:
+        assert client.get("/health/readiness").json()["checks"]["oidc"]["status"] == "up"
+
+        response = client.get("/api/v1/user/protected", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+
+
+def test_not_ready_until_keys_are_loaded(oidc_env, monkeypatch):
+    with OidcStub() as stub:
+        oidc_env(stub)
+    monkeypatch.setenv("OIDC_DISCOVERY_CACHE_PATH", "")
+
+    with TestClient(Bootstrap.build_api()) as client:
+        response = client.get("/health/readiness")
+        assert response.status_code == 503
+        assert response.json()["checks"]["oidc"] == {
+            "status": "down",
+            "age": ANY,
+            "latency": ANY,
+            "error": "ConnectError",
+        }
+
+
+def test_keys_are_loaded_by_the_readiness_check(oidc_env, monkeypatch):
+    with OidcStub() as stub:
+        oidc_env(stub)
+        monkeypatch.setenv("OIDC_DISCOVERY_CACHE_PATH", "")
+        stub.available = False
+
+        with TestClient(Bootstrap.build_api()) as client:
+            assert client.get("/health/readiness").json()["checks"]["oidc"]["status"] == "down"
+
+            # the provider is back, a not ready process receives no request to retry the loading with
+            stub.available = True
+            client.portal.call(READINESS_REGISTRY.run_checks)
+            assert client.get("/health/readiness").json()["checks"]["oidc"]["status"] == "up"
+            assert stub.requests == {"/.well-known/openid-configuration": 3, "/certs": 1}
+
+
+def test_shared_cache_is_fetched_by_a_single_process(oidc_env, monkeypatch):
+    with OidcStub() as stub:
+        oidc_env(stub)
+        monkeypatch.setenv("OIDC_DISCOVERY_CACHE_SHARED", "true")
+        monkeypatch.setattr(JWKS_STORE_CONFIG, "min_refresh_interval", 0)
+
+        # a loader per gunicorn worker
+        async def load_workers():
+            return await asyncio.gather(*(OidcConfigLoader().load() for _ in range(3)))
+
+        configs = asyncio.run(load_workers())
+        assert stub.requests == {"/.well-known/openid-configuration": 1, "/certs": 1}
+        assert all(config.key_store.loaded for config in configs)
+
+        # the rotated key is fetched by the first worker receiving it, and read from the cache by the others
+        stub.rotate(("key-2",))
+
+        async def rotate():
+            for config in configs:
+                await config.key_store.get_signing_key("key-2")
+
+        asyncio.run(rotate())
+        assert stub.requests["/certs"] == 2
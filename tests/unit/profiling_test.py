@@ -0,0 +1,73 @@
+import asyncio
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from pymicroservice.profiling.profiling_middleware import (
+    ProfilingMiddleware,
+    sign_profiling_token,
+    verify_profiling_token,
+)
+
+
+def verify_token(token: str) -> str:
+    return token.upper()
+
+
+async def auth(token: str = "guest") -> str:
+    await asyncio.sleep(0.05)
+    return verify_token(token)
+
+
+def _build_app(tmp_path, **options) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, output_dir=str(tmp_path), **options)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int, user: str = Depends(auth)):
+        return {"item_id": item_id, "user": user}
+
+    return TestClient(app)
+
+
+def _stacks(tmp_path) -> dict[str, int]:
+    (profile,) = tmp_path.glob("*.collapsed")
+    assert "GET_items_item_id" in profile.name
+    lines = profile.read_text().splitlines()
+    return {line.rpartition(" ")[0]: int(line.rpartition(" ")[2]) for line in lines}
+
+
+def test_sampled_request_is_profiled_from_the_dependencies_to_the_serialization(tmp_path):
+    client = _build_app(tmp_path, sample_rate=1.0)
+
+    assert client.get("/items/1").json() == {"item_id": 1, "user": "GUEST"}
+
+    stacks = _stacks(tmp_path)
+    assert all(stack.startswith("GET /items/{item_id}") for stack in stacks)
+    assert any(
+        "auth (profiling_test.py" in stack and stack.split(";")[-1].startswith("verify_token") for stack in stacks
+    )
+    assert any("serialize_response" in stack for stack in stacks)
+    # the sleep of the dependency is reported as a wait, in the stack it's awaited from
+    waits = sum(time for stack, time in stacks.items() if "auth (" in stack and stack.endswith("<await>"))
+    assert waits >= 40_000
+
+
+def test_request_is_profiled_with_a_signed_header_only(tmp_path):
+    client = _build_app(tmp_path, secret="s3cret")
+
+    client.get("/items/1")
+    client.get("/items/1", headers={"X-Profile": sign_profiling_token("other")})
+    assert list(tmp_path.glob("*.collapsed")) == []
+
+    client.get("/items/1", headers={"X-Profile": sign_profiling_token("s3cret")})
+    assert len(list(tmp_path.glob("*.collapsed"))) == 1
+
+
+def test_profiling_token_expires():
+    token = sign_profiling_token("s3cret", ttl=60, now=1000)
+
+    assert verify_profiling_token("s3cret", token, now=1060)
+    assert not verify_profiling_token("s3cret", token, now=1061)
+    assert not verify_profiling_token("", token, now=1000)
+    assert not verify_profiling_token("s3cret", "not-a-token", now=1000)
@@ -0,0 +1,109 @@
+import datetime
+import uuid
+from decimal import Decimal
+from typing import Any
+
+import pytest
+from kombu.serialization import dumps, loads
+from pydantic import BaseModel, ValidationError, field_validator
+
+from pymicroservice.worker.pydantic_msgpack import CONTENT_TYPE, PydanticMsgpackSerializer, type_id
+
+
+class Address(BaseModel):
+    city: str
+
+
+class Order(BaseModel):
+    order_id: uuid.UUID
+    created_at: datetime.datetime
+    amount: Decimal
+    tags: list[str]
+    shipping: Address
+    note: str = ""
+
+    @field_validator("amount")
+    @classmethod
+    def positive(cls, amount: Decimal) -> Decimal:
+        if amount <= 0:
+            raise ValueError("amount must be positive")
+        return amount
+
+
+def _order(**fields: Any) -> Order:
+    values: dict[str, Any] = {
+        "order_id": uuid.uuid4(),
+        "created_at": datetime.datetime.now(datetime.UTC),
+        "amount": Decimal("12.50"),
+        "tags": ["gift"],
+        "shipping": Address(city="Paris"),
+    }
+    return Order.model_construct(**(values | fields))
+
+
+def _serializer(trusted: bool = False) -> PydanticMsgpackSerializer:
+    serializer = PydanticMsgpackSerializer(trusted)
+    serializer.register_types([Order, Address])
+    return serializer
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_round_trip(trusted):
+    order = _order()
+    body = ((order,), {"when": datetime.date(2025, 1, 1)}, {})
+
+    args, kwargs, _ = _serializer(trusted).loads(_serializer().dumps(body))
+
+    assert args[0] == order
+    assert isinstance(args[0].shipping, Address)
+    assert kwargs == {"when": datetime.date(2025, 1, 1)}
+
+
+def test_trusted_mode_skips_validation():
+    data = _serializer().dumps(_order(amount=Decimal(-1)))
+
+    with pytest.raises(ValidationError):
+        _serializer().loads(data)
+    assert _serializer(trusted=True).loads(data).amount == Decimal(-1)
+
+
+def test_explicit_type_ids_are_shorter():
+    serializer = PydanticMsgpackSerializer()
+    serializer.register_types({1: Order, 2: Address})
+    order = _order()
+
+    assert len(serializer.dumps(order)) < len(_serializer().dumps(order))
+    assert serializer.loads(serializer.dumps(order)) == order
+
+
+def test_type_id_conflict():
+    serializer = PydanticMsgpackSerializer()
+    serializer.register_types({1: Order})
+
+    with pytest.raises(ValueError):
+        serializer.register_types({1: Address})
+
+
+def test_unregistered_model():
+    with pytest.raises(TypeError):
+        PydanticMsgpackSerializer().dumps(Address(city="Paris"))
+
+
+def test_unknown_type_id():
+    data = _serializer().dumps(Address(city="Paris"))
+    serializer = PydanticMsgpackSerializer()
+    serializer.register_types({type_id(Address) + 1: Address})
+
+    with pytest.raises(ValueError):
+        serializer.loads(data)
+
+
+def test_kombu_registration():
+    serializer = _serializer()
+    serializer.register("test-pydantic-msgpack")
+    order = _order()
+
+    content_type, content_encoding, data = dumps(order, serializer="test-pydantic-msgpack")
+
+    assert (content_type, content_encoding) == (CONTENT_TYPE, "binary")
+    assert loads(data, content_type, content_encoding, accept=[CONTENT_TYPE]) == order
@@ -0,0 +1,80 @@
+import asyncio
+
+from pymicroservice.health.readiness_registry import ReadinessRegistry
+
+
+async def _up() -> None:
+    pass
+
+
+async def _down() -> bool:
+    return False
+
+
+async def _broken() -> None:
+    raise ConnectionError("redis://secret@host unreachable")
+
+
+async def _slow() -> None:
+    await asyncio.sleep(1)
+
+
+def test_snapshot_reports_the_last_results():
+    registry = ReadinessRegistry(timeout=0.05)
+    for name, check in {"up": _up, "down": _down, "broken": _broken, "slow": _slow}.items():
+        registry.register(name, check)
+
+    assert registry.snapshot() == (
+        False,
+        {"status": "not ready", "checks": {name: {"status": "pending"} for name in ("up", "down", "broken", "slow")}},
+    )
+    asyncio.run(registry.run_checks())
+
+    ready, snapshot = registry.snapshot()
+    checks = snapshot["checks"]
+    assert not ready
+    assert checks["up"]["status"] == "up"
+    assert checks["up"]["age"] < 1
+    assert checks["slow"]["latency"] < 1
+    # errors are reduced to their type, the probe response doesn't leak connection URLs
+    assert {name: check.get("error") for name, check in checks.items()} == {
+        "up": None,
+        "down": "failed",
+        "broken": "ConnectionError",
+        "slow": "timed out after 0.05s",
+    }
+
+
+def test_stale_results_are_down():
+    registry = ReadinessRegistry(stale_after=0)
+    registry.register("up", _up)
+    asyncio.run(registry.run_checks())
+
+    ready, snapshot = registry.snapshot()
+    assert not ready
+    assert snapshot["checks"]["up"]["error"] == "stale"
+
+
+def test_checks_run_in_the_background_within_the_concurrency_limit():
+    registry = ReadinessRegistry(interval=0.01, concurrency=2)
+    running = []
+    max_running = 0
+
+    async def check() -> None:
+        nonlocal max_running
+        running.append(None)
+        max_running = max(max_running, len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+
+    for index in range(5):
+        registry.register(f"check-{index}", check)
+
+    async def run() -> None:
+        await registry.start()
+        await asyncio.sleep(0.1)
+        await registry.close()
+
+    asyncio.run(run())
+    assert registry.snapshot()[0]
+    assert max_running == 2
@@ -0,0 +1,62 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pymicroservice.cache.response_cache import ResponseCache, cache_response
+
+
+def test_least_recently_used_responses_are_evicted():
+    cache = ResponseCache("test", max_size=2)
+    first = cache.put("first", {"a": 1})
+    cache.put("second", {"b": 2})
+
+    assert cache.get("first") == first
+    cache.put("third", {"c": 3})
+
+    assert cache.get("second") is None
+    assert first.body == b'{"a":1}'
+    assert cache.get("first").etag == first.etag
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (2, 1, 1, 2)
+    assert stats.hit_ratio == 2 / 3
+
+
+def test_responses_expire_after_their_ttl(monkeypatch):
+    cache = ResponseCache("test")
+    cache.put("static", {"a": 1}, ttl=10)
+    now = time.monotonic()
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 9)
+    assert cache.get("static") is not None
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    assert cache.get("static") is None
+    assert len(cache) == 0
+
+
+def test_cached_route_answers_304_to_a_matching_etag():
+    cache = ResponseCache("test")
+    calls = []
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    @cache_response(ttl=60, cache=cache)
+    async def get_item(item_id: int, q: str = ""):
+        calls.append(item_id)
+        return {"item_id": item_id, "q": q}
+
+    client = TestClient(app)
+    response = client.get("/items/1?q=x")
+    assert response.json() == {"item_id": 1, "q": "x"}
+    assert response.headers["Cache-Control"] == "max-age=60"
+    etag = response.headers["ETag"]
+
+    assert client.get("/items/1?q=x").json() == {"item_id": 1, "q": "x"}
+    assert client.get("/items/1?q=y").json() == {"item_id": 1, "q": "y"}
+    assert calls == [1, 1]
+
+    response = client.get("/items/1?q=x", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    assert client.get("/items/1?q=x", headers={"If-None-Match": '"other"'}).status_code == 200
@@ -0,0 +1,87 @@
+import fakeredis
+import pytest
+from celery import Celery
+from kombu import pools
+from kombu.transport import redis as kombu_redis
+from redis.client import Pipeline
+
+from pymicroservice.worker.task_batch import TaskBatchPublisher
+
+
+@pytest.fixture
+def redis_server(monkeypatch) -> fakeredis.FakeServer:
+    server = fakeredis.FakeServer()
+    # the producer pools are shared by the Celery applications with the same broker
+    pools.reset()
+    monkeypatch.setattr(
+        kombu_redis.Channel, "_create_client", lambda self, asynchronous=False: fakeredis.FakeRedis(server=server)
+    )
+    return server
+
+
+def _app(broker: str) -> Celery:
+    app = Celery("test", broker=broker)
+
+    @app.task(name="add")
+    def add(x, y):
+        return x + y
+
+    return app
+
+
+def test_chunks_are_pipelined(redis_server, monkeypatch):
+    app = _app("redis://localhost:6379/0")
+
+    round_trips = []
+    execute = Pipeline.execute
+
+    def record_execute(pipeline, *args, **kwargs):
+        round_trips.append([command[0][0] for command in pipeline.command_stack])
+        return execute(pipeline, *args, **kwargs)
+
+    monkeypatch.setattr(Pipeline, "execute", record_execute)
+    submissions = TaskBatchPublisher(app, chunk_size=4).publish(app.tasks["add"], [(i, i) for i in range(10)])
+
+    assert [commands.count("LPUSH") for commands in round_trips if "LPUSH" in commands] == [4, 4, 2]
+    assert all(submission.task_id and submission.error is None for submission in submissions)
+    assert len({submission.task_id for submission in submissions}) == 10
+    assert fakeredis.FakeRedis(server=redis_server).llen("celery") == 10
+
+
+def test_failed_calls_are_reported(redis_server):
+    app = _app("redis://localhost:6379/0")
+
+    submissions = TaskBatchPublisher(app).publish(app.tasks["add"], [(1, 1), (object(), 1), (2, 2)])
+
+    assert [submission.task_id is not None for submission in submissions] == [True, False, True]
+    assert "not JSON serializable" in submissions[1].error
+    assert fakeredis.FakeRedis(server=redis_server).llen("celery") == 2
+
+
+def test_failed_round_trip_is_reported(redis_server, monkeypatch):
+    app = _app("redis://localhost:6379/0")
+    execute = Pipeline.execute
+
+    def fail_execute(pipeline, *args, **kwargs):
+        if any(command[0][0] == "LPUSH" for command in pipeline.command_stack):
+            pipeline.reset()
+            raise ConnectionError("Connection reset by peer")
+        return execute(pipeline, *args, **kwargs)
+
+    monkeypatch.setattr(Pipeline, "execute", fail_execute)
+    submissions = TaskBatchPublisher(app).publish(app.tasks["add"], [(i, i) for i in range(5)])
+
+    assert [(submission.task_id, submission.error) for submission in submissions] == [
+        (None, "Connection reset by peer")
+    ] * 5
+    assert fakeredis.FakeRedis(server=redis_server).llen("celery") == 0
+
+
+def test_other_brokers():
+    app = _app("memory://")
+
+    submissions = TaskBatchPublisher(app, chunk_size=2).publish(app.tasks["add"], [(i, i) for i in range(5)])
+
+    assert all(submission.task_id for submission in submissions)
+    with app.connection_for_read() as connection:
+        assert connection.SimpleQueue("celery").qsize() == 5
@@ -0,0 +1,90 @@
+import asyncio
+
+import fakeredis
+from celery import Celery
+
+from pymicroservice.worker.task_events import TaskEventHub
+from pymicroservice.worker.task_status import TaskStatus, TaskStatusReader
+
+
+def _redis_app() -> tuple[Celery, TaskStatusReader]:
+    server = fakeredis.FakeServer()
+    app = Celery("test", backend="redis://localhost:6379/0")
+    app.backend.client = fakeredis.FakeRedis(server=server)
+    reader = TaskStatusReader(app, client_factory=lambda: fakeredis.aioredis.FakeRedis(server=server))
+    return app, reader
+
+
+def _follow(app: Celery, hub: TaskEventHub, subscribers: int) -> list[list[TaskStatus | None]]:
+    async def subscribe() -> list[TaskStatus | None]:
+        return [task_status async for task_status in hub.subscribe(["first", "second"])]
+
+    async def complete_tasks():
+        await asyncio.sleep(0.1)
+        app.backend.store_result("first", None, "STARTED")
+        app.backend.store_result("second", 2, "SUCCESS")
+        await asyncio.sleep(0.1)
+        app.backend.store_result("first", 1, "SUCCESS")
+
+    async def run():
+        subscriptions = asyncio.gather(*(subscribe() for _ in range(subscribers)))
+        await complete_tasks()
+        events = await asyncio.wait_for(subscriptions, 5)
+        await hub.close()
+        await hub.reader.close()
+        return events
+
+    return asyncio.run(run())
+
+
+def _states(events: list[TaskStatus | None]) -> list[tuple[str, str]]:
+    return [(event.task_id, event.status) for event in events if event is not None]
+
+
+def test_redis_changes_are_pushed_to_all_the_subscribers():
+    app, reader = _redis_app()
+    hub = TaskEventHub(reader)
+
+    events = _follow(app, hub, subscribers=3)
+
+    for subscriber_events in events:
+        assert _states(subscriber_events) == [
+            ("first", "PENDING"),
+            ("second", "PENDING"),
+            ("first", "STARTED"),
+            ("second", "SUCCESS"),
+            ("first", "SUCCESS"),
+        ]
+        assert subscriber_events[-1].result == 1
+    assert hub._queues == {}
+
+
+def test_ready_tasks_end_the_subscription():
+    app, reader = _redis_app()
+    app.backend.store_result("done", "Task completed", "SUCCESS")
+
+    async def subscribe():
+        return [task_status async for task_status in TaskEventHub(reader).subscribe(["done"])]
+
+    (done,) = asyncio.run(subscribe())
+
+    assert (done.status, done.result) == ("SUCCESS", "Task completed")
+
+
+def test_heartbeat():
+    app, reader = _redis_app()
+    hub = TaskEventHub(reader, heartbeat=0.02)
+
+    events = _follow(app, hub, subscribers=1)
+
+    assert None in events[0]
+
+
+def test_changes_are_polled_from_another_backend():
+    app = Celery("test", backend="cache+memory://")
+    hub = TaskEventHub(TaskStatusReader(app), poll_interval=0.02)
+
+    (events,) = _follow(app, hub, subscribers=1)
+
+    assert _states(events)[-1] == ("first", "SUCCESS")
+    assert ("second", "SUCCESS") in _states(events)
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+from celery import Celery
+from kombu import pools
+from kombu.transport import memory
+
+from pymicroservice.worker.task_publisher import AsyncTaskPublisher
+
+
+@pytest.fixture
+def app(monkeypatch) -> Celery:
+    # a broker answering in 100ms
+    put = memory.Channel._put
+
+    def slow_put(self, queue, message, **kwargs):
+        time.sleep(0.1)
+        put(self, queue, message, **kwargs)
+
+    monkeypatch.setattr(memory.Channel, "_put", slow_put)
+    pools.reset()
+    app = Celery("test", broker="memory://")
+
+    @app.task(name="add")
+    def add(x, y):
+        return x + y
+
+    # the queues of the memory transport are shared by the whole process
+    with app.connection_for_read() as connection:
+        connection.SimpleQueue("celery").clear()
+    return app
+
+
+def _queue_size(app: Celery) -> int:
+    with app.connection_for_read() as connection:
+        return connection.SimpleQueue("celery").qsize()
+
+
+def test_publish_does_not_block_the_event_loop(app):
+    publisher = AsyncTaskPublisher(app, pool_size=5)
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        results = await asyncio.gather(*(publisher.publish(app.tasks["add"], i, i) for i in range(5)))
+        ticker.cancel()
+        await publisher.close()
+        return results, ticks
+
+    results, ticks = asyncio.run(run())
+
+    assert len({result.id for result in results}) == 5
+    assert ticks >= 5
+    assert _queue_size(app) == 5
+    stats = publisher.stats()
+    assert (stats.pending, stats.published, stats.failed) == (0, 5, 0)
+    assert 0.1 <= stats.latency_p50 <= stats.latency_p99
+
+
+def test_publish_many(app):
+    publisher = AsyncTaskPublisher(app, chunk_size=2)
+
+    submissions = asyncio.run(publisher.publish_many(app.tasks["add"], [(1, 1), (2, 2), (3, 3)]))
+
+    assert all(submission.task_id for submission in submissions)
+    assert _queue_size(app) == 3
+
+
+def test_close_drains_the_pending_publishings(app):
+    publisher = AsyncTaskPublisher(app, pool_size=1, timeout=0.05)
+
+    async def run():
+        with pytest.raises(TimeoutError):
+            await publisher.publish(app.tasks["add"], 1, 1)
+        pending = publisher.stats().pending
+        await publisher.close()
+        return pending
+
+    assert asyncio.run(run()) == 1
+    assert publisher.stats().pending == 0
+    assert _queue_size(app) == 1
@@ -0,0 +1,80 @@
+import pytest
+from celery import Celery
+
+from pymicroservice.worker.task_routing import (
+    TaskRoute,
+    WorkerQueue,
+    WorkerQueueSettings,
+    bind_worker_to_queues,
+    configure_task_routing,
+)
+
+QUEUES = [
+    WorkerQueue("default", concurrency=8, prefetch_multiplier=4),
+    WorkerQueue("interactive", concurrency=2, prefetch_multiplier=1, max_priority=9),
+    WorkerQueue("reports", prefetch_multiplier=2),
+]
+ROUTES = [
+    TaskRoute("test.lookup", queue="interactive", priority=9),
+    TaskRoute("test.report", queue="reports", rate_limit="10/m"),
+]
+
+
+def _app() -> Celery:
+    app = Celery("test", broker="memory://")
+    configure_task_routing(app, QUEUES, ROUTES)
+
+    @app.task(name="test.lookup")
+    def lookup():
+        pass
+
+    @app.task(name="test.report")
+    def report():
+        pass
+
+    @app.task(name="test.other")
+    def other():
+        pass
+
+    return app
+
+
+def test_tasks_are_routed_to_their_queue():
+    app = _app()
+
+    assert [app.amqp.router.route({}, name)["queue"].name for name in ("test.lookup", "test.report", "test.other")] == [
+        "interactive",
+        "reports",
+        "default",
+    ]
+    assert app.amqp.queues["interactive"].queue_arguments == {"x-max-priority": 9}
+    assert (app.tasks["test.lookup"].priority, app.tasks["test.lookup"].rate_limit) == (9, None)
+    assert (app.tasks["test.report"].priority, app.tasks["test.report"].rate_limit) == (None, "10/m")
+
+
+def test_routes_to_undeclared_queues_are_rejected():
+    with pytest.raises(ValueError, match="undeclared queue missing"):
+        configure_task_routing(Celery("test"), QUEUES, [TaskRoute("test.lookup", queue="missing")])
+
+
+def test_worker_bound_to_a_queue_set():
+    app = _app()
+
+    consumed = bind_worker_to_queues(app, QUEUES, ["interactive", "reports"])
+
+    assert [queue.name for queue in consumed] == ["interactive", "reports"]
+    assert sorted(app.amqp.queues.consume_from) == ["interactive", "reports"]
+    assert (app.conf.worker_prefetch_multiplier, app.conf.worker_concurrency) == (1, 2)
+
+    app = _app()
+    bind_worker_to_queues(app, QUEUES, tune_concurrency=False)
+    assert sorted(app.amqp.queues.consume_from) == ["default", "interactive", "reports"]
+    assert (app.conf.worker_prefetch_multiplier, app.conf.worker_concurrency) == (1, None)
+
+    with pytest.raises(ValueError, match="Unknown queues: missing."):
+        bind_worker_to_queues(app, QUEUES, ["missing"])
+
+
+def test_queue_names_setting():
+    assert WorkerQueueSettings(queues=" interactive, reports,").queue_names == ["interactive", "reports"]
+    assert WorkerQueueSettings().queue_names == []
@@ -0,0 +1,57 @@
+import asyncio
+
+import fakeredis
+from celery import Celery
+
+from pymicroservice.worker.task_status import TaskStatusReader
+
+
+def _redis_app() -> tuple[Celery, TaskStatusReader]:
+    server = fakeredis.FakeServer()
+    app = Celery("test", backend="redis://localhost:6379/0")
+    app.backend.client = fakeredis.FakeRedis(server=server)
+    reader = TaskStatusReader(app, client_factory=lambda: fakeredis.aioredis.FakeRedis(server=server))
+    return app, reader
+
+
+def test_get_from_redis():
+    app, reader = _redis_app()
+    app.backend.store_result("done", "Task completed", "SUCCESS")
+    app.backend.store_result("failed", ValueError("boom"), "FAILURE")
+
+    async def read():
+        statuses = [await reader.get(task_id) for task_id in ("done", "failed", "unknown")]
+        await reader.close()
+        return statuses
+
+    done, failed, unknown = asyncio.run(read())
+
+    assert (done.status, done.result) == ("SUCCESS", "Task completed")
+    assert failed.status == "FAILURE"
+    assert isinstance(failed.result, ValueError)
+    assert (unknown.status, unknown.result) == ("PENDING", None)
+
+
+def test_get_many_from_redis_keeps_the_order():
+    app, reader = _redis_app()
+    for i in range(10):
+        app.backend.store_result(f"task-{i}", i, "SUCCESS")
+
+    task_ids = [f"task-{i}" for i in reversed(range(12))]
+    statuses = asyncio.run(reader.get_many(task_ids))
+
+    assert [status.task_id for status in statuses] == task_ids
+    assert [status.result for status in statuses] == [None, None, *reversed(range(10))]
+
+
+def test_get_from_another_backend():
+    app = Celery("test", backend="cache+memory://")
+    app.backend.store_result("done", "Task completed", "SUCCESS")
+    reader = TaskStatusReader(app)
+
+    statuses = asyncio.run(reader.get_many(["done", "unknown"]))
+
+    assert [(status.status, status.result) for status in statuses] == [
+        ("SUCCESS", "Task completed"),
+        ("PENDING", None),
+    ]
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.security import HTTPAuthorizationCredentials
+
+from pymicroservice.security.oidc import decode_jwt_token, oidc_auth
+from pymicroservice.security.oidc_config_loader import OidcConfig
+from pymicroservice.security.token import JWTAccessToken
+from pymicroservice.security.token_cache import TokenCache
+
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _access_token(exp: int) -> JWTAccessToken:
+    return JWTAccessToken(iss="https://example.com", exp=exp, aud="account", sub="user", iat=0, jti="jti")
+
+
+def _signed_token(exp: int) -> str:
+    payload = {"iss": "https://example.com", "exp": exp, "aud": "account", "sub": "user", "iat": 0, "jti": "jti"}
+    return jwt.encode(payload, PRIVATE_KEY, algorithm="RS256")
+
+
+def test_get_and_put():
+    cache = TokenCache(max_size=10, ttl=60)
+    access_token = _access_token(int(time.time()) + 60)
+
+    assert cache.get("token") is None
+    cache.put("token", access_token)
+    assert cache.get("token") is access_token
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+    assert "token" in cache
+    assert "other" not in cache
+    assert cache.stats() == stats
+
+
+def test_never_served_past_exp():
+    cache = TokenCache(max_size=10, ttl=60)
+    cache.put("expired", _access_token(int(time.time()) - 1))
+    assert cache.get("expired") is None
+
+    cache = TokenCache(max_size=10, ttl=0)
+    cache.put("ttl", _access_token(int(time.time()) + 60))
+    assert cache.get("ttl") is None
+
+
+def test_lru_eviction():
+    cache = TokenCache(max_size=2, ttl=60)
+    exp = int(time.time()) + 60
+    cache.put("a", _access_token(exp))
+    cache.put("b", _access_token(exp))
+    cache.get("a")
+    cache.put("c", _access_token(exp))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats().evictions == 1
+
+
+def test_invalidate():
+    cache = TokenCache(max_size=10, ttl=60)
+    cache.put("token", _access_token(int(time.time()) + 60))
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_decode_jwt_token_uses_cache():
+    key_store = MagicMock()
+    key_store.get_cached_signing_key_from_jwt.return_value.key = PRIVATE_KEY.public_key()
+    oidc_config = OidcConfig(["RS256"], "https://example.com/certs", key_store, "account", TokenCache())
+    token = _signed_token(int(time.time()) + 60)
+
+    first = decode_jwt_token(token, oidc_config)
+    second = decode_jwt_token(token, oidc_config)
+
+    assert first is second
+    assert key_store.get_cached_signing_key_from_jwt.call_count == 1
+
+
+def test_cached_token_skips_the_signing_key_lookup():
+    key_store = MagicMock()
+    key_store.get_signing_key_from_jwt = AsyncMock()
+    key_store.get_cached_signing_key_from_jwt.return_value.key = PRIVATE_KEY.public_key()
+    token_cache = TokenCache()
+    oidc_config = OidcConfig(["RS256"], "https://example.com/certs", key_store, "account", token_cache)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=_signed_token(int(time.time()) + 60))
+
+    first = asyncio.run(oidc_auth(credentials, oidc_config))
+    second = asyncio.run(oidc_auth(credentials, oidc_config))
+
+    assert first is second
+    assert key_store.get_signing_key_from_jwt.await_count == 1
+    assert (token_cache.stats().hits, token_cache.stats().misses) == (1, 1)
@@ -0,0 +1,111 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from pymicroservice.security.oidc import oidc_auth, require_roles, require_scopes
+from pymicroservice.security.token import JWTAccessToken
+
+PAYLOAD = {
+    "iss": "https://example.com",
+    "exp": 2000,
+    "aud": "account",
+    "sub": "user",
+    "iat": 1000,
+    "jti": "jti",
+    "acr": "1",
+    "realm_access": {"roles": ["admin", "user"]},
+    "resource_access": {"sample": {"roles": ["reader"]}},
+    "scope": "openid tasks:write",
+}
+
+admin_dependency = Depends(require_roles("admin", "user"))
+reader_dependency = Depends(require_roles("reader", client_id="sample"))
+owner_dependency = Depends(require_roles("owner"))
+write_dependency = Depends(require_scopes("tasks:write"))
+delete_dependency = Depends(require_scopes("tasks:write", "tasks:delete"))
+
+
+def test_claims_are_read_from_the_payload():
+    token = JWTAccessToken.from_payload(PAYLOAD)
+
+    assert token.payload is PAYLOAD
+    assert (token.sub, token.exp, token.acr, token.auth_time, token.amr) == ("user", 2000, "1", None, [])
+    assert token.claim("scope") == "openid tasks:write"
+    assert token.extra_claims == {
+        "realm_access": {"roles": ["admin", "user"]},
+        "resource_access": {"sample": {"roles": ["reader"]}},
+        "scope": "openid tasks:write",
+    }
+    assert token.roles == {"admin", "user"}
+    assert token.roles is token.roles
+    assert token.client_roles("sample") == {"reader"}
+    assert token.client_roles("other") == frozenset()
+    assert token.scopes == {"openid", "tasks:write"}
+
+
+def test_token_built_from_claims_is_rendered_like_a_dataclass():
+    token = JWTAccessToken(
+        iss="https://example.com", exp=2000, aud="account", sub="user", iat=1000, jti="jti", extra_claims={"a": 1}
+    )
+
+    assert token == JWTAccessToken.from_payload({**token.payload})
+    assert token.to_dict() == {
+        "iss": "https://example.com",
+        "exp": 2000,
+        "aud": "account",
+        "sub": "user",
+        "iat": 1000,
+        "jti": "jti",
+        "auth_time": None,
+        "acr": None,
+        "amr": [],
+        "extra_claims": {"a": 1},
+    }
+    assert JWTAccessToken.from_payload({**PAYLOAD, "scp": ["a"], "scope": None}).scopes == {"a"}
+    assert JWTAccessToken.from_payload({**PAYLOAD, "realm_access": None}).roles == frozenset()
+
+
+def test_null_or_malformed_claims_grant_nothing():
+    token = JWTAccessToken.from_payload(
+        {**PAYLOAD, "scope": None, "realm_access": {"roles": None}, "resource_access": ["sample"]}
+    )
+
+    assert token.scopes == frozenset()
+    assert token.roles == frozenset()
+    assert token.client_roles("sample") == frozenset()
+    assert JWTAccessToken.from_payload({**PAYLOAD, "resource_access": {"sample": None}}).client_roles("sample") == set()
+    assert JWTAccessToken.from_payload({**PAYLOAD, "scope": 1, "scp": "a"}).scopes == frozenset()
+    assert JWTAccessToken.from_payload({**PAYLOAD, "scope": ["a", None]}).scopes == {"a"}
+
+
+def test_required_roles_and_scopes():
+    app = FastAPI()
+    app.dependency_overrides[oidc_auth] = lambda: JWTAccessToken.from_payload(PAYLOAD)
+
+    @app.get("/admin")
+    async def admin(token: JWTAccessToken = admin_dependency):
+        return token.sub
+
+    @app.get("/reader")
+    async def reader(token: JWTAccessToken = reader_dependency):
+        return token.sub
+
+    @app.get("/owner")
+    async def owner(token: JWTAccessToken = owner_dependency):
+        return token.sub
+
+    @app.get("/write")
+    async def write(token: JWTAccessToken = write_dependency):
+        return token.sub
+
+    @app.get("/delete")
+    async def delete(token: JWTAccessToken = delete_dependency):
+        return token.sub
+
+    client = TestClient(app)
+    assert [client.get(path).status_code for path in ("/admin", "/reader", "/write")] == [200, 200, 200]
+    assert client.get("/owner").json() == {"detail": "Missing required roles."}
+    assert client.get("/delete").json() == {"detail": "Missing required scopes."}
+
+    app.dependency_overrides[oidc_auth] = lambda: JWTAccessToken.from_payload({**PAYLOAD, "scope": None})
+    response = client.get("/write")
+    assert (response.status_code, response.json()) == (403, {"detail": "Missing required scopes."})
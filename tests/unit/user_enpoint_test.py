@@ -3,8 +3,12 @@ import uuid
 from datetime import timedelta
 from unittest.mock import patch
 
+import fakeredis
+from celery.backends.redis import RedisBackend
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from kombu import pools
+from kombu.transport import redis as kombu_redis
 
 from pymicroservice.security.token import JWTAccessToken
 from sample.application.bootstrap import Bootstrap
@@ -41,3 +45,27 @@ def test_protected(mock_decode_jwt_token):
 
     response = client.get(query, headers={"Authorization": "Bearer fake_token"})
     assert response.status_code == 200
+
+
+def test_run_sample_tasks(monkeypatch):
+    server = fakeredis.FakeServer()
+    pools.reset()
+    monkeypatch.setattr(
+        kombu_redis.Channel, "_create_client", lambda self, asynchronous=False: fakeredis.FakeRedis(server=server)
+    )
+    # the result backend of Celery is local to the thread publishing the tasks
+    monkeypatch.setattr(RedisBackend, "_create_client", lambda self, **params: fakeredis.FakeRedis(server=server))
+
+    response = client.post("/api/v1/user/tasks", json={"tasks": [{"name": "first"}, {"name": "second"}]})
+
+    assert response.status_code == 200
+    tasks = response.json()["tasks"]
+    assert [task["status"] for task in tasks] == ["Task submitted", "Task submitted"]
+    assert fakeredis.FakeRedis(server=server).llen("long_running") == 2
+
+
+def test_run_sample_tasks_validates_each_task():
+    response = client.post("/api/v1/user/tasks", json={"tasks": [{"name": "first"}, {}]})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "tasks", 1, "name"]
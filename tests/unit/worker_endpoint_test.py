@@ -0,0 +1,154 @@
+import fakeredis
+import pytest
+from celery import Celery
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pymicroservice.cache.response_cache import ResponseCache
+from pymicroservice.worker.large_result import LARGE_RESULT_BACKEND
+from pymicroservice.worker.task_events import TaskEventHub
+from pymicroservice.worker.task_status import TASK_STATUS_CONFIG, TaskStatusReader
+from sample.application.bootstrap import Bootstrap
+from sample.application.worker import worker_endpoint
+from sample.infrastructure import celery as celery_infrastructure
+
+app: FastAPI = Bootstrap.build_api()
+client = TestClient(app)
+
+
+def _worker(monkeypatch, backend: str) -> Celery:
+    server = fakeredis.FakeServer()
+    worker = Celery("test", backend=backend)
+    worker.backend.client = fakeredis.FakeRedis(server=server)
+    reader = TaskStatusReader(worker, client_factory=lambda: fakeredis.aioredis.FakeRedis(server=server))
+    monkeypatch.setattr(celery_infrastructure, "TASK_STATUS_READER", reader)
+    monkeypatch.setattr(celery_infrastructure, "TASK_EVENT_HUB", TaskEventHub(reader))
+    monkeypatch.setattr(worker_endpoint, "TASK_STATUS_CACHE", ResponseCache("task_status"))
+    return worker
+
+
+@pytest.fixture
+def worker(monkeypatch) -> Celery:
+    return _worker(monkeypatch, "redis://localhost:6379/0")
+
+
+@pytest.fixture
+def large_result_worker(monkeypatch) -> Celery:
+    worker = _worker(monkeypatch, f"{LARGE_RESULT_BACKEND}+redis://localhost:6379/0")
+    worker.backend.threshold = 1024
+    return worker
+
+
+def test_task_status(worker):
+    worker.backend.store_result("done", "Task completed", "SUCCESS")
+
+    response = client.get("/api/v1/worker/task/done")
+    assert response.json() == {"task_id": "done", "status": "SUCCESS", "result": "Task completed"}
+
+    response = client.get("/api/v1/worker/task/unknown")
+    assert response.json() == {"task_id": "unknown", "status": "PENDING"}
+
+
+def test_finished_task_status_is_cached(worker):
+    worker.backend.store_result("running", None, "STARTED")
+    assert client.get("/api/v1/worker/task/running").json()["status"] == "STARTED"
+    worker.backend.store_result("running", "Task completed", "SUCCESS")
+
+    response = client.get("/api/v1/worker/task/running")
+    assert response.json()["status"] == "SUCCESS"
+    etag = response.headers["ETag"]
+    worker.backend.forget("running")
+
+    response = client.get("/api/v1/worker/task/running")
+    assert response.json() == {"task_id": "running", "status": "SUCCESS", "result": "Task completed"}
+    assert response.headers["ETag"] == etag
+
+    response = client.get("/api/v1/worker/task/running", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert worker_endpoint.TASK_STATUS_CACHE.stats().hits == 2
+
+
+def test_task_result(worker):
+    worker.backend.store_result("done", {"rows": [1, 2]}, "SUCCESS")
+    worker.backend.store_result("started", None, "STARTED")
+
+    assert client.get("/api/v1/worker/task/done/result").json() == {"rows": [1, 2]}
+    response = client.get("/api/v1/worker/task/started/result")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Task result not available."}
+
+
+def test_large_task_result_is_downloaded_apart(large_result_worker):
+    result = {"rows": [{"id": i, "name": f"row {i}"} for i in range(1000)]}
+    large_result_worker.backend.store_result("large", result, "SUCCESS")
+
+    status_response = client.get("/api/v1/worker/task/large").json()
+    assert status_response == {
+        "task_id": "large",
+        "status": "SUCCESS",
+        "result_url": "/api/v1/worker/task/large/result",
+        "result_size": status_response["result_size"],
+    }
+
+    response = client.get(status_response["result_url"], headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < status_response["result_size"]
+    assert response.json() == result
+
+    response = client.get(status_response["result_url"], headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) == status_response["result_size"]
+    assert response.json() == result
+
+    large_result_worker.backend.client.delete(large_result_worker.backend.get_key_for_large_result("large"))
+    response = client.get(status_response["result_url"])
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Task result expired."}
+
+
+def test_tasks_status(worker):
+    worker.backend.store_result("done", "Task completed", "SUCCESS")
+    worker.backend.store_result("started", None, "STARTED")
+
+    response = client.post("/api/v1/worker/tasks/status", json={"task_ids": ["done", "started", "unknown"]})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "tasks": [
+            {"task_id": "done", "status": "SUCCESS", "result": "Task completed"},
+            {"task_id": "started", "status": "STARTED"},
+            {"task_id": "unknown", "status": "PENDING"},
+        ]
+    }
+
+
+def test_tasks_status_max_batch_size(worker):
+    task_ids = [f"task-{i}" for i in range(TASK_STATUS_CONFIG.max_batch_size + 1)]
+
+    response = client.post("/api/v1/worker/tasks/status", json={"task_ids": task_ids})
+
+    assert response.status_code == 422
+
+
+def test_tasks_events(worker):
+    worker.backend.store_result("done", "Task completed", "SUCCESS")
+    worker.backend.store_result("failed", ValueError("boom"), "FAILURE")
+
+    with client.stream("GET", "/api/v1/worker/tasks/events?task_id=done&task_id=failed") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        lines = [line for line in response.iter_lines() if line]
+
+    assert lines == [
+        "event: status",
+        'data: {"task_id": "done", "status": "SUCCESS", "result": "Task completed"}',
+        "event: status",
+        'data: {"task_id": "failed", "status": "FAILURE"}',
+    ]
+
+
+def test_tasks_events_without_task_id(worker):
+    response = client.get("/api/v1/worker/tasks/events")
+
+    assert response.status_code == 422